@@ -2,43 +2,80 @@ import pandas as pd
 import numpy as np
 import joblib
 import os
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+import operator
+import secrets
+import threading
+import time
+from time import perf_counter_ns
+from itertools import count
+from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
 import uvicorn
 from contextlib import asynccontextmanager
+from forest_engine import FlatForest
+from model_artifact import load_artifact
+from feature_engineering import FraudFeatureEngineer, compute_features_scalar
+from micro_batcher import MicroBatcher
+from shadow_scoring import ShadowScorer
+from metrics import ServingMetrics, RequestStartMiddleware
+from score_cache import ScoreCache
+from online_drift import OnlineDriftMonitor
+from reference_sketch import REFERENCE_SKETCH_FILE, load_reference_sketch
 
 # --- Configura Caminhos ---
 BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.normpath(os.path.join(BASE_PATH, "../models"))
 MODEL_PATH = os.path.join(BASE_PATH, "../models/challenger_model.pkl")
+# Diretório de artefato compacto (model_artifact.py): aberto com mmap e compartilhado entre workers
+MODEL_ARRAYS_PATH = os.getenv("FRAUD_MODEL_ARRAYS")
+
+# Usa o motor FlatForest (árvores achatadas em NumPy) no lugar de model.predict_proba
+USE_FLAT_FOREST = os.getenv("FRAUD_FLAT_FOREST", "1") == "1"
+
+# Micro-batching de /predict: agrupa requisições concorrentes em uma única inferência
+USE_MICRO_BATCHING = os.getenv("FRAUD_MICRO_BATCHING", "1") == "1"
+MICRO_BATCH_MAX_SIZE = int(os.getenv("FRAUD_MICRO_BATCH_MAX_SIZE", "64"))
+MICRO_BATCH_MAX_WAIT_US = int(os.getenv("FRAUD_MICRO_BATCH_MAX_WAIT_US", "500"))
+
+# Shadow scoring: segundo modelo (ex.: models/baseline_model.pkl) pontuando fora do caminho da resposta
+SHADOW_MODEL_PATH = os.getenv("FRAUD_SHADOW_MODEL")
+SHADOW_THRESHOLD = float(os.getenv("FRAUD_SHADOW_THRESHOLD", "0.5"))
+
+# Cache de decisões para retentativas (mesmo vetor de features): 0 desativa
+SCORE_CACHE_SIZE = int(os.getenv("FRAUD_SCORE_CACHE_SIZE", "10000"))
+SCORE_CACHE_TTL_SECONDS = float(os.getenv("FRAUD_SCORE_CACHE_TTL_SECONDS", "300"))
+SCORE_CACHE_POLICY = os.getenv("FRAUD_SCORE_CACHE_POLICY", "lru")  # "lru" ou "fifo"
+
+# Drift online: histogramas por janela das features monitoradas e do score (sketch gerado no treino)
+USE_ONLINE_DRIFT = os.getenv("FRAUD_ONLINE_DRIFT", "1") == "1"
+REFERENCE_SKETCH_PATH = os.getenv("FRAUD_REFERENCE_SKETCH", REFERENCE_SKETCH_FILE)
+DRIFT_WINDOW_SECONDS = int(os.getenv("FRAUD_DRIFT_WINDOW_SECONDS", "3600"))
+DRIFT_WINDOWS = int(os.getenv("FRAUD_DRIFT_WINDOWS", "24"))  # Janelas guardadas (máximo da janela deslizante)
+
+# Token das rotas /admin (se vazio, as rotas ficam abertas: use apenas em rede interna)
+ADMIN_TOKEN = os.getenv("FRAUD_ADMIN_TOKEN", "")
 
 # --- Variáveis Globais ---
-model = None
+serving = None    # ServingModel ativo: trocado por uma única atribuição (atômica) no hot reload
+shadow = None     # ShadowScorer opcional
+batcher = None    # MicroBatcher ativo no lifespan
+metrics = ServingMetrics()  # Histogramas por etapa + contadores expostos em /metrics
+score_cache = ScoreCache(SCORE_CACHE_SIZE, SCORE_CACHE_TTL_SECONDS, SCORE_CACHE_POLICY) if SCORE_CACHE_SIZE > 0 else None
+drift_monitor = None  # OnlineDriftMonitor (None sem sketch de referência)
 THRESHOLD = 0.20  # Threshold Otimizado (Financeiro)
-
-# --- Classe de Engenharia (Feature Factory) ---
-class FraudFeatureEngineer:
-    def transform(self, X):
-        X = X.copy()
-        
-        # 1. Feature: Hora do Dia (0-23)
-        # O modelo espera 'hour', derivado de 'time'
-        X['hour'] = X['time'].apply(lambda x: np.floor(x / 3600) % 24)
-        
-        # 2. Feature: Is Night (Madrugada)
-        # O modelo espera 'is_night'
-        X['is_night'] = X['hour'].apply(lambda x: 1 if x <= 6 else 0)
-        
-        # 3. Transformação de Log no Amount
-        # O modelo espera 'amount_log'
-        X['amount_log'] = np.log(X['amount'] + 0.001)
-        
-        return X
+MAX_BATCH_SIZE = 1000  # Limite de transações por chamada em /predict/batch
 
 # --- Contrato de Dados (Schema) ---
 # O cliente (maquininha):
 class TransactionRequest(BaseModel):
+    # Valores finitos e amount >= 0: entradas inválidas viram 422 em /predict e /predict/batch
+    model_config = ConfigDict(allow_inf_nan=False)
+
     time: float
-    amount: float
+    amount: float = Field(ge=0)
     v1: float = 0.0
     v2: float = 0.0
     v3: float = 0.0
@@ -68,66 +105,480 @@ class TransactionRequest(BaseModel):
     v27: float = 0.0
     v28: float = 0.0
 
+# --- Fast Path (sem pandas) ---
+class TransactionRowEncoder:
+    """
+    Escreve os campos da transação (e as features derivadas hour, is_night,
+    amount_log) direto em uma linha float contígua, já na ordem de
+    `feature_names_in_`. O mapeamento de colunas é resolvido uma única vez.
+    """
+    def __init__(self, feature_names):
+        self.feature_names = list(feature_names)
+        self._getter = operator.itemgetter(*self.feature_names)
+        self._local = threading.local()  # Um buffer por thread do threadpool do FastAPI
+
+    def _buffer(self):
+        row = getattr(self._local, 'row', None)
+        if row is None:
+            row = np.empty((1, len(self.feature_names)), dtype=np.float64)
+            self._local.row = row
+        return row
+
+    def encode(self, transaction):
+        values = dict(transaction.__dict__)
+        
+        # Mesmas regras do FraudFeatureEngineer, em aritmética escalar
+        values['hour'], values['is_night'], values['amount_log'] = compute_features_scalar(
+            values['time'], values['amount'])
+        
+        row = self._buffer()
+        row[0] = self._getter(values)
+        return row
+
+def dataframe_features(transaction, feature_names):
+    """Caminho original via pandas: JSON -> DataFrame -> Feature Engineering -> ordem do treino."""
+    return batch_dataframe_features([transaction], feature_names)
+
+def enrich_transactions(transactions):
+    """JSON -> DataFrame -> Feature Engineering vetorizada (cria hour, is_night, amount_log)."""
+    # 1. Converte JSON para DataFrame
+    df_raw = pd.DataFrame([t.model_dump() for t in transactions])
+    
+    # 2. Feature Engineering
+    engineer = FraudFeatureEngineer()
+    return engineer.transform(df_raw)
+
+def batch_dataframe_features(transactions, feature_names):
+    """Monta a matriz de features de várias transações em um único DataFrame."""
+    # 3. Alinha a ordem exata do modelo treinado
+    return enrich_transactions(transactions)[feature_names]
+
+# --- Modelo em Serviço ---
+_model_versions = count(1)
+
+class ServingModel:
+    """
+    Tudo o que uma requisição precisa de um modelo carregado (modelo, preditor,
+    encoder do fast path). Cada requisição lê `serving` uma única vez, então a
+    troca de modelo nunca mistura colunas de um com o preditor de outro.
+    """
+    def __init__(self, model, predictor, encoder, source):
+        self.model = model
+        self.predictor = predictor
+        self.encoder = encoder
+        self.source = source
+        self.feature_names = model.feature_names_in_
+        self.drift_columns = OnlineDriftMonitor.columns_for(self.feature_names)
+        self.version = next(_model_versions)
+        self.loaded_at = time.time()
+
+    def features(self, transaction):
+        """Linha de features na ordem do treino (fast path sem pandas quando disponível)."""
+        if self.encoder is not None:
+            return self.encoder.encode(transaction)
+        return dataframe_features(transaction, self.feature_names)
+
+    def batch_features(self, transactions):
+        if self.encoder is not None:
+            # Copia cada linha: o encoder reaproveita o mesmo buffer
+            return np.vstack([self.encoder.encode(t).copy() for t in transactions])
+        return batch_dataframe_features(transactions, self.feature_names)
+
+    def score(self, transactions):
+        """Probabilidades de fraude (classe 1) de uma lista de transações."""
+        return self.predictor.predict_proba(self.batch_features(transactions))[:, 1]
+
+    def describe(self):
+        return {
+            "version": self.version,
+            "source": self.source,
+            "engine": type(self.predictor).__name__,
+            "fast_path": self.encoder is not None,
+            "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.loaded_at)),
+        }
+
+def build_serving_model(path):
+    """
+    Carrega e aquece um modelo sem publicá-lo.
+    `path` pode ser um pickle do sklearn ou um diretório de artefato (model_artifact.py),
+    que é aberto com mmap_mode='r' para os workers dividirem as mesmas páginas.
+    """
+    if os.path.isdir(path):
+        loaded = load_artifact(path, mmap_mode='r')
+    else:
+        loaded = joblib.load(path)
+    
+    engine = loaded
+    if USE_FLAT_FOREST and not os.path.isdir(path):
+        try:
+            engine = FlatForest.from_model(loaded)
+        except ValueError as e:
+            print(f"⚠️ FlatForest indisponível, usando predict_proba do sklearn: {e}")
+    
+    # O fast path entrega arrays sem nomes de coluna: só vale para o FlatForest
+    row_encoder = TransactionRowEncoder(loaded.feature_names_in_) if isinstance(engine, FlatForest) else None
+    candidate = ServingModel(loaded, engine, row_encoder, source=path)
+    
+    # Warm-up: percorre o caminho completo (encoder + inferência) antes de receber tráfego,
+    # trazendo páginas do mmap e caches para a memória
+    warmup = [TransactionRequest(time=float(t), amount=1.0) for t in range(0, 86400, 3600)]
+    candidate.score(warmup)
+    return candidate
+
 # --- Inicialização ---
+def load_model(path=MODEL_PATH):
+    """Carrega, aquece e publica atomicamente um novo modelo primário."""
+    global serving
+    start = time.perf_counter()
+    candidate = build_serving_model(path)
+    metrics.model_load_seconds = round(time.perf_counter() - start, 6)
+    metrics.model_version = candidate.version
+    serving = candidate
+    return serving
+
+def load_shadow_model(path, threshold=SHADOW_THRESHOLD):
+    """Ativa (ou troca) o modelo sombra; o anterior é encerrado."""
+    global shadow
+    candidate = build_serving_model(path)
+    previous, shadow = shadow, ShadowScorer(candidate.score, THRESHOLD, threshold, source=path)
+    if previous is not None:
+        previous.close()
+    return shadow
+
+def predict_fraud_proba(rows, current):
+    """Probabilidade de fraude (classe 1) para uma matriz de features já alinhada."""
+    start = perf_counter_ns()
+    probas = current.predictor.predict_proba(rows)[:, 1]
+    metrics.observe("inference", perf_counter_ns() - start)
+    return probas
+
+def load_drift_monitor(path=REFERENCE_SKETCH_PATH):
+    """Monitor de drift online a partir do sketch de referência (None se o sketch não existir)."""
+    global drift_monitor
+    sketch = load_reference_sketch(path)
+    drift_monitor = OnlineDriftMonitor(sketch, DRIFT_WINDOW_SECONDS, DRIFT_WINDOWS) if sketch is not None else None
+    return drift_monitor
+
+def observe_drift(row, current, proba):
+    """Conta a linha de features e o score nos histogramas de drift (nenhum dado bruto é guardado)."""
+    if drift_monitor is not None and current.drift_columns is not None:
+        drift_monitor.observe(row, current.drift_columns, proba)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global model
-    if not os.path.exists(MODEL_PATH):
-        print(f"❌ ARQUIVO NÃO ENCONTRADO: {MODEL_PATH}")
+    global batcher
+    model_source = MODEL_ARRAYS_PATH or MODEL_PATH
+    if not os.path.exists(model_source):
+        print(f"❌ ARQUIVO NÃO ENCONTRADO: {model_source}")
     else:
         try:
-            model = joblib.load(MODEL_PATH)
+            load_model(model_source)
             print(f"✅ Modelo Challenger carregado! Threshold: {THRESHOLD}")
-            print(f"📊 Colunas esperadas: {len(model.feature_names_in_)}")
+            print(f"📊 Colunas esperadas: {len(serving.feature_names)}")
+            print(f"⚙️ Motor de inferência: {type(serving.predictor).__name__}")
         except Exception as e:
             print(f"❌ Erro crítico ao carregar pickle: {e}")
+    
+    if SHADOW_MODEL_PATH:
+        try:
+            load_shadow_model(SHADOW_MODEL_PATH)
+            print(f"👥 Shadow scoring ativo: {SHADOW_MODEL_PATH} (threshold {SHADOW_THRESHOLD})")
+        except Exception as e:
+            print(f"⚠️ Modelo sombra não carregado: {e}")
+    
+    if USE_ONLINE_DRIFT:
+        try:
+            if load_drift_monitor() is not None:
+                print(f"📈 Drift online ativo: janelas de {DRIFT_WINDOW_SECONDS}s (últimas {DRIFT_WINDOWS})")
+            else:
+                print(f"⚠️ Drift online desativado: sketch não encontrado em {REFERENCE_SKETCH_PATH}")
+        except Exception as e:
+            print(f"⚠️ Drift online desativado: {e}")
+    
+    if USE_MICRO_BATCHING:
+        batcher = MicroBatcher(predict_fraud_proba, MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT_US)
+        await batcher.start()
+        print(f"📦 Micro-batching ativo: lote máx. {MICRO_BATCH_MAX_SIZE} | espera máx. {MICRO_BATCH_MAX_WAIT_US}µs")
+    
     yield
+    
+    if batcher is not None:
+        await batcher.stop()
+        batcher = None
+    if shadow is not None:
+        shadow.close()
 
 app = FastAPI(title="Fraud Detection API", lifespan=lifespan)
+app.add_middleware(RequestStartMiddleware)
+
+def cache_generation(current):
+    """Versão do modelo + threshold: se qualquer um mudar, o cache de decisões é descartado."""
+    return (current.version, THRESHOLD)
+
+def cached_decision(key, current):
+    """Decisão em cache para o vetor de features (ou None); acertos também entram nos contadores."""
+    if score_cache is None:
+        return None
+    cached = score_cache.get(key, cache_generation(current))
+    if cached is None:
+        return None
+    metrics.count_decision(cached["decision"], cached["risk_level"])
+    return dict(cached)
+
+def remember_decision(key, current, response):
+    if score_cache is not None:
+        score_cache.put(key, dict(response), cache_generation(current))
+    return response
+
+def build_decision(proba):
+    """Traduz a probabilidade de fraude no contrato de resposta da API."""
+    is_fraud = bool(proba >= THRESHOLD)
+    decision = "BLOQUEAR" if is_fraud else "APROVAR"
+    risk_level = "CRITICAL" if proba > 0.8 else ("HIGH" if is_fraud else "LOW")
+    metrics.count_decision(decision, risk_level)
+    
+    return {
+        "transaction_id": "uuid-test",
+        "probability": round(float(proba), 4),
+        "threshold_applied": THRESHOLD,
+        "prediction": int(is_fraud),
+        "decision": decision,
+        "risk_level": risk_level
+    }
 
 @app.get("/health")
 def health():
-    return {"status": "active", "model": "RandomForest-Challenger"}
+    current = serving
+    return {
+        "status": "active" if current is not None else "offline",
+        "model": current.describe() if current is not None else None,
+    }
 
-@app.post("/predict")
-def predict_fraud(transaction: TransactionRequest):
-    if not model:
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    gauges = {}
+    if batcher is not None:
+        batcher_stats = batcher.stats()
+        gauges["fraud_batcher_queue_depth"] = batcher_stats["queue_depth"]
+        gauges["fraud_batcher_mean_batch_size"] = batcher_stats["mean_batch_size"]
+    if shadow is not None:
+        gauges["fraud_shadow_agreement_rate"] = shadow.stats()["agreement_rate"]
+    if score_cache is not None:
+        cache = score_cache.stats()
+        gauges["fraud_score_cache_entries"] = cache["size"]
+        gauges["fraud_score_cache_hits"] = cache["hits"]
+        gauges["fraud_score_cache_misses"] = cache["misses"]
+        gauges["fraud_score_cache_evictions"] = cache["evictions"]
+    if drift_monitor is not None:
+        drift = drift_monitor.report()
+        gauges["fraud_drift_features_alert"] = drift["features_with_drift"]
+        if drift["series"].get("score", {}).get("psi") is not None:
+            gauges["fraud_drift_score_psi"] = drift["series"]["score"]["psi"]
+    return PlainTextResponse(metrics.render_prometheus(gauges), media_type="text/plain; version=0.0.4")
+
+@app.get("/batcher/stats")
+def batcher_stats():
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
+
+@app.get("/cache/stats")
+def cache_stats():
+    if score_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **score_cache.stats()}
+
+@app.get("/drift")
+def drift(windows: int = 1):
+    """
+    PSI/KS das features monitoradas e do score contra a referência do treino,
+    nas últimas `windows` janelas (1 = janela tumbling atual).
+    """
+    if drift_monitor is None:
+        return {"enabled": False}
+    return {"enabled": True, **drift_monitor.report(windows)}
+
+def score_transaction(transaction: TransactionRequest):
+    """Pontua uma transação de forma síncrona (sem micro-batching)."""
+    current = serving
+    if current is None:
         raise HTTPException(status_code=503, detail="Modelo Offline")
 
     try:
-        # 1. Converte JSON para DataFrame
-        input_data = transaction.model_dump()
-        df_raw = pd.DataFrame([input_data])
-        
-        # 2. Feature Engineering (Cria hour, is_night, amount_log)
-        engineer = FraudFeatureEngineer()
-        df_enriched = engineer.transform(df_raw)
+        # 1-3. Features na ordem do treino (fast path sem pandas quando disponível)
+        t_start = perf_counter_ns()
+        if current.encoder is not None:
+            X = current.encoder.encode(transaction)
+            t_features = t_ready = perf_counter_ns()
+        else:
+            df_enriched = enrich_transactions([transaction])
+            t_features = perf_counter_ns()
+            X = df_enriched[current.feature_names]
+            t_ready = perf_counter_ns()
+            metrics.observe("align", t_ready - t_features)
         
-        # 3. Alinha a ordem exata do modelo treinado
-        expected_cols = model.feature_names_in_
-        df_final = df_enriched[expected_cols]
+        # Retentativa (vetor de features idêntico): devolve a decisão já tomada
+        row = X if current.encoder is not None else X.to_numpy(dtype=np.float64)
+        cache_key = ScoreCache.key(row)
+        cached = cached_decision(cache_key, current)
+        if cached is not None:
+            return cached
         
         # 4. Inferência
         # Pega a probabilidade da classe 1 (Fraude)
-        proba = model.predict_proba(df_final)[0][1]
+        proba = current.predictor.predict_proba(X)[0][1]
+        t_inference = perf_counter_ns()
+        metrics.observe("features", t_features - t_start)
+        metrics.observe("inference", t_inference - t_ready)
         
         # 5. Decisão de Negócio
-        is_fraud = bool(proba >= THRESHOLD)
-        decision = "BLOQUEAR" if is_fraud else "APROVAR"
+        observe_drift(row[0], current, proba)
+        if shadow is not None:
+            shadow.submit([transaction], [proba])
+        return remember_decision(cache_key, current, build_decision(proba))
+
+    except KeyError as e:
+        raise HTTPException(status_code=500, detail=f"Erro de Coluna Faltante: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+
+@app.post("/predict")
+async def predict_fraud(transaction: TransactionRequest, request: Request):
+    # Parsing = chegada da requisição (middleware) até aqui: corpo, JSON e validação pydantic
+    t_entry = perf_counter_ns()
+    t_request = getattr(request.state, "request_start_ns", t_entry)
+    metrics.observe("parse", t_entry - t_request)
+    
+    current = serving
+    # Sem batcher (ou sem fast path): mesmo comportamento síncrono de antes, no threadpool
+    if batcher is None or current is None or current.encoder is None:
+        response = await run_in_threadpool(score_transaction, transaction)
+        metrics.observe("total", perf_counter_ns() - t_request)
+        return response
+
+    try:
+        # Copia a linha: o buffer do encoder é reaproveitado pela próxima requisição
+        row = current.encoder.encode(transaction).copy()
+        t_features = perf_counter_ns()
         
-        return {
-            "transaction_id": "uuid-test",
-            "probability": round(float(proba), 4),
-            "threshold_applied": THRESHOLD,
-            "prediction": int(is_fraud),
-            "decision": decision,
-            "risk_level": "CRITICAL" if proba > 0.8 else ("HIGH" if is_fraud else "LOW")
-        }
+        # Retentativa (vetor de features idêntico): devolve a decisão sem entrar no lote
+        cache_key = ScoreCache.key(row)
+        cached = cached_decision(cache_key, current)
+        if cached is not None:
+            metrics.observe("total", perf_counter_ns() - t_request)
+            return cached
+        
+        proba = await batcher.submit(row, current)
+        t_done = perf_counter_ns()
+        metrics.observe("features", t_features - t_entry)
+        metrics.observe("batch_wait", t_done - t_features)
+        metrics.observe("total", t_done - t_request)
+        
+        observe_drift(row[0], current, proba)
+        if shadow is not None:
+            shadow.submit([transaction], [proba])
+        return remember_decision(cache_key, current, build_decision(proba))
 
     except KeyError as e:
         raise HTTPException(status_code=500, detail=f"Erro de Coluna Faltante: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
+@app.post("/predict/batch")
+def predict_batch(transactions: List[TransactionRequest]):
+    """
+    Pontua um lote de transações com uma única matriz de features e
+    uma única chamada de predict_proba (rajadas do gateway do adquirente).
+    """
+    current = serving
+    if current is None:
+        raise HTTPException(status_code=503, detail="Modelo Offline")
+    if len(transactions) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Lote acima do limite de {MAX_BATCH_SIZE} transações")
+    if not transactions:
+        return []
+
+    try:
+        # 1-3. Matriz de features única para o lote, já na ordem do treino
+        df_final = batch_dataframe_features(transactions, current.feature_names)
+        
+        # 4. Inferência única para o lote
+        probas = current.predictor.predict_proba(df_final)[:, 1]
+        
+        # 5. Decisão de Negócio (mesma resposta de /predict, na ordem de entrada)
+        if drift_monitor is not None and current.drift_columns is not None:
+            drift_monitor.observe_many(df_final.to_numpy(dtype=np.float64), current.drift_columns, probas)
+        if shadow is not None:
+            shadow.submit(transactions, probas)
+        return [build_decision(proba) for proba in probas]
+
+    except KeyError as e:
+        raise HTTPException(status_code=500, detail=f"Erro de Coluna Faltante: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+
+# --- Administração (Hot Reload & Shadow) ---
+class ReloadRequest(BaseModel):
+    path: Optional[str] = None  # Pickle ou diretório de artefato dentro de models/
+    target: str = "primary"     # "primary" ou "shadow"
+    shadow_threshold: float = SHADOW_THRESHOLD
+
+def check_admin(token):
+    if ADMIN_TOKEN and not secrets.compare_digest(token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Token de administração inválido")
+
+def resolve_model_path(path):
+    """Só aceita caminhos dentro de models/ (carregar pickle arbitrário executa código)."""
+    resolved = os.path.realpath(path if os.path.isabs(path) else os.path.join(MODELS_DIR, path))
+    if os.path.commonpath([resolved, os.path.realpath(MODELS_DIR)]) != os.path.realpath(MODELS_DIR):
+        raise HTTPException(status_code=400, detail="O modelo precisa estar dentro de models/")
+    if not os.path.exists(resolved):
+        raise HTTPException(status_code=404, detail=f"Modelo não encontrado: {path}")
+    return resolved
+
+@app.post("/admin/reload")
+async def reload_model(request: ReloadRequest, x_admin_token: Optional[str] = Header(None)):
+    """
+    Carrega e aquece um novo modelo em background (threadpool) enquanto o atual
+    continua atendendo, e só então troca a referência global.
+    """
+    check_admin(x_admin_token)
+    if request.target not in ("primary", "shadow"):
+        raise HTTPException(status_code=400, detail="target deve ser 'primary' ou 'shadow'")
+    
+    default_source = serving.source if serving is not None else (MODEL_ARRAYS_PATH or MODEL_PATH)
+    path = resolve_model_path(request.path or default_source)
+    try:
+        if request.target == "shadow":
+            scorer = await run_in_threadpool(load_shadow_model, path, request.shadow_threshold)
+            return {"status": "shadow_loaded", "shadow": scorer.stats()}
+        
+        previous = serving
+        current = await run_in_threadpool(load_model, path)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Falha ao carregar modelo (o atual segue ativo): {str(e)}")
+    
+    print(f"🔄 Modelo trocado: v{previous.version if previous else '-'} -> v{current.version} ({path})")
+    return {"status": "reloaded", "model": current.describe()}
+
+@app.delete("/admin/shadow")
+def disable_shadow(x_admin_token: Optional[str] = Header(None)):
+    global shadow
+    check_admin(x_admin_token)
+    previous, shadow = shadow, None
+    if previous is not None:
+        previous.close()
+    return {"status": "shadow_disabled"}
+
+@app.get("/admin/status")
+def admin_status(x_admin_token: Optional[str] = Header(None)):
+    check_admin(x_admin_token)
+    return {
+        "model": serving.describe() if serving is not None else None,
+        "shadow": shadow.stats() if shadow is not None else None,
+    }
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,47 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+from common import SRC_PATH, timeit
+
+import os
+import tempfile
+
+import joblib
+import numpy as np
+
+from model_artifact import export_artifact, load_artifact
+
+MODELS_PATH = os.path.normpath(os.path.join(SRC_PATH, "../models"))
+
+def _size_kb(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 1024
+    return os.path.getsize(path) / 1024
+
+def run_artifact_benchmark(models=("challenger_model.pkl", "baseline_model.pkl")):
+    """Compara tempo de carga e tamanho em disco: pickle do sklearn vs artefato compacto."""
+    print("--- 📦 BENCHMARK: Pickle vs Artefato Compacto ---")
+    print(f"{'MODELO':<22} | {'FORMATO':<16} | {'DISCO (KB)':>10} | {'CARGA (ms)':>10}")
+    print("-" * 68)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in models:
+            pickle_path = os.path.join(MODELS_PATH, name)
+            model = joblib.load(pickle_path)
+            artifact_dir = os.path.join(tmp, name.replace(".pkl", ""))
+            export_artifact(model, artifact_dir)
+            
+            # Sanidade: o artefato reproduz as probabilidades do modelo
+            X = np.random.default_rng(0).standard_normal((1000, len(model.feature_names_in_)))
+            reference = model.predict_proba(X)
+            if not np.allclose(load_artifact(artifact_dir).predict_proba(X), reference, rtol=0, atol=1e-12):
+                raise ValueError(f"ERRO: artefato de {name} divergiu do pickle.")
+            
+            rows = [
+                ("pickle (joblib)", _size_kb(pickle_path), timeit(lambda: joblib.load(pickle_path))),
+                ("artefato", _size_kb(artifact_dir), timeit(lambda: load_artifact(artifact_dir))),
+                ("artefato (mmap)", _size_kb(artifact_dir), timeit(lambda: load_artifact(artifact_dir, mmap_mode='r'))),
+            ]
+            for fmt, size_kb, seconds in rows:
+                print(f"{name:<22} | {fmt:<16} | {size_kb:>10,.0f} | {seconds * 1e3:>10.2f}")
+
+if __name__ == "__main__":
+    run_artifact_benchmark()
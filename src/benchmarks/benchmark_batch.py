@@ -0,0 +1,33 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+from common import load_transactions, timeit
+
+import app as api
+
+def run_batch_benchmark(batch_sizes=(1, 10, 100, 500, 1000)):
+    """
+    Compara a vazão (transações/s) de /predict em loop contra /predict/batch.
+    Chama as funções das rotas diretamente para isolar o custo de inferência
+    do transporte HTTP.
+    """
+    print("--- ⚡ BENCHMARK: /predict (loop) vs /predict/batch ---")
+    api.load_model(api.MODEL_PATH)
+    api.score_cache = None  # As repetições pontuam as mesmas linhas: sem cache, mede inferência (não acertos)
+    
+    print(f"{'LOTE':>6} | {'LOOP (tx/s)':>12} | {'BATCH (tx/s)':>12} | {'GANHO':>7}")
+    print("-" * 48)
+    
+    for size in batch_sizes:
+        transactions = [api.TransactionRequest(**p) for p in load_transactions(size)]
+        
+        t_loop = timeit(lambda: [api.score_transaction(t) for t in transactions], repeat=3)
+        t_batch = timeit(lambda: api.predict_batch(transactions), repeat=3)
+        
+        # Sanidade: as duas rotas precisam devolver as mesmas decisões
+        loop_out = [api.score_transaction(t) for t in transactions]
+        if loop_out != api.predict_batch(transactions):
+            raise ValueError("ERRO: /predict/batch divergiu de /predict.")
+        
+        print(f"{size:>6} | {size / t_loop:>12,.0f} | {size / t_batch:>12,.0f} | {t_loop / t_batch:>6.1f}x")
+
+if __name__ == "__main__":
+    run_batch_benchmark()
@@ -0,0 +1,52 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+
+import os
+import time
+import resource
+import tempfile
+import multiprocessing
+
+import pandas as pd
+
+import clean_data
+
+def _run_mode(args):
+    # Processo novo (spawn) por modo: ru_maxrss mede só esta execução
+    mode, trusted_path, bucket_rows = args
+    clean_data.TRUSTED_PATH = trusted_path
+    start = time.perf_counter()
+    if mode == "out_of_core":
+        clean_data.clean_and_split_data_out_of_core(bucket_rows=bucket_rows)
+    else:
+        clean_data.clean_and_split_data()
+    elapsed = time.perf_counter() - start
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_clean_benchmark(bucket_rows=50_000):
+    """Paridade (Train/Test idênticos) e tempo/pico de RSS: em memória vs out-of-core."""
+    print("--- 🧹 BENCHMARK: Limpeza + split (em memória vs out-of-core) ---")
+    if not os.path.exists(clean_data.SILVER_FILE):
+        print(f"❌ Silver não encontrada: {clean_data.SILVER_FILE}")
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for mode in ("in_memory", "out_of_core"):
+            trusted_path = os.path.join(tmp, mode) + os.sep
+            with ctx.Pool(1) as pool:
+                results[mode] = pool.apply(_run_mode, ((mode, trusted_path, bucket_rows),))
+
+        # 1. Paridade: mesmas linhas, na mesma ordem, nos dois arquivos
+        for split in ("train_data.parquet", "test_data.parquet"):
+            expected = pd.read_parquet(os.path.join(tmp, "in_memory", split))
+            actual = pd.read_parquet(os.path.join(tmp, "out_of_core", split))
+            pd.testing.assert_frame_equal(expected.reset_index(drop=True), actual.reset_index(drop=True))
+        print("✅ Paridade confirmada: Train/Test idênticos nos dois modos.")
+
+    # 2. Tempo e memória
+    for mode, (elapsed, peak_mb) in results.items():
+        print(f"{mode:<12} | {elapsed:6.2f}s | pico RSS {peak_mb:7.0f} MB")
+
+if __name__ == "__main__":
+    run_clean_benchmark()
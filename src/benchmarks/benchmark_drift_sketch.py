@@ -0,0 +1,47 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+from common import timeit, read_gold, gold_exists
+
+import numpy as np
+import pandas as pd
+from scipy.stats import ks_2samp
+
+from reference_sketch import ReferenceDistribution, FEATURES_TO_MONITOR, REFERENCE_POINTS
+
+def synthetic_reference(n, seed=42):
+    """Features monitoradas com a escala do dataset original (PCA ~ N(0,1), amount lognormal)."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.standard_normal((n, 5)), columns=['v14', 'v17', 'v12', 'v4', 'v11'])
+    df['amount_log'] = np.log(np.round(rng.lognormal(3.0, 1.5, n), 2) + 1)
+    df['is_night'] = (rng.random(n) < 0.3).astype(int)
+    return df[FEATURES_TO_MONITOR]
+
+def run_drift_sketch_benchmark(window_rows=5_000, sizes=(200_000, 2_000_000)):
+    """Erro do KS (sketch vs ks_2samp exato, limite 1/m) e tempo por janela em função do tamanho do treino."""
+    print("--- 🔍 BENCHMARK: Drift (ks_2samp no treino completo vs sketch de referência) ---")
+    datasets = [(f"sintético {n:,}", synthetic_reference(n)) for n in sizes]
+    if gold_exists("train"):
+        datasets.insert(0, ("Gold train", read_gold("train", columns=FEATURES_TO_MONITOR)))
+
+    for label, ref_df in datasets:
+        rng = np.random.default_rng(0)
+        window = ref_df.sample(n=window_rows, random_state=1) + rng.normal(0, 0.05, (window_rows, len(FEATURES_TO_MONITOR)))
+        sketches = {f: ReferenceDistribution.from_values(ref_df[f].to_numpy(), REFERENCE_POINTS) for f in FEATURES_TO_MONITOR}
+
+        # 1. Erro contra a estatística exata
+        worst = 0.0
+        for f in FEATURES_TO_MONITOR:
+            exact = ks_2samp(ref_df[f].to_numpy(), window[f].to_numpy()).statistic
+            approx, _ = sketches[f].ks(window[f].to_numpy())
+            if abs(approx - exact) > sketches[f].error_bound + 1e-12:
+                raise ValueError(f"ERRO: KS fora do limite em {f} ({approx:.5f} vs {exact:.5f})")
+            worst = max(worst, abs(approx - exact))
+
+        # 2. Tempo por verificação (todas as features)
+        t_exact = timeit(lambda: [ks_2samp(ref_df[f].to_numpy(), window[f].to_numpy()) for f in FEATURES_TO_MONITOR], repeat=3)
+        t_sketch = timeit(lambda: [(sketches[f].ks(window[f].to_numpy()), sketches[f].psi(window[f].to_numpy()))
+                                   for f in FEATURES_TO_MONITOR], repeat=3)
+        print(f"{label:<20} | exato {t_exact * 1e3:8.1f} ms | sketch (KS + PSI) {t_sketch * 1e3:6.1f} ms"
+              f" | speedup {t_exact / t_sketch:6.1f}x | maior erro KS {worst:.5f} (limite {1 / REFERENCE_POINTS:.4f})")
+
+if __name__ == "__main__":
+    run_drift_sketch_benchmark()
@@ -0,0 +1,77 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+
+import os
+import time
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import eda_analysis
+
+def legacy_ranking(df, cols):
+    """Implementação original de eda_analysis.py: três cópias filtradas por coluna."""
+    ranking = []
+    for col in cols:
+        mean_fraud = df[df['class'] == 1][col].mean()
+        mean_legit = df[df['class'] == 0][col].mean()
+        std_legit = df[df['class'] == 0][col].std()
+        divergence = abs(mean_fraud - mean_legit) / (std_legit + 1e-6)
+        ranking.append({'feature': col, 'divergence': divergence})
+    return pd.DataFrame(ranking).sort_values(by='divergence', ascending=False)
+
+def legacy_eda(reports_path):
+    """Script original de ponta a ponta: ranking em loop e figuras em sequência, KDE com todas as linhas."""
+    os.makedirs(reports_path, exist_ok=True)
+    df = pd.read_parquet(eda_analysis.TRAIN_PATH)
+    df['class'] = df['class'].astype(int)
+    df['hour'] = eda_analysis.compute_hour(df['time'])
+    eda_analysis.plot_temporal_distribution(df, reports_path)
+    eda_analysis.plot_amount_distribution(df, reports_path)
+    cols = [c for c in df.columns if c not in ['class', 'time', 'hour']]
+    top_features = list(legacy_ranking(df, cols).head(3)['feature'].values)
+    eda_analysis.plot_top_features(df, top_features, reports_path)
+
+def _run_mode(args):
+    # Processo novo (spawn, não-daemon: o motor abre o próprio pool) por modo: mesma condição de partida (imports, caches do matplotlib)
+    mode, reports_path = args
+    start = time.perf_counter()
+    if mode == "original":
+        legacy_eda(reports_path)
+    else:
+        eda_analysis.perform_eda(reports_path=reports_path)
+    return time.perf_counter() - start
+
+def run_eda_benchmark():
+    """Paridade do ranking e tempo de ponta a ponta (script original vs motor novo) no treino completo."""
+    print("--- 📊 BENCHMARK: EDA (script original vs passada agrupada + figuras em paralelo) ---")
+    if not os.path.exists(eda_analysis.TRAIN_PATH):
+        print(f"❌ Treino não encontrado: {eda_analysis.TRAIN_PATH}")
+        return
+
+    # 1. Paridade do ranking (mesmas features, mesma ordem, mesmos valores)
+    df = pd.read_parquet(eda_analysis.TRAIN_PATH)
+    df['class'] = df['class'].astype(int)
+    cols = [c for c in df.columns if c not in ['class', 'time']]
+    expected = legacy_ranking(df, cols)
+    actual = eda_analysis.separation_ranking(df, cols)
+    if list(expected['feature']) != list(actual['feature']) or not np.allclose(
+            expected['divergence'].to_numpy(), actual['divergence'].to_numpy(), rtol=1e-9):
+        raise ValueError("ERRO: ranking divergente")
+    print(f"✅ Paridade do ranking ({len(cols)} features, {len(df)} linhas)")
+
+    # 2. Tempo de ponta a ponta
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("original", "engine"):
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                results[mode] = pool.submit(_run_mode, (mode, os.path.join(tmp, mode) + os.sep)).result()
+    for mode, elapsed in results.items():
+        print(f"{mode:<9} | {elapsed:6.2f}s")
+    print(f"Speedup: {results['original'] / results['engine']:.1f}x")
+
+if __name__ == "__main__":
+    run_eda_benchmark()
@@ -0,0 +1,51 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+from common import load_transactions, timeit
+
+import numpy as np
+
+import app as api
+
+def run_fast_path_benchmark(n_transactions=2000):
+    """
+    Paridade e micro-benchmark do fast path sem pandas (TransactionRowEncoder)
+    contra o caminho original via DataFrame em /predict (score_transaction).
+    """
+    print("--- 🏎️ BENCHMARK: Fast path vs DataFrame em /predict ---")
+    current = api.load_model(api.MODEL_PATH)
+    api.score_cache = None  # As repetições pontuam as mesmas linhas: sem cache, mede inferência (não acertos)
+    if current.encoder is None:
+        print("❌ Fast path inativo (requer o motor FlatForest).")
+        return
+    
+    fast_encoder = current.encoder
+    transactions = [api.TransactionRequest(**p) for p in load_transactions(n_transactions)]
+    
+    # 1. Paridade: mesmas features (ordem e valores) e mesma probabilidade
+    for t in transactions:
+        row_fast = fast_encoder.encode(t).copy()
+        row_df = api.dataframe_features(t, current.feature_names).to_numpy(dtype=np.float64)
+        if not np.allclose(row_fast, row_df, rtol=0, atol=1e-12):
+            raise ValueError(f"ERRO: features divergentes para {t}")
+        if not np.array_equal(current.predictor.predict_proba(row_fast), current.predictor.predict_proba(row_df)):
+            raise ValueError(f"ERRO: probabilidades divergentes para {t}")
+    print(f"✅ Paridade confirmada em {n_transactions} transações.")
+    
+    # 2. Latência por requisição (média do melhor de 5 rodadas)
+    def per_call_us(func):
+        return timeit(lambda: [func(t) for t in transactions]) / n_transactions * 1e6
+    
+    encode_fast = per_call_us(fast_encoder.encode)
+    encode_df = per_call_us(lambda t: api.dataframe_features(t, current.feature_names))
+    
+    predict_fast = per_call_us(api.score_transaction)
+    current.encoder = None
+    predict_df = per_call_us(api.score_transaction)
+    current.encoder = fast_encoder
+    
+    print(f"\n{'ETAPA':<22} | {'DATAFRAME (µs)':>14} | {'FAST (µs)':>10} | {'GANHO':>7}")
+    print("-" * 62)
+    print(f"{'Features':<22} | {encode_df:>14.1f} | {encode_fast:>10.1f} | {encode_df / encode_fast:>6.1f}x")
+    print(f"{'predict_fraud total':<22} | {predict_df:>14.1f} | {predict_fast:>10.1f} | {predict_df / predict_fast:>6.1f}x")
+
+if __name__ == "__main__":
+    run_fast_path_benchmark()
@@ -0,0 +1,69 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+
+import time
+import resource
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import feature_cache
+from gold_dataset import read_gold, gold_exists
+
+# Padrões de acesso dos scripts: quais splits cada um carrega
+PATTERNS = {
+    "train_challenger": ("train", "test"),
+    "evaluate": ("test",),
+    "tune_challenger (por worker)": ("train",),
+}
+
+def load_gold(split):
+    """Carga original dos scripts: Gold inteira em memória e drop de 'class'/'time'."""
+    df = read_gold(split)
+    return df.drop(columns=['class', 'time']).to_numpy(), df['class'].to_numpy()
+
+def load_cache(split):
+    features = feature_cache.load_features(split)
+    return features.X, features.y
+
+def _run_pattern(args):
+    # Processo novo (spawn) por medição: RSS de pico isolado, sem herdar páginas do processo pai
+    mode, splits = args
+    loader = load_cache if mode == "cache" else load_gold
+    start = time.perf_counter()
+    checksum = 0.0
+    for split in splits:
+        X, y = loader(split)
+        checksum += float(np.asarray(X[:, 0], dtype=np.float64).sum()) + int(y.sum())  # Toca os dados (mmap é preguiçoso)
+    elapsed = time.perf_counter() - start
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, checksum
+
+def run_feature_cache_benchmark():
+    """Tempo de carga e pico de RSS por padrão de script: Gold (Parquet) vs cache de features (mmap)."""
+    print("--- 🧊 BENCHMARK: CACHE DE FEATURES (Gold Parquet vs .npy float32 com mmap) ---")
+    if not (gold_exists("train") and gold_exists("test")):
+        print("❌ Camada Gold não encontrada. Rode src/feature_engineering.py antes.")
+        return
+
+    # Materializa o cache fora da medição (custo único, pago só quando a Gold muda)
+    start = time.perf_counter()
+    for split in ("train", "test"):
+        feature_cache.load_features(split)
+    print(f"Cache pronto em {time.perf_counter() - start:.2f}s")
+
+    ctx = multiprocessing.get_context("spawn")
+    print(f"\n{'PADRÃO':<30} | {'MODO':<6} | {'CARGA (s)':>9} | {'PICO RSS (MB)':>13}")
+    print("-" * 70)
+    for name, splits in PATTERNS.items():
+        results = {}
+        for mode in ("gold", "cache"):
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                results[mode] = pool.submit(_run_pattern, (mode, splits)).result()
+            elapsed, peak_rss, _ = results[mode]
+            print(f"{name:<30} | {mode:<6} | {elapsed:9.3f} | {peak_rss:13.0f}")
+        if not np.isclose(results["gold"][2], results["cache"][2], rtol=1e-5):
+            raise ValueError(f"ERRO: dados divergentes entre Gold e cache ({name})")
+        print(f"{'':<30} | speedup {results['gold'][0] / results['cache'][0]:.1f}x")
+
+if __name__ == "__main__":
+    run_feature_cache_benchmark()
@@ -0,0 +1,95 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+from common import timeit
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering import (
+    FraudFeatureEngineer, compute_hour, compute_is_night, compute_amount_log, compute_features_scalar
+)
+
+# --- Implementações Legadas (referência de paridade) ---
+# Cópias fiéis das versões com .apply que existiam em feature_engineering.py, app.py,
+# export_powerbi.py e eda_analysis.py antes do módulo único.
+def legacy_feature_engineering(X):
+    X = X.copy()
+    X['hour'] = X['time'].apply(lambda x: np.floor(x / 3600)) % 24
+    X['is_night'] = X['hour'].apply(lambda x: 1 if x <= 6 else 0)
+    X['amount_log'] = np.log(X['amount'] + 0.001)
+    return X
+
+def legacy_app(X):
+    X = X.copy()
+    X['hour'] = X['time'].apply(lambda x: np.floor(x / 3600) % 24)
+    X['is_night'] = X['hour'].apply(lambda x: 1 if x <= 6 else 0)
+    X['amount_log'] = np.log(X['amount'] + 0.001)
+    return X
+
+def legacy_powerbi_hour(X):
+    return ((X['time'] // 3600) % 24).astype(int)
+
+def make_frame(n, seed=42):
+    rng = np.random.default_rng(seed)
+    # Inclui bordas: meia-noite, 6h exatas, 7h, valor zero e tempos além de 24h
+    edges = np.array([0.0, 6 * 3600.0, 7 * 3600 - 1e-6, 7 * 3600.0, 86399.999, 86400.0, 172792.0])
+    time = np.concatenate([edges, rng.uniform(0, 172800, max(n - len(edges), 0))])[:n]
+    amount = np.concatenate([[0.0, 0.01, 1.0], np.round(rng.lognormal(3.0, 1.5, max(n - 3, 0)), 2)])[:n]
+    return pd.DataFrame({'time': time, 'amount': amount})
+
+def check_parity(n=100_000):
+    """Suíte de paridade: o módulo único precisa reproduzir todas as versões legadas."""
+    df = make_frame(n)
+    new = FraudFeatureEngineer().transform(df)
+    
+    pd.testing.assert_frame_equal(new, legacy_feature_engineering(df))
+    pd.testing.assert_frame_equal(new, legacy_app(df))
+    pd.testing.assert_series_equal(new['hour'].astype(int), legacy_powerbi_hour(df), check_names=False)
+    
+    # Kernels funcionam também direto em arrays NumPy
+    np.testing.assert_array_equal(compute_hour(df['time'].to_numpy()), new['hour'].to_numpy())
+    np.testing.assert_array_equal(compute_is_night(new['hour'].to_numpy()), new['is_night'].to_numpy())
+    np.testing.assert_array_equal(compute_amount_log(df['amount'].to_numpy()), new['amount_log'].to_numpy())
+    
+    # Versão escalar do fast path da API
+    for t, a, h, night, log_a in zip(df['time'][:5000], df['amount'][:5000], new['hour'], new['is_night'], new['amount_log']):
+        s_hour, s_night, s_log = compute_features_scalar(t, a)
+        if s_hour != h or s_night != night or not np.isclose(s_log, log_a, rtol=0, atol=1e-12):
+            raise ValueError(f"ERRO: versão escalar divergiu em time={t}, amount={a}")
+    
+    # Bordas fora do contrato da API (NaN, infinitos, valores negativos): mesma semântica do NumPy
+    edge = pd.DataFrame({
+        'time': [np.nan, np.inf, -np.inf, -3600.0, 1e300, 0.0, 0.0, 0.0, 0.0],
+        'amount': [1.0, 1.0, 1.0, 1.0, 1.0, -0.001, -5.0, np.nan, np.inf],
+    })
+    with np.errstate(invalid='ignore', divide='ignore'):
+        expected = FraudFeatureEngineer().transform(edge)
+    for t, a, h, night, log_a in zip(edge['time'], edge['amount'], expected['hour'], expected['is_night'],
+                                     expected['amount_log']):
+        s_hour, s_night, s_log = compute_features_scalar(t, a)
+        if not (np.array_equal([s_hour, s_log], [h, log_a], equal_nan=True) and s_night == night):
+            raise ValueError(f"ERRO: versão escalar divergiu na borda time={t}, amount={a}")
+    
+    print(f"✅ Paridade confirmada ({n} linhas + {len(edge)} bordas): treino, API, Power BI, EDA e fast path.")
+
+def run_features_benchmark(sizes=(10**3, 10**4, 10**5, 10**6, 10**7), legacy_max_rows=10**6):
+    print("--- 🧮 BENCHMARK: Feature Engineering (kernels NumPy vs .apply) ---")
+    check_parity()
+    
+    engineer = FraudFeatureEngineer()
+    print(f"\n{'LINHAS':>10} | {'APPLY (linhas/s)':>17} | {'NUMPY (linhas/s)':>17} | {'GANHO':>7}")
+    print("-" * 62)
+    
+    for n in sizes:
+        df = make_frame(n)
+        repeat = 3 if n < 10**7 else 1
+        t_new = timeit(lambda: engineer.transform(df), repeat=repeat)
+        
+        # O caminho legado fica inviável em 10^7 linhas; medimos só até legacy_max_rows
+        if n <= legacy_max_rows:
+            t_old = timeit(lambda: legacy_feature_engineering(df), repeat=1)
+            print(f"{n:>10,} | {n / t_old:>17,.0f} | {n / t_new:>17,.0f} | {t_old / t_new:>6.1f}x")
+        else:
+            print(f"{n:>10,} | {'-':>17} | {n / t_new:>17,.0f} | {'-':>7}")
+
+if __name__ == "__main__":
+    run_features_benchmark()
@@ -0,0 +1,45 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+from common import load_transactions, timeit
+
+import numpy as np
+import pandas as pd
+import joblib
+
+import app as api
+from forest_engine import FlatForest
+from feature_engineering import FraudFeatureEngineer
+
+def run_forest_engine_benchmark(batch_sizes=(1, 10, 100, 1000, 10000)):
+    """
+    Valida a paridade bit a bit do FlatForest contra RandomForestClassifier.predict_proba
+    e compara a latência das duas implementações para linha única e lotes.
+    """
+    print("--- 🌲 BENCHMARK: FlatForest vs sklearn predict_proba ---")
+    model = joblib.load(api.MODEL_PATH)
+    # Acúmulo sequencial no sklearn: mesma ordem de soma das árvores que o FlatForest usa
+    model.set_params(n_jobs=1)
+    engine = FlatForest.from_model(model)
+    print(f"Árvores: {engine.n_trees} | Nós por árvore (máx): {engine.max_nodes} | Profundidade: {engine.max_depth}")
+    
+    engineer = FraudFeatureEngineer()
+    
+    print(f"\n{'LOTE':>6} | {'SKLEARN (ms)':>12} | {'FLAT (ms)':>10} | {'GANHO':>7}")
+    print("-" * 46)
+    
+    for size in batch_sizes:
+        df = engineer.transform(pd.DataFrame(load_transactions(size)))
+        X = df[model.feature_names_in_]
+        X_np = X.to_numpy()
+        
+        # Paridade: probabilidades idênticas bit a bit
+        if not np.array_equal(model.predict_proba(X), engine.predict_proba(X_np)):
+            raise ValueError(f"ERRO: FlatForest divergiu do sklearn (lote {size}).")
+        
+        t_sklearn = timeit(lambda: model.predict_proba(X))
+        t_flat = timeit(lambda: engine.predict_proba(X_np))
+        print(f"{size:>6} | {t_sklearn * 1e3:>12.3f} | {t_flat * 1e3:>10.3f} | {t_sklearn / t_flat:>6.1f}x")
+    
+    print("\n✅ Paridade bit a bit confirmada em todos os lotes.")
+
+if __name__ == "__main__":
+    run_forest_engine_benchmark()
@@ -0,0 +1,96 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+from common import SRC_PATH
+
+import os
+import sys
+import time
+import resource
+import tempfile
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(SRC_PATH, "data"))
+from ingestion_silver import RAW_PATH, ingest_to_silver, ingest_to_silver_streaming, silver_dtype
+
+def build_scaled_csv(raw_path, scale, output_path):
+    """Replica as linhas do CSV bruto `scale` vezes (simula um mês de transações)."""
+    with open(raw_path, 'rb') as f:
+        header = f.readline()
+        body = f.read()
+    if not body.endswith(b"\n"):
+        body += b"\n"
+    with open(output_path, 'wb') as f:
+        f.write(header)
+        for _ in range(scale):
+            f.write(body)
+
+def _run_mode(args):
+    # Executado em um processo novo (spawn): ru_maxrss mede só esta ingestão
+    mode, raw_path, output_file = args
+    start = time.perf_counter()
+    if mode == "streaming":
+        ingest_to_silver_streaming(raw_path, output_file)
+    else:
+        ingest_to_silver(raw_path, output_file)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB no Linux
+    return elapsed, peak_mb
+
+def measure(mode, raw_path, output_file):
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(_run_mode, ((mode, raw_path, output_file),))
+
+def check_parity(pandas_file, streaming_file):
+    """Mesmas colunas e valores; a Silver em streaming só difere pelo schema explícito."""
+    df_pandas = pd.read_parquet(pandas_file)
+    df_stream = pd.read_parquet(streaming_file)
+    if list(df_pandas.columns) != list(df_stream.columns) or len(df_pandas) != len(df_stream):
+        raise ValueError("ERRO: colunas ou número de linhas divergentes")
+    for col in df_pandas.columns:
+        if str(df_stream[col].dtype) != silver_dtype(col):
+            raise ValueError(f"ERRO: coluna {col} com dtype {df_stream[col].dtype}")
+        expected = df_pandas[col].to_numpy().astype(silver_dtype(col))
+        # float32 direto do texto vs float64 -> float32: no máximo 1 ulp (arredondamento duplo)
+        if expected.dtype.kind == 'f':
+            np.testing.assert_array_max_ulp(expected, df_stream[col].to_numpy(), maxulp=1)
+        elif not np.array_equal(expected, df_stream[col].to_numpy()):
+            raise ValueError(f"ERRO: coluna {col} divergente")
+
+def run_ingestion_benchmark(scales=(1, 4, 16)):
+    """Tempo total e pico de RSS: pd.read_csv completo vs leitura em record batches."""
+    print("--- 🚰 BENCHMARK: Ingestão Silver (pandas vs streaming) ---")
+    if not os.path.exists(RAW_PATH):
+        print(f"❌ CSV bruto não encontrado: {RAW_PATH}")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            raw_path = RAW_PATH
+            if scale > 1:
+                raw_path = os.path.join(tmp, f"creditcard_x{scale}.csv")
+                build_scaled_csv(RAW_PATH, scale, raw_path)
+            csv_mb = os.path.getsize(raw_path) / 1024 ** 2
+
+            pandas_file = os.path.join(tmp, "silver_pandas.parquet")
+            streaming_file = os.path.join(tmp, "silver_streaming.parquet")
+            t_pandas, rss_pandas = measure("pandas", raw_path, pandas_file)
+            t_stream, rss_stream = measure("streaming", raw_path, streaming_file)
+
+            if scale == 1:
+                check_parity(pandas_file, streaming_file)
+                print("✅ Paridade confirmada (valores iguais ao cast do schema explícito, tolerância de 1 ulp).")
+
+            print(f"CSV x{scale:<3} ({csv_mb:8.0f} MB) | pandas: {t_pandas:6.1f}s pico {rss_pandas:7.0f} MB"
+                  f" | streaming: {t_stream:6.1f}s pico {rss_stream:7.0f} MB"
+                  f" | Parquet: {os.path.getsize(pandas_file) / 1024 ** 2:.0f} MB vs {os.path.getsize(streaming_file) / 1024 ** 2:.0f} MB")
+
+            for path in (pandas_file, streaming_file):
+                os.remove(path)
+            if raw_path != RAW_PATH:
+                os.remove(raw_path)
+
+if __name__ == "__main__":
+    run_ingestion_benchmark()
@@ -0,0 +1,274 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+from common import load_transactions
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import httpx
+
+REPORT_PATH = os.path.join(common.SRC_PATH, "../reports/load_test.json")
+
+SLA_MS = 100.0           # SLA de inferência prometido no README
+MAX_REGRESSION = 0.10    # --compare: piora aceita (10%) no p99 e na vazão
+ENDPOINTS = ("/predict", "/predict/batch")  # /predict/batch recebe uma lista: cada requisição vira um lote de 1
+
+def start_inprocess_server(port, score_cache=False):
+    """
+    Sobe a API (app.py) com uvicorn em uma thread deste processo; retorna após o lifespan (modelo carregado).
+    Sem `score_cache`, o cache de decisões fica desligado: toda requisição paga a inferência.
+    """
+    if not score_cache:
+        os.environ["FRAUD_SCORE_CACHE_SIZE"] = "0"  # Lido no import do app
+    import uvicorn
+    import app as app_module
+
+    server = uvicorn.Server(uvicorn.Config(app_module.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 120
+    while not server.started:
+        if not thread.is_alive() or time.time() > deadline:
+            raise RuntimeError("API não subiu (veja o log do uvicorn acima).")
+        time.sleep(0.05)
+    return server, thread
+
+class LoadResult:
+    """Latência (ms), repetição de payload e status de cada requisição medida."""
+    def __init__(self):
+        self.latencies = []
+        self.repeats = []
+        self.statuses = {}
+
+async def _send(client, url, payloads, index, result, scheduled=None):
+    """
+    Requisição número `index` (o payload cicla após `len(payloads)`: repetições são acertos
+    esperados do cache de decisões). Latência medida desde o envio planejado (sem omissão
+    coordenada em taxa fixa).
+    """
+    start = scheduled if scheduled is not None else time.perf_counter()
+    try:
+        response = await client.post(url, json=payloads[index % len(payloads)])
+        status = response.status_code
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    result.latencies.append((time.perf_counter() - start) * 1e3)
+    result.repeats.append(index >= len(payloads))
+    result.statuses[status] = result.statuses.get(status, 0) + 1
+
+async def closed_loop(client, url, payloads, indices, concurrency, result):
+    """`concurrency` clientes enviando em sequência, cada um esperando a resposta anterior."""
+    counter = iter(indices)
+
+    async def worker():
+        for i in counter:
+            await _send(client, url, payloads, i, result)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+async def open_loop(client, url, payloads, indices, concurrency, rate, result):
+    """Chegadas a `rate` req/s (independente das respostas), com no máximo `concurrency` em voo."""
+    limit = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+
+    async def fire(i, scheduled):
+        async with limit:
+            await _send(client, url, payloads, i, result, scheduled)
+
+    tasks = []
+    for n, i in enumerate(indices):
+        scheduled = start + n / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(fire(i, scheduled)))
+    await asyncio.gather(*tasks)
+
+async def run_load(base_url, endpoint, payloads, n_requests, concurrency, rate=None, warmup=200):
+    """
+    Aquecimento + carga. Os índices dos payloads continuam do aquecimento para a carga,
+    então, com payloads suficientes, nenhuma transação se repete.
+    Retorna (LoadResult, duração em s, /health, /cache/stats antes e depois).
+    """
+    url = f"{base_url}{endpoint}"
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        health = (await client.get(f"{base_url}/health")).json()
+        await closed_loop(client, url, payloads, range(warmup), concurrency, LoadResult())
+
+        cache_before = (await client.get(f"{base_url}/cache/stats")).json()
+        result = LoadResult()
+        indices = range(warmup, warmup + n_requests)
+        start = time.perf_counter()
+        if rate:
+            await open_loop(client, url, payloads, indices, concurrency, rate, result)
+        else:
+            await closed_loop(client, url, payloads, indices, concurrency, result)
+        duration = time.perf_counter() - start
+        cache_after = (await client.get(f"{base_url}/cache/stats")).json()
+        return result, duration, health, (cache_before, cache_after)
+
+def latency_summary(latencies):
+    latencies = np.asarray(latencies)
+    if len(latencies) == 0:
+        return None
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "requests": int(len(latencies)),
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(latencies.max()), 3),
+        "mean": round(float(latencies.mean()), 3),
+    }
+
+def cache_summary(cache_before, cache_after):
+    """Acertos/faltas do cache de decisões do servidor durante a carga (pelo /cache/stats)."""
+    if not cache_after.get("enabled"):
+        return {"enabled": False}
+    hits = cache_after["hits"] - cache_before["hits"]
+    misses = cache_after["misses"] - cache_before["misses"]
+    return {"enabled": True, "hits": hits, "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0}
+
+def gate_latency(report):
+    """Latência usada no SLA e no --compare: só requisições que pagam a inferência (faltas do cache)."""
+    return report["latency_ms_by_cache"]["miss"] or report["latency_ms"]
+
+def build_report(result, duration, config, health, cache_stats, sla_ms=SLA_MS):
+    """
+    Vazão, percentis de latência e taxa de erro (qualquer status diferente de 200).
+    Com o cache de decisões ativo, a latência também sai separada entre payloads
+    inéditos (faltas, inferência) e repetidos (acertos esperados).
+    """
+    latencies = np.asarray(result.latencies)
+    repeats = np.asarray(result.repeats, dtype=bool)
+    cache = cache_summary(*cache_stats)
+    errors = sum(count for status, count in result.statuses.items() if status != 200)
+    by_cache = {"miss": latency_summary(latencies[~repeats]) if cache["enabled"] else latency_summary(latencies),
+                "hit": latency_summary(latencies[repeats]) if cache["enabled"] else None}
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "config": config,
+        "server": health,
+        "requests": int(len(latencies)),
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(latencies) / duration, 1),
+        "latency_ms": latency_summary(latencies),
+        "latency_ms_by_cache": by_cache,
+        "score_cache": cache,
+        "errors": int(errors),
+        "error_rate": round(errors / len(latencies), 6),
+        "status_codes": {str(status): count for status, count in sorted(result.statuses.items(), key=str)},
+        "sla_ms": sla_ms,
+    }
+    report["sla_ok"] = bool(gate_latency(report)["p99"] <= sla_ms and errors == 0)
+    return report
+
+def compare_reports(previous, current, max_regression=MAX_REGRESSION):
+    """Regressões do relatório atual contra um anterior (p99 das faltas do cache, vazão, taxa de erro)."""
+    regressions = []
+    old_p99, new_p99 = gate_latency(previous)["p99"], gate_latency(current)["p99"]
+    if new_p99 > old_p99 * (1 + max_regression):
+        regressions.append(f"p99 {old_p99:.2f} -> {new_p99:.2f} ms (+{new_p99 / old_p99 - 1:.0%})")
+    old_rps, new_rps = previous["throughput_rps"], current["throughput_rps"]
+    if new_rps < old_rps * (1 - max_regression):
+        regressions.append(f"vazão {old_rps:,.0f} -> {new_rps:,.0f} req/s ({new_rps / old_rps - 1:.0%})")
+    if current["error_rate"] > previous["error_rate"]:
+        regressions.append(f"taxa de erro {previous['error_rate']:.4%} -> {current['error_rate']:.4%}")
+    return regressions
+
+def run_load_benchmark(url=None, port=8766, endpoint="/predict", n_requests=5000, concurrency=32, rate=None,
+                  warmup=200, sla_ms=SLA_MS, output=REPORT_PATH, compare=None, max_regression=MAX_REGRESSION,
+                  payload_rows=None, score_cache=False):
+    """
+    Teste de carga da API contra o SLA. Retorna False se houver regressão contra `compare`.
+    Por padrão cada requisição usa uma transação diferente da Gold (payload_rows = aquecimento
+    + requisições) e a API em processo sobe sem cache de decisões: a latência é de inferência.
+    """
+    print("--- 🚦 TESTE DE CARGA: API de Fraude (SLA de latência) ---")
+    if endpoint not in ENDPOINTS:
+        raise ValueError(f"Rota não suportada: {endpoint} (use {ENDPOINTS})")
+    payloads = load_transactions(payload_rows or warmup + n_requests)
+    if endpoint == "/predict/batch":
+        payloads = [[payload] for payload in payloads]
+
+    server = thread = None
+    if url is None:
+        print(f"Subindo app.py em processo (uvicorn, 127.0.0.1:{port}, cache de decisões "
+              f"{'ligado' if score_cache else 'desligado'})...")
+        server, thread = start_inprocess_server(port, score_cache)
+        url = f"http://127.0.0.1:{port}"
+    try:
+        mode = f"taxa fixa de {rate:,.0f} req/s" if rate else "laço fechado"
+        print(f"Alvo: {url}{endpoint} | {n_requests} requisições | concorrência {concurrency} | {mode} "
+              f"| {len(payloads)} payloads")
+        result, duration, health, cache_stats = asyncio.run(
+            run_load(url, endpoint, payloads, n_requests, concurrency, rate, warmup))
+    finally:
+        if server is not None:
+            server.should_exit = True
+            thread.join(timeout=30)
+
+    config = {"url": url, "endpoint": endpoint, "in_process": server is not None, "requests": n_requests,
+              "concurrency": concurrency, "rate": rate, "warmup": warmup, "payload_rows": len(payloads)}
+    report = build_report(result, duration, config, health, cache_stats, sla_ms)
+
+    print(f"\nVazão: {report['throughput_rps']:,.1f} req/s | erros: {report['errors']} ({report['error_rate']:.2%})")
+    for label, latency in (("Latência", report["latency_ms"]),
+                           ("  faltas do cache", report["latency_ms_by_cache"]["miss"] if report["score_cache"]["enabled"] else None),
+                           ("  acertos do cache", report["latency_ms_by_cache"]["hit"])):
+        if latency:
+            print(f"{label} (ms, {latency['requests']} req): p50 {latency['p50']:.2f} | p95 {latency['p95']:.2f} | "
+                  f"p99 {latency['p99']:.2f} | máx {latency['max']:.2f}")
+    if report["score_cache"]["enabled"]:
+        print(f"Cache de decisões no servidor: {report['score_cache']['hits']} acertos | "
+              f"{report['score_cache']['misses']} faltas")
+    print(f"{'✅' if report['sla_ok'] else '❌'} SLA de {sla_ms:.0f} ms (p99 das requisições com inferência, sem erros)")
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    tmp_path = output + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, output)
+    print(f"Relatório salvo em: {output}")
+
+    if compare:
+        with open(compare, encoding="utf-8") as f:
+            regressions = compare_reports(json.load(f), report, max_regression)
+        for regression in regressions:
+            print(f"❌ Regressão: {regression}")
+        if not regressions:
+            print(f"✅ Sem regressão contra {compare} (tolerância {max_regression:.0%})")
+        return not regressions
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga da API de fraude (relatório JSON)")
+    parser.add_argument("--url", default=None, help="API já rodando (ex.: http://127.0.0.1:8000); padrão: sobe app.py em processo")
+    parser.add_argument("--port", type=int, default=8766, help="Porta da API em processo")
+    parser.add_argument("--endpoint", default="/predict", choices=ENDPOINTS,
+                        help="Rota pontuada (/predict/batch: uma transação por lote)")
+    parser.add_argument("--requests", type=int, default=5000, help="Requisições medidas (após o aquecimento)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requisições em voo (conexões)")
+    parser.add_argument("--rate", type=float, default=None, help="Taxa fixa em req/s (padrão: laço fechado)")
+    parser.add_argument("--warmup", type=int, default=200, help="Requisições de aquecimento (descartadas)")
+    parser.add_argument("--sla-ms", type=float, default=SLA_MS, help="SLA de latência p99")
+    parser.add_argument("--output", default=REPORT_PATH, help="Caminho do relatório JSON")
+    parser.add_argument("--compare", default=None, help="Relatório anterior: sai com código 1 se houver regressão")
+    parser.add_argument("--max-regression", type=float, default=MAX_REGRESSION, help="Piora aceita no --compare")
+    parser.add_argument("--payload-rows", type=int, default=None,
+                        help="Transações distintas, repetidas em ciclo (padrão: uma por requisição)")
+    parser.add_argument("--score-cache", action="store_true", help="Mantém o cache de decisões da API em processo")
+    args = parser.parse_args()
+
+    ok = run_load_benchmark(args.url, args.port, args.endpoint, args.requests, args.concurrency, args.rate,
+                       args.warmup, args.sla_ms, args.output, args.compare, args.max_regression,
+                       args.payload_rows, args.score_cache)
+    sys.exit(0 if ok else 1)
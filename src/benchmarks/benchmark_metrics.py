@@ -0,0 +1,54 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+from common import timeit
+
+from time import perf_counter_ns
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import ServingMetrics
+
+def instrumented_request(metrics):
+    """Mesmo custo de instrumentação de uma requisição em /predict: 5 relógios + 5 observações + 1 contador."""
+    t_request = perf_counter_ns()
+    t_entry = perf_counter_ns()
+    metrics.observe("parse", t_entry - t_request)
+    t_features = perf_counter_ns()
+    t_inference = perf_counter_ns()
+    metrics.observe("features", t_features - t_entry)
+    metrics.observe("inference", t_inference - t_features)
+    metrics.count_decision("APROVAR", "LOW")
+    t_done = perf_counter_ns()
+    metrics.observe("batch_wait", t_done - t_features)
+    metrics.observe("total", t_done - t_request)
+
+def run_metrics_benchmark(n_requests=200_000, n_threads=8):
+    """Overhead da instrumentação por requisição (sem modelo: só timers, histogramas e contadores)."""
+    print("--- ⏱️ BENCHMARK: Overhead da instrumentação de /predict ---")
+    metrics = ServingMetrics()
+
+    # 1. Uma thread (caminho quente do event loop)
+    baseline = timeit(lambda: [None for _ in range(n_requests)])
+    instrumented = timeit(lambda: [instrumented_request(metrics) for _ in range(n_requests)])
+    overhead_us = (instrumented - baseline) / n_requests * 1e6
+    print(f"1 thread : {overhead_us:.2f} µs/requisição")
+
+    # 2. Várias threads (threadpool do FastAPI): cada uma escreve no seu shard, sem lock
+    per_thread = n_requests // n_threads
+    def worker(_):
+        for _ in range(per_thread):
+            instrumented_request(metrics)
+
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        elapsed = timeit(lambda: list(pool.map(worker, range(n_threads))))
+    print(f"{n_threads} threads: {elapsed / (per_thread * n_threads) * 1e6:.2f} µs/requisição (vazão agregada, com GIL)")
+
+    # 3. Custo da leitura (/metrics)
+    render_ms = timeit(metrics.render_prometheus) * 1e3
+    print(f"render /metrics: {render_ms:.2f} ms")
+
+    if overhead_us > 5:
+        print(f"⚠️ Overhead acima de 5 µs/requisição ({overhead_us:.2f} µs)")
+    else:
+        print(f"✅ Overhead abaixo de 5 µs/requisição")
+
+if __name__ == "__main__":
+    run_metrics_benchmark()
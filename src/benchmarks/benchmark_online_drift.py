@@ -0,0 +1,35 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+from common import timeit
+
+import numpy as np
+
+from online_drift import OnlineDriftMonitor
+from reference_sketch import ReferenceDistribution, FEATURES_TO_MONITOR, load_reference_sketch
+
+def synthetic_sketch(n=200_000, seed=42):
+    rng = np.random.default_rng(seed)
+    features = {f: ReferenceDistribution.from_values(rng.standard_normal(n)) for f in FEATURES_TO_MONITOR}
+    features['is_night'] = ReferenceDistribution.from_values((rng.random(n) < 0.3).astype(float))
+    return {"created_at": "sintético", "features": features,
+            "score": ReferenceDistribution.from_values(rng.beta(1, 30, n))}
+
+def run_online_drift_benchmark(n_requests=100_000):
+    """Custo por requisição do monitor de drift online e custo de leitura do /drift."""
+    print("--- 📈 BENCHMARK: Drift online (histogramas por janela) ---")
+    sketch = load_reference_sketch() or synthetic_sketch()
+    monitor = OnlineDriftMonitor(sketch)
+    columns = list(range(len(FEATURES_TO_MONITOR)))
+    rng = np.random.default_rng(0)
+    rows = rng.standard_normal((n_requests, len(columns) + 23))
+    scores = rng.beta(1, 30, n_requests)
+
+    t_observe = timeit(lambda: [monitor.observe(row, columns, score) for row, score in zip(rows, scores)], repeat=3)
+    t_batch = timeit(lambda: monitor.observe_many(rows[:1000], columns, scores[:1000]))
+    t_report = timeit(lambda: monitor.report(monitor.windows))
+    print(f"observe (por requisição): {t_observe / n_requests * 1e6:.2f} µs")
+    print(f"observe_many (lote de 1000): {t_batch * 1e3:.2f} ms")
+    print(f"/drift (todas as janelas): {t_report * 1e3:.2f} ms | memória independe do tráfego"
+          f" ({sum(len(e) + 1 for e in monitor.edges)} contadores por janela por thread)")
+
+if __name__ == "__main__":
+    run_online_drift_benchmark()
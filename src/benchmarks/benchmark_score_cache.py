@@ -0,0 +1,42 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+from common import load_transactions, timeit
+
+import app as api
+from score_cache import ScoreCache
+
+def run_score_cache_benchmark(n_transactions=2000):
+    """
+    Latência de /predict (score_transaction) com o cache de decisões: faltas
+    (cache limpo antes de cada rodada, paga a inferência) contra acertos
+    (mesmas transações já em cache, como em retentativas do gateway).
+    """
+    print("--- 🗃️ BENCHMARK: Cache de decisões (falta vs acerto) ---")
+    api.load_model(api.MODEL_PATH)
+    transactions = [api.TransactionRequest(**p) for p in load_transactions(n_transactions)]
+
+    def per_call_us(setup):
+        def run():
+            setup()
+            for t in transactions:
+                api.score_transaction(t)
+        return timeit(run) / n_transactions * 1e6
+
+    api.score_cache = None
+    no_cache = per_call_us(lambda: None)
+
+    api.score_cache = ScoreCache(max(api.SCORE_CACHE_SIZE, n_transactions), api.SCORE_CACHE_TTL_SECONDS,
+                                 api.SCORE_CACHE_POLICY)
+    miss = per_call_us(api.score_cache.clear)  # Cada rodada começa vazia: toda chamada é falta
+    hit = per_call_us(lambda: None)            # Cache já populado pela rodada anterior: toda chamada é acerto
+    stats = api.score_cache.stats()
+
+    print(f"{'CAMINHO':<18} | {'µs/chamada':>10}")
+    print("-" * 32)
+    print(f"{'Sem cache':<18} | {no_cache:>10.1f}")
+    print(f"{'Cache (falta)':<18} | {miss:>10.1f}")
+    print(f"{'Cache (acerto)':<18} | {hit:>10.1f}")
+    print(f"\nOverhead da falta: {miss - no_cache:+.1f} µs | Ganho do acerto: {no_cache / hit:.1f}x "
+          f"| hit rate acumulado {stats['hit_rate']:.1%}")
+
+if __name__ == "__main__":
+    run_score_cache_benchmark()
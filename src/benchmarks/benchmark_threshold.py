@@ -0,0 +1,57 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+from common import timeit
+
+import numpy as np
+from sklearn.metrics import confusion_matrix
+
+from threshold_optimizer import ThresholdOptimizer
+
+COST_FN = 100
+COST_FP = 2
+
+def confusion_matrix_loop(y_true, y_proba, thresholds):
+    """Implementação original de evaluate_model.py: um confusion_matrix por threshold."""
+    costs = []
+    for thresh in thresholds:
+        y_pred_t = (y_proba >= thresh).astype(int)
+        tn, fp, fn, tp = confusion_matrix(y_true, y_pred_t).ravel()
+        costs.append((fn * COST_FN) + (fp * COST_FP))
+    return np.array(costs, dtype=np.float64)
+
+def synthetic_scores(n, fraud_rate=0.0017, seed=42):
+    """Probabilidades com a granularidade de um RandomForest de 100 árvores (múltiplos de 0.01)."""
+    rng = np.random.default_rng(seed)
+    y = rng.random(n) < fraud_rate
+    proba = np.clip(rng.beta(1, 30, n) + y * rng.beta(5, 2, n), 0, 1).round(2)
+    return y.astype(int), proba
+
+def run_threshold_benchmark(sizes=(56_000, 1_000_000)):
+    print("--- 🎯 BENCHMARK: Otimização de Threshold (loop confusion_matrix vs sort + cumsum) ---")
+    grid = np.arange(0.01, 1.00, 0.01)
+
+    for n in sizes:
+        y, proba = synthetic_scores(n)
+
+        # 1. Paridade na grade original
+        expected = confusion_matrix_loop(y, proba, grid)
+        optimizer = ThresholdOptimizer(y, proba, cost_fn=COST_FN, cost_fp=COST_FP)
+        if not np.array_equal(expected, optimizer.evaluate(grid)["cost"]):
+            raise ValueError(f"ERRO: custos divergentes na grade (n={n})")
+        best = optimizer.best()
+        if best["cost"] > expected.min():
+            raise ValueError(f"ERRO: ótimo exato pior que o da grade (n={n})")
+
+        # 2. Tempo: 99 thresholds do loop vs todos os thresholds distintos
+        t_loop = timeit(lambda: confusion_matrix_loop(y, proba, grid), repeat=3)
+        t_engine = timeit(lambda: ThresholdOptimizer(y, proba, cost_fn=COST_FN, cost_fp=COST_FP).best(), repeat=3)
+        amounts = np.random.default_rng(0).lognormal(3.0, 1.5, n)
+        t_weighted = timeit(lambda: ThresholdOptimizer(y, proba, cost_fn=amounts, cost_fp=COST_FP).best(), repeat=3)
+
+        print(f"n={n:>9,} | loop (99 thresholds): {t_loop * 1e3:8.1f} ms"
+              f" | motor ({len(optimizer.thresholds)} thresholds): {t_engine * 1e3:7.1f} ms"
+              f" | ponderado por valor: {t_weighted * 1e3:7.1f} ms | speedup {t_loop / t_engine:5.1f}x")
+        print(f"   ✅ Paridade na grade | ótimo exato {best['threshold']:.4f} (custo €{best['cost']:,.0f})"
+              f" vs grade {grid[np.argmin(expected)]:.2f} (custo €{expected.min():,.0f})")
+
+if __name__ == "__main__":
+    run_threshold_benchmark()
@@ -0,0 +1,91 @@
+import common  # noqa: F401 (configura o sys.path para src/)
+from common import SRC_PATH, load_transactions
+
+import os
+import subprocess
+import sys
+import time
+from multiprocessing import Pool
+
+import requests
+
+SERVE_SCRIPT = os.path.join(SRC_PATH, "serve.py")
+
+def _children(pid):
+    """PIDs filhos diretos (os workers do uvicorn são filhos do processo mestre)."""
+    children = []
+    task_dir = f"/proc/{pid}/task"
+    for tid in os.listdir(task_dir):
+        with open(os.path.join(task_dir, tid, "children")) as f:
+            children.extend(int(c) for c in f.read().split())
+    return children
+
+def _memory_mb(pid):
+    """RSS e PSS (RSS com páginas compartilhadas rateadas entre os processos) em MB."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0]) / 1024
+    return values.get("Rss", 0.0), values.get("Pss", 0.0)
+
+def _client_loop(args):
+    url, payloads, duration = args
+    session = requests.Session()
+    done = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        response = session.post(url, json=payloads[done % len(payloads)])
+        response.raise_for_status()
+        done += 1
+    return done
+
+def _wait_until_ready(base_url, payload, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.post(f"{base_url}/predict", json=payload, timeout=2).status_code == 200:
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError("API não respondeu a tempo.")
+
+def measure(workers, shared_model, payloads, port=8765, clients=16, duration=10):
+    base_url = f"http://127.0.0.1:{port}"
+    cmd = [sys.executable, SERVE_SCRIPT, "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)]
+    if not shared_model:
+        cmd.append("--no-shared-model")
+    
+    server = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_until_ready(base_url, payloads[0])
+        time.sleep(2)  # Garante que todos os workers terminaram o lifespan
+        
+        with Pool(clients) as pool:
+            counts = pool.map(_client_loop, [(f"{base_url}/predict", payloads, duration)] * clients)
+        
+        memory = [_memory_mb(pid) for pid in _children(server.pid)]
+        memory = [m for m in memory if m[0] > 20]  # Ignora o resource_tracker do multiprocessing
+        return sum(counts) / duration, memory
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+def run_workers_benchmark(worker_counts=(1, 2, 4, 8)):
+    print("--- 🧵 BENCHMARK: Multi-worker (pickle por worker vs árvores em mmap) ---")
+    payloads = load_transactions(1000)
+    
+    print(f"{'MODO':<8} | {'WORKERS':>7} | {'RSS/WORKER (MB)':>15} | {'PSS TOTAL (MB)':>14} | {'VAZÃO (req/s)':>13}")
+    print("-" * 70)
+    for shared_model in (False, True):
+        mode = "mmap" if shared_model else "pickle"
+        for workers in worker_counts:
+            throughput, memory = measure(workers, shared_model, payloads)
+            rss_per_worker = sum(m[0] for m in memory) / max(len(memory), 1)
+            pss_total = sum(m[1] for m in memory)
+            print(f"{mode:<8} | {workers:>7} | {rss_per_worker:>15.1f} | {pss_total:>14.1f} | {throughput:>13,.0f}")
+
+if __name__ == "__main__":
+    run_workers_benchmark()
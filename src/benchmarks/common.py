@@ -0,0 +1,40 @@
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+# Permite importar os módulos de src/ (app, feature_engineering, ...) a partir de src/benchmarks/
+current_dir = os.path.dirname(os.path.abspath(__file__))
+SRC_PATH = os.path.normpath(os.path.join(current_dir, ".."))
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from gold_dataset import read_gold, gold_exists  # noqa: E402
+
+RAW_FIELDS = ['time', 'amount'] + [f'v{i}' for i in range(1, 29)]
+
+def load_transactions(n, seed=42):
+    """
+    Retorna `n` payloads de transação (dicts no formato do TransactionRequest).
+    Usa a camada Gold de teste quando disponível; caso contrário gera dados sintéticos
+    com a mesma escala do dataset original (PCA ~ N(0,1), 48h de janela temporal).
+    """
+    if gold_exists("test"):
+        df = read_gold("test", columns=RAW_FIELDS)
+        df = df.sample(n=n, replace=len(df) < n, random_state=seed)
+    else:
+        rng = np.random.default_rng(seed)
+        df = pd.DataFrame(rng.standard_normal((n, 28)), columns=RAW_FIELDS[2:])
+        df.insert(0, 'amount', np.round(rng.lognormal(3.0, 1.5, n), 2))
+        df.insert(0, 'time', rng.uniform(0, 172800, n))
+    return df[RAW_FIELDS].to_dict(orient='records')
+
+def timeit(func, repeat=5):
+    """Executa `func` `repeat` vezes e retorna o melhor tempo (segundos)."""
+    import time
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -1,6 +1,23 @@
 import pandas as pd
 import os
+import math
+import argparse
+import tempfile
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sketches import QuantileSketch
+
+# Caminhos
+base_path = os.path.dirname(os.path.abspath(__file__))
+SILVER_FILE = os.path.join(base_path, "../data/silver/fraud_data_silver.parquet")
+TRUSTED_PATH = os.path.join(base_path, "../data/trusted/")
+
+TRAIN_FRACTION = 0.8
+# Modo out-of-core: linhas por record batch lido da Silver e linhas-alvo por bucket de tempo
+OOC_BATCH_ROWS = 65_536
+OOC_BUCKET_ROWS = 500_000
+OOC_SKETCH_K = 2000  # Precisão do sketch de quantis de `time` (erro de rank ~1/k) usado nos limites dos buckets
 
 def clean_and_split_data():
     """
@@ -8,19 +25,16 @@ def clean_and_split_data():
     Entrada: Silver (Parquet)
     Saída: Trusted (Train/Test Parquet separados)
     """
-    # Caminhos
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    silver_path = os.path.join(base_path, "../data/silver/fraud_data_silver.parquet")
-    trusted_path = os.path.join(base_path, "../data/trusted/")
-    
+    trusted_path = TRUSTED_PATH
+
     if not os.path.exists(trusted_path):
         os.makedirs(trusted_path)
-        
+
     print("--- INICIANDO LIMPEZA E TRATAMENTO (ETAPA 4) ---")
-    
+
     # 1. Carregamento
     try:
-        df = pd.read_parquet(silver_path)
+        df = pd.read_parquet(SILVER_FILE)
         print(f"Dados carregados: {df.shape[0]} registros.")
     except Exception as e:
         print(f"Erro ao carregar dados Silver: {e}")
@@ -32,7 +46,7 @@ def clean_and_split_data():
     df.drop_duplicates(inplace=True)
     cleaned_rows = df.shape[0]
     duplicates_removed = initial_rows - cleaned_rows
-    
+
     print(f"Duplicatas removidas: {duplicates_removed}")
     if duplicates_removed > 0:
         print("⚠️ ALERTA: Duplicatas encontradas.")
@@ -42,20 +56,21 @@ def clean_and_split_data():
     if df.isnull().sum().max() > 0:
         print("Valores nulos detectados. Tratando...")
         df.fillna(0, inplace=True)
-    
+
     # 4. Estratégia de Split (Time-Based Split)
-    df = df.sort_values(by="time")
-    
+    # Ordenação estável: empates de tempo mantêm a ordem original (mesmo resultado do modo out-of-core)
+    df = df.sort_values(by="time", kind="stable")
+
     # Definindo ponto de corte (80% para treino, 20% para teste - cronológico)
-    split_index = int(len(df) * 0.8)
-    
+    split_index = int(len(df) * TRAIN_FRACTION)
+
     train_df = df.iloc[:split_index]
     test_df = df.iloc[split_index:]
-    
+
     print("\n--- SPLIT TEMPORAL ---")
     print(f"Treino (Passado): {train_df.shape[0]} transações | Fraudes: {train_df['class'].sum()}")
     print(f"Teste (Futuro):   {test_df.shape[0]} transações  | Fraudes: {test_df['class'].sum()}")
-    
+
     # Validação de Sanidade do Split
     if test_df['time'].min() < train_df['time'].max():
         raise ValueError("ERRO CRÍTICO: Vazamento de tempo detectado. O teste contém dados do passado.")
@@ -63,9 +78,177 @@ def clean_and_split_data():
     # 5. Persistência na Camada Trusted
     train_df.to_parquet(os.path.join(trusted_path, "train_data.parquet"), index=False)
     test_df.to_parquet(os.path.join(trusted_path, "test_data.parquet"), index=False)
-    
+
+    print(f"\n✅ Dados limpos e divididos salvos em: {trusted_path}")
+    print("Pronto para EDA e Feature Engineering.")
+
+def row_fingerprints(df):
+    """
+    Fingerprint de 64 bits por linha (todas as colunas, sem o índice).
+    Somar 0.0 normaliza -0.0 em 0.0, que o drop_duplicates considera iguais.
+    """
+    return pd.util.hash_pandas_object(df + 0.0, index=False).to_numpy()
+
+def _batch_times(batch):
+    times = batch.column(batch.schema.get_field_index("time")).to_numpy(zero_copy_only=False)
+    return np.nan_to_num(times.astype(np.float64), nan=0.0)  # time nulo vira 0 no tratamento de nulos
+
+def _bucket_edges(parquet_file, n_buckets, batch_rows=OOC_BATCH_ROWS):
+    """
+    Limites dos buckets por contagem de linhas: quantis de `time` em uma primeira
+    passada (só a coluna, em um sketch de memória limitada). Com `time` concentrado,
+    os buckets continuam com ~o mesmo número de linhas (faixas de largura igual não).
+    Limites repetidos são fundidos: um único valor de `time` nunca é dividido,
+    então linhas idênticas continuam no mesmo bucket.
+    """
+    sketch = QuantileSketch(k=OOC_SKETCH_K)
+    for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=["time"]):
+        sketch.update(_batch_times(batch))
+    if n_buckets <= 1 or sketch.count == 0:
+        return np.empty(0)
+    return np.unique(sketch.quantiles(np.arange(1, n_buckets) / n_buckets))
+
+def clean_and_split_data_out_of_core(batch_rows=OOC_BATCH_ROWS, bucket_rows=OOC_BUCKET_ROWS):
+    """
+    Mesma limpeza e split de `clean_and_split_data`, com memória limitada a um
+    record batch + um bucket de tempo:
+    1. Distribui as linhas da Silver em buckets de faixas de `time` disjuntas (spill em disco),
+       com limites nos quantis de `time` (buckets de ~`bucket_rows` linhas mesmo com `time` enviesado).
+       Linhas idênticas têm o mesmo `time`, então caem sempre no mesmo bucket.
+    2. Por bucket: deduplica por fingerprint de 64 bits (mantém a primeira ocorrência),
+       trata nulos e ordena por `time` (estável); conta as linhas finais.
+    3. Com o total conhecido, grava Train/Test bucket a bucket cortando no índice exato de 80%.
+    """
+    trusted_path = TRUSTED_PATH
+    if not os.path.exists(trusted_path):
+        os.makedirs(trusted_path)
+
+    print("--- INICIANDO LIMPEZA E TRATAMENTO (ETAPA 4 | OUT-OF-CORE) ---")
+
+    try:
+        parquet_file = pq.ParquetFile(SILVER_FILE)
+        initial_rows = parquet_file.metadata.num_rows
+        # Schema fixo das saídas: o da Silver (fillna pode mudar o dtype em alguns buckets e não em outros)
+        target_schema = parquet_file.schema_arrow.remove_metadata()
+        print(f"Dados encontrados: {initial_rows} registros.")
+        edges = _bucket_edges(parquet_file, max(1, math.ceil(initial_rows / bucket_rows)), batch_rows)
+    except Exception as e:
+        print(f"Erro ao carregar dados Silver: {e}")
+        return
+
+    with tempfile.TemporaryDirectory(dir=trusted_path) as spill_dir:
+        bucket_file = lambda b: os.path.join(spill_dir, f"bucket_{b:05d}.parquet")
+
+        # 1. Spill por faixa de tempo (a ordem de leitura é preservada dentro de cada bucket)
+        writers = {}
+        try:
+            for batch in parquet_file.iter_batches(batch_size=batch_rows):
+                # side='right': um valor igual ao limite sempre vai para o mesmo bucket
+                buckets = np.searchsorted(edges, _batch_times(batch), side='right')
+                for b in np.unique(buckets):
+                    part = batch.filter(pa.array(buckets == b))
+                    if b not in writers:
+                        writers[b] = pq.ParquetWriter(bucket_file(b), part.schema)
+                    writers[b].write_batch(part)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        # 2. Deduplicação, nulos e ordenação por bucket
+        bucket_rows_final = {}
+        duplicates_removed, had_nulls = 0, False
+        for b in sorted(writers):
+            df = pq.read_table(bucket_file(b)).to_pandas()
+            before = len(df)
+
+            # Transações idênticas (mesmo tempo, valor e features V) são prováveis erros de sistema/retry
+            df = df[~pd.Series(row_fingerprints(df)).duplicated(keep='first').to_numpy()]
+            duplicates_removed += before - len(df)
+
+            if df.isnull().sum().max() > 0:
+                had_nulls = True
+                df = df.fillna(0)
+
+            df = df.sort_values(by="time", kind="stable")
+            df.to_parquet(bucket_file(b), index=False)
+            bucket_rows_final[b] = len(df)
+
+        largest = max(bucket_rows_final.values(), default=0)
+        print(f"Buckets de tempo: {len(bucket_rows_final)} | maior: {largest} linhas (alvo {bucket_rows})")
+        if largest > 2 * bucket_rows:
+            print("⚠️ ALERTA: um único valor de `time` concentra linhas demais para o orçamento do bucket.")
+
+        print(f"Duplicatas removidas: {duplicates_removed}")
+        if duplicates_removed > 0:
+            print("⚠️ ALERTA: Duplicatas encontradas.")
+        if had_nulls:
+            print("Valores nulos detectados. Tratando...")
+
+        # 3. Split temporal no índice exato, gravando bucket a bucket
+        # Os dois writers abrem antes do loop: um split sem linhas vira uma tabela vazia
+        # com o schema fixo e substitui o arquivo anterior (nada de Trusted desatualizada)
+        split_index = int(sum(bucket_rows_final.values()) * TRAIN_FRACTION)
+        outputs = {
+            "train": {"path": os.path.join(trusted_path, "train_data.parquet"), "rows": 0, "frauds": 0},
+            "test": {"path": os.path.join(trusted_path, "test_data.parquet"), "rows": 0, "frauds": 0},
+        }
+        for out in outputs.values():
+            out["writer"] = pq.ParquetWriter(out["path"] + ".tmp", target_schema)
+        train_time_max, test_time_min = -np.inf, np.inf
+
+        def write(name, df):
+            out = outputs[name]
+            if df.empty:
+                return
+            out["writer"].write_table(pa.Table.from_pandas(df, preserve_index=False).cast(target_schema))
+            out["rows"] += len(df)
+            out["frauds"] += int(df['class'].sum())
+
+        written = 0
+        try:
+            for b in sorted(bucket_rows_final):
+                df = pd.read_parquet(bucket_file(b))
+                cut = min(max(split_index - written, 0), len(df))
+                train_part, test_part = df.iloc[:cut], df.iloc[cut:]
+                if not train_part.empty:
+                    train_time_max = max(train_time_max, train_part['time'].max())
+                if not test_part.empty:
+                    test_time_min = min(test_time_min, test_part['time'].min())
+                write("train", train_part)
+                write("test", test_part)
+                written += len(df)
+        finally:
+            for out in outputs.values():
+                out["writer"].close()
+
+    print("\n--- SPLIT TEMPORAL ---")
+    print(f"Treino (Passado): {outputs['train']['rows']} transações | Fraudes: {outputs['train']['frauds']}")
+    print(f"Teste (Futuro):   {outputs['test']['rows']} transações  | Fraudes: {outputs['test']['frauds']}")
+    for name, out in outputs.items():
+        if out["rows"] == 0:
+            print(f"⚠️ Split '{name}' sem linhas: gravando tabela vazia em {out['path']}")
+
+    # Validação de Sanidade do Split (máximo do treino e mínimo do teste acumulados)
+    if test_time_min < train_time_max:
+        for out in outputs.values():
+            if os.path.exists(out["path"] + ".tmp"):
+                os.remove(out["path"] + ".tmp")
+        raise ValueError("ERRO CRÍTICO: Vazamento de tempo detectado. O teste contém dados do passado.")
+
+    # 5. Persistência na Camada Trusted (troca atômica dos arquivos)
+    for out in outputs.values():
+        os.replace(out["path"] + ".tmp", out["path"])
+
     print(f"\n✅ Dados limpos e divididos salvos em: {trusted_path}")
     print("Pronto para EDA e Feature Engineering.")
 
 if __name__ == "__main__":
-    clean_and_split_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Limpeza + split temporal (Silver -> Trusted)")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="Processa a Silver em blocos com memória limitada")
+    args = parser.parse_args()
+
+    if args.out_of_core:
+        clean_and_split_data_out_of_core()
+    else:
+        clean_and_split_data()
@@ -0,0 +1,216 @@
+import numpy as np
+import os
+import copy
+import json
+import time
+import argparse
+import joblib
+from datetime import datetime, timezone
+from sklearn.metrics import average_precision_score
+from model_artifact import export_artifact
+from feature_cache import load_features
+from threshold_optimizer import ThresholdOptimizer
+from tune_challenger import measure_latency, COST_FN, COST_FP
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(base_path, "../models/challenger_model.pkl")
+COMPACTION_REPORT_PATH = os.path.join(base_path, "../reports/forest_compaction.json")
+
+THRESHOLD = 0.20            # Mesmo threshold da API (app.THRESHOLD)
+SELECTION_FRACTION = 0.5    # Primeira metade do teste (em ordem de tempo) escolhe as árvores; a segunda mede a curva
+AUPRC_TOLERANCE = 0.005     # Sem orçamento: menor floresta a até 0.005 de AUPRC da floresta completa
+CURVE_STEP = 5              # Tamanhos medidos na curva (1, 5, 10, ...)
+
+# --- Compactação da Floresta ---
+# Seleção gulosa (forward selection) de árvores do Challenger já treinado: a cada passo entra
+# a árvore que mais aumenta a AUPRC do conjunto. Sem retreino: o modelo compacto é a mesma
+# RandomForest com um subconjunto de `estimators_`, então vale como drop-in na API.
+
+def tree_probas(model, X):
+    """Probabilidade de fraude de cada árvore: (n_amostras, n_árvores)."""
+    X = np.asarray(X, dtype=np.float32)
+    return np.column_stack([est.predict_proba(X)[:, 1] for est in model.estimators_])
+
+def node_counts(model):
+    return np.array([est.tree_.node_count for est in model.estimators_])
+
+def greedy_order(P, y, nodes, max_nodes=None):
+    """
+    Ordem gulosa das árvores pela AUPRC na seleção. Com `max_nodes`, só entram
+    árvores que ainda cabem no orçamento de nós. Retorna (ordem, AUPRC após cada passo).
+    (A média e a soma das probabilidades dão o mesmo ranking: a AUPRC usa a soma.)
+    """
+    remaining = list(range(P.shape[1]))
+    order, scores = [], []
+    total = np.zeros(P.shape[0])
+    used_nodes = 0
+    while remaining:
+        fits = [t for t in remaining if max_nodes is None or used_nodes + nodes[t] <= max_nodes]
+        if not fits:
+            break
+        gains = [average_precision_score(y, total + P[:, t]) for t in fits]
+        best = fits[int(np.argmax(gains))]
+        remaining.remove(best)
+        order.append(best)
+        scores.append(float(max(gains)))
+        total += P[:, best]
+        used_nodes += int(nodes[best])
+    return order, scores
+
+def subset_model(model, trees):
+    """RandomForest com só as árvores escolhidas (cópia rasa: as árvores são compartilhadas)."""
+    compact = copy.copy(model)
+    compact.estimators_ = [model.estimators_[t] for t in trees]
+    compact.n_estimators = len(trees)
+    return compact
+
+def evaluate_subset(model, X, y, threshold=THRESHOLD):
+    """AUPRC, custo financeiro no threshold da API, nós e latência por transação (FlatForest)."""
+    proba = model.predict_proba(X)[:, 1]
+    at_threshold = ThresholdOptimizer(y, proba, cost_fn=COST_FN, cost_fp=COST_FP).evaluate([threshold])
+    latency_p50, latency_p99 = measure_latency(model, X)
+    return {
+        "trees": len(model.estimators_),
+        "nodes": int(node_counts(model).sum()),
+        "auprc": float(average_precision_score(y, proba)),
+        "cost": float(at_threshold["cost"][0]),
+        "tp": int(at_threshold["tp"][0]),
+        "fp": int(at_threshold["fp"][0]),
+        "fn": int(at_threshold["fn"][0]),
+        "latency_p50_ms": latency_p50,
+        "latency_p99_ms": latency_p99,
+    }
+
+def compact_paths(model_path):
+    """Saídas ao lado do modelo: challenger_model.pkl -> challenger_compact.pkl / challenger_compact_artifact."""
+    stem = os.path.splitext(model_path)[0]
+    if stem.endswith("_model"):
+        stem = stem[:-len("_model")]
+    return stem + "_compact.pkl", stem + "_compact_artifact"
+
+def compact_forest(max_latency_ms=None, max_nodes=None, tolerance=AUPRC_TOLERANCE, curve_step=CURVE_STEP,
+                   model_path=MODEL_PATH, report_path=COMPACTION_REPORT_PATH,
+                   compact_model_path=None, compact_artifact_path=None):
+    """
+    Compacta o Challenger: ordem gulosa das árvores na metade de seleção, curva
+    AUPRC / custo / p99 na metade de avaliação e escolha do tamanho:
+    - com orçamento (p99 em ms e/ou nós): maior AUPRC de seleção dentro do orçamento;
+    - sem orçamento: menor floresta a até `tolerance` da AUPRC da floresta completa.
+    Atenção: a escolha compara `selection_auprc` (metade de seleção, a mesma da ordem
+    gulosa), enquanto a AUPRC, o custo e o p99 reportados de cada ponto vêm da metade de
+    avaliação. O ponto escolhido não é uma escolha fora da amostra; a curva de avaliação
+    serve para conferir a escolha, não para fazê-la.
+    Sem caminhos de saída, o pickle e o artefato compactos ficam ao lado de `model_path`.
+    """
+    default_model, default_artifact = compact_paths(model_path)
+    compact_model_path = compact_model_path or default_model
+    compact_artifact_path = compact_artifact_path or default_artifact
+    print("--- ✂️ COMPACTAÇÃO DA FLORESTA DO CHALLENGER ---")
+    start = time.perf_counter()
+
+    try:
+        model = joblib.load(model_path)
+        test = load_features("test")
+    except Exception as e:
+        print(f"❌ Erro ao carregar artefatos: {e}")
+        return
+    if not hasattr(model, "estimators_"):
+        print(f"❌ Compactação suporta apenas florestas, recebido: {type(model).__name__}")
+        return
+
+    X = test.frame(columns=list(model.feature_names_in_)).to_numpy()
+    y = np.asarray(test.y)
+    split = int(len(y) * SELECTION_FRACTION)
+    X_sel, y_sel, X_eval, y_eval = X[:split], y[:split], X[split:], y[split:]
+    if y_sel.sum() == 0 or y_eval.sum() == 0:
+        print("❌ Seleção ou avaliação sem fraudes: não há como medir AUPRC.")
+        return
+
+    nodes = node_counts(model)
+    print(f"Floresta: {len(nodes)} árvores, {nodes.sum()} nós | seleção {len(y_sel)} linhas | avaliação {len(y_eval)} linhas")
+
+    # 1. Ordem gulosa (na seleção)
+    P = tree_probas(model, X_sel)
+    order, sel_scores = greedy_order(P, y_sel, nodes, max_nodes)
+    full_sel_auprc = float(average_precision_score(y_sel, P.sum(axis=1)))
+    tolerance_size = next((k for k, score in enumerate(sel_scores, 1) if score >= full_sel_auprc - tolerance),
+                          len(order))
+
+    # 2. Curva de trade-off (na avaliação)
+    sizes = sorted({1, tolerance_size, len(order), *range(curve_step, len(order) + 1, curve_step)})
+    full = evaluate_subset(model, X_eval, y_eval)
+    curve = []
+    for k in sizes:
+        point = evaluate_subset(subset_model(model, order[:k]), X_eval, y_eval)
+        point["selection_auprc"] = sel_scores[k - 1]
+        curve.append(point)
+
+    # 3. Escolha do tamanho
+    if max_latency_ms is not None or max_nodes is not None:
+        within = [p for p in curve if max_latency_ms is None or p["latency_p99_ms"] <= max_latency_ms]
+        if not within:
+            print(f"❌ Nenhum tamanho cabe no orçamento de {max_latency_ms} ms (p99).")
+            return
+        chosen = max(within, key=lambda p: (p["selection_auprc"], -p["trees"]))
+    else:
+        chosen = next(p for p in curve if p["trees"] == tolerance_size)
+    compact = subset_model(model, order[:chosen["trees"]])
+
+    print(f"\n{'ÁRVORES':>7} | {'NÓS':>7} | {'AUPRC':>6} | {'CUSTO @' + str(THRESHOLD):>11} | {'P99 (ms)':>8}")
+    print("-" * 55)
+    for point in curve + [full]:
+        marker = " ⬅️ escolhido" if point is chosen else (" (completa)" if point is full else "")
+        print(f"{point['trees']:7d} | {point['nodes']:7d} | {point['auprc']:6.4f} | {point['cost']:11.0f} | "
+              f"{point['latency_p99_ms']:8.3f}{marker}")
+
+    # 4. Drop-in para a API: pickle + artefato compacto com o mesmo threshold
+    joblib.dump(compact, compact_model_path)
+    export_artifact(compact, compact_artifact_path, threshold=THRESHOLD, metadata={
+        "compacted_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "source": os.path.relpath(model_path, os.path.dirname(os.path.abspath(compact_model_path))),
+        "trees": order[:chosen["trees"]],
+        "metrics": {key: chosen[key] for key in ("auprc", "cost", "latency_p99_ms")},
+    })
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "threshold": THRESHOLD,
+        "costs": {"fn": COST_FN, "fp": COST_FP},
+        "budget": {"max_latency_ms": max_latency_ms, "max_nodes": max_nodes, "tolerance": tolerance},
+        "rows": {"selection": int(len(y_sel)), "evaluation": int(len(y_eval))},
+        "chosen_by": "selection_auprc (metade de seleção, a mesma da ordem gulosa); "
+                     "auprc/cost/latency de cada ponto são da metade de avaliação",
+        "model": os.path.abspath(model_path),
+        "outputs": {"model": os.path.abspath(compact_model_path), "artifact": os.path.abspath(compact_artifact_path)},
+        "order": order,
+        "full": full,
+        "chosen": chosen,
+        "curve": curve,
+    }
+    tmp_path = report_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, report_path)
+
+    print(f"\n✅ Floresta compacta: {chosen['trees']}/{full['trees']} árvores | AUPRC {chosen['auprc']:.4f} "
+          f"(completa {full['auprc']:.4f}) | p99 {chosen['latency_p99_ms']:.3f} ms (completa {full['latency_p99_ms']:.3f} ms)")
+    print(f"Modelo: {compact_model_path} | Artefato: {compact_artifact_path}")
+    print(f"Relatório salvo em: {report_path} ({time.perf_counter() - start:.1f}s)")
+    return compact
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compactação da floresta do Challenger (seleção gulosa de árvores)")
+    parser.add_argument("--max-latency-ms", type=float, default=None, help="Orçamento de latência p99 por transação")
+    parser.add_argument("--max-nodes", type=int, default=None, help="Orçamento total de nós")
+    parser.add_argument("--tolerance", type=float, default=AUPRC_TOLERANCE,
+                        help="Perda de AUPRC aceita sem orçamento explícito")
+    parser.add_argument("--curve-step", type=int, default=CURVE_STEP, help="Passo (em árvores) da curva de trade-off")
+    parser.add_argument("--model", default=MODEL_PATH, help="Floresta a compactar (pickle)")
+    parser.add_argument("--output-model", default=None, help="Pickle compacto (padrão: <modelo>_compact.pkl)")
+    parser.add_argument("--output-artifact", default=None,
+                        help="Artefato compacto (padrão: <modelo>_compact_artifact)")
+    parser.add_argument("--report", default=COMPACTION_REPORT_PATH, help="Relatório JSON da curva")
+    args = parser.parse_args()
+    compact_forest(args.max_latency_ms, args.max_nodes, args.tolerance, args.curve_step,
+                   model_path=args.model, report_path=args.report,
+                   compact_model_path=args.output_model, compact_artifact_path=args.output_artifact)
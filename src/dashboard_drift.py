@@ -1,29 +1,86 @@
 import pandas as pd
 import numpy as np
 import os
+import argparse
 import plotly.graph_objects as go
 import plotly.figure_factory as ff
 from plotly.subplots import make_subplots
 from scipy.stats import ks_2samp
+from gold_dataset import read_gold
 
-def generate_drift_dashboard():
+HIST_BINS = 50          # Bins por feature contínua (mesmos limites para Treino e Produção)
+MAX_DISCRETE_VALUES = 10  # Features com poucos valores distintos (ex.: is_night) viram uma barra por valor
+DISCRETE_CHUNK_ROWS = 65536  # Blocos da contagem de distintos (para no primeiro bloco que passa do limite)
+# O veredito do KS continua na amostra de 5000 linhas de antes: com ~227k x ~57k linhas o teste
+# marca como drift deslocamentos mínimos e o alerta "Requer Retreino" mudaria com os mesmos dados
+KS_SAMPLE_ROWS = 5000
+
+def discrete_values(*columns, limit=MAX_DISCRETE_VALUES):
+    """
+    Valores distintos (ordenados) se as colunas tiverem no máximo `limit`, senão None.
+    Conta por blocos e para assim que passa do limite: uma feature contínua custa um
+    bloco, não a ordenação das colunas inteiras.
+    """
+    values = np.empty(0)
+    for data in columns:
+        for start in range(0, len(data), DISCRETE_CHUNK_ROWS):
+            values = np.union1d(values, data[start:start + DISCRETE_CHUNK_ROWS])
+            if len(values) > limit:
+                return None
+    return values
+
+def binned_histograms(ref_data, cur_data, bins=HIST_BINS):
+    """
+    Histogramas pré-agregados sobre TODOS os dados (sem amostragem), com limites
+    comuns às duas distribuições. Retorna (centros, largura, proporção treino,
+    proporção produção): o tamanho não depende do número de linhas.
+    """
+    ref_data = np.asarray(ref_data, dtype=np.float64)
+    cur_data = np.asarray(cur_data, dtype=np.float64)
+    values = discrete_values(ref_data, cur_data)
+    if values is not None:
+        # Discreta: uma barra por valor
+        ref_counts = np.bincount(np.searchsorted(values, ref_data), minlength=len(values))
+        cur_counts = np.bincount(np.searchsorted(values, cur_data), minlength=len(values))
+        centers, width = values, 0.8 * (np.min(np.diff(values)) if len(values) > 1 else 1.0)
+    else:
+        low = min(np.nanmin(data) for data in (ref_data, cur_data) if data.size)
+        high = max(np.nanmax(data) for data in (ref_data, cur_data) if data.size)
+        edges = np.linspace(low, high, bins + 1)
+        ref_counts, _ = np.histogram(ref_data, bins=edges)
+        cur_counts, _ = np.histogram(cur_data, bins=edges)
+        centers, width = (edges[:-1] + edges[1:]) / 2, edges[1] - edges[0]
+    # Proporções (Treino e Produção têm tamanhos diferentes)
+    return centers, width, ref_counts / max(len(ref_data), 1), cur_counts / max(len(cur_data), 1)
+
+def generate_drift_dashboard(sample=False):
+    """
+    Dashboard de drift. Por padrão usa todos os dados em histogramas pré-agregados
+    (barras): o HTML e o tempo de renderização não crescem com o volume. O veredito
+    (KS) usa sempre a amostra de KS_SAMPLE_ROWS linhas, como antes.
+    sample=True mantém o modo antigo (amostra de 5000 pontos brutos por distribuição).
+    """
     print("--- 🎨 GERANDO DASHBOARD EXECUTIVO DE DRIFT ---")
     
     base_path = os.path.dirname(os.path.abspath(__file__))
-    train_path = os.path.join(base_path, "../data/gold/train_data.parquet")
-    prod_path = os.path.join(base_path, "../data/gold/test_data.parquet")
     report_path = os.path.join(base_path, "../reports/10_executive_drift_dashboard.html")
     
-    # 1. Carrega amostrar dados (Para o gráfico não ficar pesado)
+    # Features Críticas para Monitorar
+    features = ['amount_log', 'is_night', 'v14', 'v17', 'v12', 'v4']
+    
+    # 1. Carrega os dados, só com as colunas do painel
+    # (modo amostra: 5000 pontos por distribuição para o gráfico não ficar pesado)
     try:
-        df_ref = pd.read_parquet(train_path).sample(5000, random_state=42)
-        df_cur = pd.read_parquet(prod_path).sample(5000, random_state=42)
+        df_ref = read_gold("train", columns=features)
+        df_cur = read_gold("test", columns=features)
+        # Mesma amostra (e semente) do modo antigo para o teste KS
+        ks_ref = df_ref.sample(min(KS_SAMPLE_ROWS, len(df_ref)), random_state=42)
+        ks_cur = df_cur.sample(min(KS_SAMPLE_ROWS, len(df_cur)), random_state=42)
+        if sample:
+            df_ref, df_cur = ks_ref, ks_cur
     except Exception as e:
         print(f"Erro ao carregar dados: {e}")
         return
-
-    # Features Críticas para Monitorar
-    features = ['amount_log', 'is_night', 'v14', 'v17', 'v12', 'v4']
     
     # Criar Subplots (Um gráfico por feature)
     rows = 3
@@ -48,8 +105,8 @@ def generate_drift_dashboard():
         ref_data = df_ref[feature].dropna()
         cur_data = df_cur[feature].dropna()
         
-        # Teste KS (Matemática por trás do visual)
-        stat, p_value = ks_2samp(ref_data, cur_data)
+        # Teste KS (Matemática por trás do visual), na amostra de KS_SAMPLE_ROWS linhas
+        stat, p_value = ks_2samp(ks_ref[feature].dropna(), ks_cur[feature].dropna())
         is_drift = p_value < 0.05
         
         color_ref = 'rgba(46, 204, 113, 0.6)'  # Verde (Treino/Base)
@@ -59,23 +116,37 @@ def generate_drift_dashboard():
             alert_count += 1
             drift_details.append(f"Feature <b>{feature}</b> variou significativamente.")
 
-        # Histograma Reference (Treino)
-        fig.add_trace(go.Histogram(
-            x=ref_data,
-            name=f'{feature} (Treino)',
-            marker_color=color_ref,
-            opacity=0.5,
-            showlegend=(i==0) # Mostrar legenda só no primeiro para não poluir
-        ), row=row, col=col)
+        if sample:
+            # Histograma Reference (Treino)
+            fig.add_trace(go.Histogram(
+                x=ref_data,
+                name=f'{feature} (Treino)',
+                marker_color=color_ref,
+                opacity=0.5,
+                showlegend=(i==0) # Mostrar legenda só no primeiro para não poluir
+            ), row=row, col=col)
 
-        # Histograma Current (Produção)
-        fig.add_trace(go.Histogram(
-            x=cur_data,
-            name=f'{feature} (Produção)',
-            marker_color=color_cur,
-            opacity=0.5,
-            showlegend=(i==0)
-        ), row=row, col=col)
+            # Histograma Current (Produção)
+            fig.add_trace(go.Histogram(
+                x=cur_data,
+                name=f'{feature} (Produção)',
+                marker_color=color_cur,
+                opacity=0.5,
+                showlegend=(i==0)
+            ), row=row, col=col)
+        else:
+            # Barras pré-agregadas: só centros e proporções entram no HTML
+            centers, width, ref_share, cur_share = binned_histograms(ref_data, cur_data)
+            for share, label, color in ((ref_share, 'Treino', color_ref), (cur_share, 'Produção', color_cur)):
+                fig.add_trace(go.Bar(
+                    x=np.round(centers, 6),
+                    y=np.round(share, 6),
+                    width=width,
+                    name=f'{feature} ({label})',
+                    marker_color=color,
+                    opacity=0.5,
+                    showlegend=(i==0)
+                ), row=row, col=col)
         
         # Adiciona anotação de Status no gráfico
         status_text = "⚠️ DRIFT" if is_drift else "✅ OK"
@@ -104,14 +175,7 @@ def generate_drift_dashboard():
         f"{'Requer Retreino Imediato' if alert_count > 2 else 'Monitorar'}"
     )
 
-    # Salva HTML
-    print(f"💾 Salvando dashboard em: {report_path}")
-    fig.write_html(report_path)
-    
-    # Adiciona texto explicativo no HTML
-    with open(report_path, 'r', encoding='utf-8') as f:
-        html_content = f.read()
-    
+    # Texto explicativo no topo do HTML
     header = f"""
     <div style="font-family: Arial; padding: 20px; background-color: #f8f9fa; border-bottom: 3px solid #2c3e50;">
         <h1 style="color: #2c3e50;">🛡️ Painel de Governança de IA</h1>
@@ -123,10 +187,18 @@ def generate_drift_dashboard():
     </div>
     """
     
+    # Salva HTML: cabeçalho + figura em uma única escrita (sem reler o arquivo)
+    print(f"💾 Salvando dashboard em: {report_path}")
     with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(header + html_content)
+        f.write('<html>\n<head><meta charset="utf-8" /></head>\n<body>\n' + header
+                + fig.to_html(full_html=False, include_plotlyjs=True) + '\n</body>\n</html>')
+    print(f"   Tamanho do relatório: {os.path.getsize(report_path) / 1024:.0f} KB")
 
     print("✅ Dashboard gerado com sucesso!")
 
 if __name__ == "__main__":
-    generate_drift_dashboard()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Dashboard executivo de drift (HTML)")
+    parser.add_argument("--sample", action="store_true",
+                        help="Modo antigo: amostra de 5000 pontos brutos por distribuição (go.Histogram)")
+    args = parser.parse_args()
+    generate_drift_dashboard(sample=args.sample)
\ No newline at end of file
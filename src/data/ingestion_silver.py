@@ -1,32 +1,112 @@
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 import os
+import csv
+import argparse
 
-def ingest_to_silver():
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    raw_path = os.path.normpath(os.path.join(current_dir, "../../data/raw/creditcard.csv"))
-    silver_path = os.path.normpath(os.path.join(current_dir, "../../data/silver/"))
+current_dir = os.path.dirname(os.path.abspath(__file__))
+RAW_PATH = os.path.normpath(os.path.join(current_dir, "../../data/raw/creditcard.csv"))
+SILVER_PATH = os.path.normpath(os.path.join(current_dir, "../../data/silver/"))
+SILVER_FILE = os.path.join(SILVER_PATH, "fraud_data_silver.parquet")
 
+# --- Parâmetros do modo streaming ---
+READ_BLOCK_SIZE = 8 * 1024 * 1024  # Bytes de CSV por record batch
+ROW_GROUP_SIZE = 131_072           # Linhas por row group do Parquet (~17 MB descomprimido)
+
+def silver_dtype(column):
+    """
+    Schema explícito da Silver (nomes já em minúsculo).
+    v1..v28 em float32 (componentes PCA, metade da memória); time e amount ficam em
+    float64 porque hour e amount_log derivam deles; class em int8.
+    """
+    if column == 'class':
+        return 'int8'
+    if column in ('time', 'amount'):
+        return 'float64'
+    return 'float32'
+
+def ingest_to_silver(raw_path=RAW_PATH, output_file=SILVER_FILE):
+    silver_path = os.path.dirname(output_file)
     if not os.path.exists(silver_path):
         os.makedirs(silver_path)
 
     try:
         # Le os dados brutos
         df = pd.read_csv(raw_path)
-        
+
         # Padronização de Schema
         # Converter nomes de colunas para snake_case
         df.columns = [col.lower() for col in df.columns]
-        
-        # Persistência Idempotente 
-        output_file = os.path.join(silver_path, "fraud_data_silver.parquet")
-        
+
+        # Persistência Idempotente
         # Parquet: Formato profissional para Data Science (compacto e rápido)
         df.to_parquet(output_file, index=False)
-        
+
         print(f"✅ Ingestão concluída! Dado salvo em formato Parquet na pasta Silver.")
-        
+
+    except Exception as e:
+        print(f"❌ Erro na ingestão: {e}")
+
+def ingest_to_silver_streaming(raw_path=RAW_PATH, output_file=SILVER_FILE,
+                               block_size=READ_BLOCK_SIZE, row_group_size=ROW_GROUP_SIZE):
+    """
+    Ingestão em streaming: lê o CSV em record batches de `block_size` bytes,
+    normaliza o schema de cada batch e grava row groups de `row_group_size` linhas.
+    O pico de memória depende só desses dois parâmetros, não do tamanho do CSV.
+    """
+    silver_path = os.path.dirname(output_file)
+    if not os.path.exists(silver_path):
+        os.makedirs(silver_path)
+
+    try:
+        # Cabeçalho lido à parte para montar o schema explícito (sem inferência de tipos)
+        with open(raw_path, newline='') as f:
+            raw_columns = next(csv.reader(f))
+        schema = pa.schema([(col.lower(), pa.from_numpy_dtype(np.dtype(silver_dtype(col.lower())))) for col in raw_columns])
+        column_types = {col: schema.field(col.lower()).type for col in raw_columns}
+
+        reader = pv.open_csv(
+            raw_path,
+            read_options=pv.ReadOptions(block_size=block_size),
+            convert_options=pv.ConvertOptions(column_types=column_types),
+        )
+
+        # Escreve em arquivo temporário e troca no final: a Silver anterior nunca fica pela metade
+        tmp_file = output_file + ".tmp"
+        pending, pending_rows, total_rows = [], 0, 0
+        with pq.ParquetWriter(tmp_file, schema, compression='snappy') as writer:
+            for batch in reader:
+                # Padronização de Schema (snake_case) por batch
+                pending.append(pa.RecordBatch.from_arrays(batch.columns, schema=schema))
+                pending_rows += batch.num_rows
+
+                while pending_rows >= row_group_size:
+                    table = pa.Table.from_batches(pending, schema=schema)
+                    writer.write_table(table.slice(0, row_group_size), row_group_size=row_group_size)
+                    pending = table.slice(row_group_size).to_batches()
+                    pending_rows -= row_group_size
+                    total_rows += row_group_size
+
+            if pending_rows:
+                writer.write_table(pa.Table.from_batches(pending, schema=schema), row_group_size=row_group_size)
+                total_rows += pending_rows
+
+        os.replace(tmp_file, output_file)
+        print(f"✅ Ingestão em streaming concluída! {total_rows} linhas salvas em Parquet na pasta Silver.")
+
     except Exception as e:
         print(f"❌ Erro na ingestão: {e}")
 
 if __name__ == "__main__":
-    ingest_to_silver()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Ingestão Raw (CSV) -> Silver (Parquet)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Lê o CSV em blocos com memória constante (pyarrow)")
+    args = parser.parse_args()
+
+    if args.streaming:
+        ingest_to_silver_streaming()
+    else:
+        ingest_to_silver()
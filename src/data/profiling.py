@@ -1,42 +1,179 @@
-import pandas as pd
+import numpy as np
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 import os
+import sys
+import json
+import argparse
+from datetime import datetime, timezone
 
-def run_initial_profiling():
-    # Caminho do dado bruto
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    raw_data_path = os.path.join(current_dir, "../../data/raw/creditcard.csv")
-    raw_data_path = os.path.normpath(raw_data_path)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.normpath(os.path.join(current_dir, "..")))
+from sketches import MomentsAccumulator, QuantileSketch
 
-    if not os.path.exists(raw_data_path):
-        print(f"ERRO: Arquivo não encontrado em {raw_data_path}")
-        print(f"CWD (Diretório de Trabalho Atual): {os.getcwd()}")
-        return
-    
-    # Carrega apenas uma amostra para análise de saúde
-    df = pd.read_csv(raw_data_path)
-    
+RAW_PATH = os.path.normpath(os.path.join(current_dir, "../../data/raw/creditcard.csv"))
+SILVER_FILE = os.path.normpath(os.path.join(current_dir, "../../data/silver/fraud_data_silver.parquet"))
+
+PROFILE_QUANTILES = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+BATCH_ROWS = 65_536
+CSV_BLOCK_SIZE = 8 * 1024 * 1024
+
+def profile_path_for(input_path):
+    """data/silver/fraud_data_silver.parquet -> data/silver/fraud_data_silver_profile.json"""
+    return os.path.splitext(input_path)[0] + "_profile.json"
+
+def _source_signature(input_path):
+    stat = os.stat(input_path)
+    return {"path": os.path.abspath(input_path), "size_bytes": stat.st_size, "mtime": stat.st_mtime}
+
+def _footer_null_counts(parquet_file):
+    """Nulos por coluna direto das estatísticas dos row groups (None se algum row group não tiver)."""
+    metadata = parquet_file.metadata
+    null_counts = {}
+    for i in range(metadata.num_columns):
+        name = metadata.schema.column(i).name.lower()
+        total = 0
+        for rg in range(metadata.num_row_groups):
+            stats = metadata.row_group(rg).column(i).statistics
+            if stats is None or not stats.has_null_count:
+                return None
+            total += stats.null_count
+        null_counts[name] = total
+    return null_counts
+
+def _record_batches(input_path):
+    if input_path.endswith(".parquet"):
+        return pq.ParquetFile(input_path).iter_batches(batch_size=BATCH_ROWS)
+    return pv.open_csv(input_path, read_options=pv.ReadOptions(block_size=CSV_BLOCK_SIZE))
+
+def build_profile(input_path, quantiles=PROFILE_QUANTILES, sketch_k=200):
+    """
+    Perfil em uma única passada por record batches (memória constante):
+    volume, nulos, balanceamento da classe e, por coluna, min/max/média/desvio
+    (Welford/Chan) e quantis aproximados (QuantileSketch).
+    Para Parquet (Silver), linhas e nulos vêm do rodapé, sem varredura.
+    """
+    footer_rows, footer_nulls = None, None
+    if input_path.endswith(".parquet"):
+        parquet_file = pq.ParquetFile(input_path)
+        footer_rows = parquet_file.metadata.num_rows
+        footer_nulls = _footer_null_counts(parquet_file)
+
+    columns, moments, sketches = None, {}, {}
+    scanned_rows, scanned_nulls = 0, {}
+    class_counts = {}
+
+    for batch in _record_batches(input_path):
+        if columns is None:
+            columns = [name.lower() for name in batch.schema.names]
+            moments = {col: MomentsAccumulator() for col in columns}
+            sketches = {col: QuantileSketch(k=sketch_k) for col in columns}
+            scanned_nulls = {col: 0 for col in columns}
+
+        scanned_rows += batch.num_rows
+        for col, array in zip(columns, batch.columns):
+            scanned_nulls[col] += array.null_count
+            values = array.to_numpy(zero_copy_only=False).astype(np.float64)
+            moments[col].update(values)
+            sketches[col].update(values)
+            if col == 'class':
+                labels, counts = np.unique(values[~np.isnan(values)], return_counts=True)
+                for label, c in zip(labels, counts):
+                    class_counts[int(label)] = class_counts.get(int(label), 0) + int(c)
+
+    if columns is None:
+        raise ValueError(f"Arquivo vazio: {input_path}")
+
+    rows = footer_rows if footer_rows is not None else scanned_rows
+    null_counts = footer_nulls if footer_nulls is not None else scanned_nulls
+    fraud_count = class_counts.get(1, 0)
+
+    return {
+        "source": _source_signature(input_path),
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "counts_from": "parquet_footer" if footer_rows is not None and footer_nulls is not None else "scan",
+        "rows": rows,
+        "columns": len(columns),
+        "null_counts": null_counts,
+        "total_nulls": int(sum(null_counts.values())),
+        "class_balance": {
+            "legit": class_counts.get(0, 0),
+            "fraud": fraud_count,
+            "fraud_rate": fraud_count / rows if rows else 0.0,
+        },
+        "column_stats": {
+            col: {
+                **moments[col].to_dict(),
+                "quantiles": dict(zip([str(q) for q in quantiles], sketches[col].quantiles(quantiles))),
+            }
+            for col in columns
+        },
+    }
+
+def save_profile(profile, output_path):
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2, ensure_ascii=False)
+
+def load_profile(input_path):
+    """
+    Perfil salvo para `input_path`, ou None se não existir ou estiver desatualizado
+    (tamanho/mtime do arquivo de origem mudaram). Evita reprocessar o dado nas etapas seguintes.
+    """
+    output_path = profile_path_for(input_path)
+    if not os.path.exists(output_path) or not os.path.exists(input_path):
+        return None
+    with open(output_path, encoding='utf-8') as f:
+        profile = json.load(f)
+    source = _source_signature(input_path)
+    if (profile["source"]["size_bytes"], profile["source"]["mtime"]) != (source["size_bytes"], source["mtime"]):
+        return None
+    return profile
+
+def print_report(profile):
     print("---RELATÓRIO DE SAÚDE DOS DADOS (FASE 2)---")
 
     # Avaliação de Volume e Granularidade
-    print(f"\nTotal de Transações: {df.shape[0]}")
-    print(f"\nTotal de Atributos: {df.shape[1]}")
+    print(f"\nTotal de Transações: {profile['rows']}")
+    print(f"\nTotal de Atributos: {profile['columns']}")
 
     # Avaliação de Dados Ausentes
-    null_counts = df.isnull().sum().sum()
+    null_counts = profile['total_nulls']
     print(f"Valores Ausentes: {null_counts} ({'Saudável' if null_counts == 0 else 'Alerta'})")
 
     # Avaliação de Desbalanceamento
-    fraud_count = df[df['Class'] == 1].shape[0]
-    legit_count = df[df['Class'] == 0].shape[0]
-    fraud_percent = (fraud_count / len(df)) * 100
-
+    balance = profile['class_balance']
     print(f"\n---ANÁLISE DA VARIÁVEL ALVO---")
-    print(f"Transações Legítimas: {legit_count}")
-    print(f"Transações Fraudulentas: {fraud_count}")
-    print(f"Taxa de Fraude: {fraud_percent:.4f}%")
+    print(f"Transações Legítimas: {balance['legit']}")
+    print(f"Transações Fraudulentas: {balance['fraud']}")
+    print(f"Taxa de Fraude: {balance['fraud_rate'] * 100:.4f}%")
 
     # Avaliação Temporal
-    print(f"\nJanela Temporal (segundos): {df['Time']. max()} (~{df['Time'].max()/3600:.2f} horas)")
+    time_max = profile['column_stats']['time']['max']
+    print(f"\nJanela Temporal (segundos): {time_max} (~{time_max/3600:.2f} horas)")
+
+def run_initial_profiling(input_path=RAW_PATH, force=False):
+    if not os.path.exists(input_path):
+        print(f"ERRO: Arquivo não encontrado em {input_path}")
+        print(f"CWD (Diretório de Trabalho Atual): {os.getcwd()}")
+        return
+
+    # Reaproveita o perfil salvo enquanto o arquivo de origem não mudar
+    profile = None if force else load_profile(input_path)
+    if profile is None:
+        profile = build_profile(input_path)
+        save_profile(profile, profile_path_for(input_path))
+        print(f"💾 Perfil salvo em: {profile_path_for(input_path)}")
+    else:
+        print(f"♻️ Perfil reaproveitado: {profile_path_for(input_path)}")
+
+    print_report(profile)
+    return profile
 
 if __name__== "__main__":
-    run_initial_profiling()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Perfil de saúde dos dados em uma passada")
+    parser.add_argument("--input", default=RAW_PATH, help="CSV bruto ou Parquet da Silver")
+    parser.add_argument("--silver", action="store_true", help=f"Atalho para {SILVER_FILE}")
+    parser.add_argument("--force", action="store_true", help="Ignora o perfil salvo e refaz a varredura")
+    args = parser.parse_args()
+
+    run_initial_profiling(SILVER_FILE if args.silver else args.input, force=args.force)
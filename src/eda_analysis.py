@@ -2,87 +2,140 @@ import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 import os
+import time
+import argparse
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from feature_engineering import compute_hour
 
 # Configurações visuais
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
 
-def perform_eda():
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    train_path = os.path.join(base_path, "../data/trusted/train_data.parquet")
-    reports_path = os.path.join(base_path, "../reports/figures/")
-    
-    if not os.path.exists(reports_path):
-        os.makedirs(reports_path)
+base_path = os.path.dirname(os.path.abspath(__file__))
+TRAIN_PATH = os.path.join(base_path, "../data/trusted/train_data.parquet")
+REPORTS_PATH = os.path.join(base_path, "../reports/figures/")
 
-    print("--- INICIANDO EDA COM FOCO EM TREINO ---")
-    
-    try:
-        df = pd.read_parquet(train_path)
-    except Exception as e:
-        print(f"Erro ao ler arquivo: {e}")
-        return
+KDE_SAMPLE_ROWS = None  # Linhas por classe no KDE temporal (None = todas; amostragem é opcional, ex.: 50_000)
 
-    # Garante que a classe seja Inteiro (0/1) e não String ('0'/'1')
-    df['class'] = df['class'].astype(int)
+def class_statistics(df, cols):
+    """Média e desvio padrão por classe de todas as features em uma única passada agrupada."""
+    return df.groupby('class')[cols].agg(['mean', 'std'])
 
-    # 1. Análise Temporal (Ciclos Diários)
-    df['hour'] = df['time'].apply(lambda x: np.floor(x / 3600)) % 24
+def separation_ranking(df, cols):
+    """Distância normalizada |média fraude - média legítima| / desvio legítimo, da maior para a menor."""
+    stats = class_statistics(df, cols)
+    if not {0, 1} <= set(stats.index):
+        # Só uma classe presente: não há separação a medir
+        return pd.DataFrame({'feature': cols, 'divergence': np.nan})
+    means = stats.xs('mean', axis=1, level=1)
+    stds = stats.xs('std', axis=1, level=1)
+    divergence = (means.loc[1] - means.loc[0]).abs() / (stds.loc[0] + 1e-6)
+    ranking_df = pd.DataFrame({'feature': cols, 'divergence': divergence[cols].to_numpy()})
+    return ranking_df.sort_values(by='divergence', ascending=False)
 
+def stratified_sample(df, rows_per_class, seed=42):
+    """Até `rows_per_class` linhas de cada classe (a fraude, minoritária, costuma entrar inteira)."""
+    if rows_per_class is None:
+        return df
+    return pd.concat([group.sample(n=min(len(group), rows_per_class), random_state=seed)
+                      for _, group in df.groupby('class')])
+
+# --- Figuras independentes: cada uma recebe só as colunas que usa e roda em um processo do pool ---
+def plot_temporal_distribution(df, reports_path):
     plt.figure(figsize=(14, 6))
-    sns.kdeplot(data=df[df['class'] == 0]['hour'], label='Legítima', fill=True, color='g', alpha=0.3)
-    sns.kdeplot(data=df[df['class'] == 1]['hour'], label='Fraude', fill=True, color='r', alpha=0.3)
+    sns.kdeplot(data=df.loc[df['class'] == 0, 'hour'], label='Legítima', fill=True, color='g', alpha=0.3)
+    sns.kdeplot(data=df.loc[df['class'] == 1, 'hour'], label='Fraude', fill=True, color='r', alpha=0.3)
     plt.title('Distribuição Temporal: Fraude vs Legítima')
     plt.xlabel('Hora do Dia (Aproximada)')
     plt.legend()
     plt.savefig(os.path.join(reports_path, "1_temporal_distribution.png"))
     plt.close()
-    print("✅ Gráfico Temporal gerado.")
+    return "✅ Gráfico Temporal gerado."
 
-    # 2. Análise Monetária (Amount)
+def plot_amount_distribution(df, reports_path):
     plt.figure(figsize=(10, 6))
     # Correção de Sintaxe Seaborn (hue=class)
-    sns.boxplot(x='class', y='amount', data=df, hue='class', showfliers=False, palette={0: "g", 1: "r"}, legend=False) 
+    sns.boxplot(x='class', y='amount', data=df, hue='class', showfliers=False, palette={0: "g", 1: "r"}, legend=False)
     plt.title('Distribuição de Valor (Log Scale Visual)')
     plt.yscale('log')
     plt.savefig(os.path.join(reports_path, "2_amount_distribution.png"))
     plt.close()
-    print("✅ Gráfico de Valor gerado.")
+    return "✅ Gráfico de Valor gerado."
 
-    # 3. Ranking de Separação de Variáveis
-    cols = [c for c in df.columns if c not in ['class', 'time', 'hour']]
-    ranking = []
-    
-    for col in cols:
-        mean_fraud = df[df['class'] == 1][col].mean()
-        mean_legit = df[df['class'] == 0][col].mean()
-        std_legit = df[df['class'] == 0][col].std()
-        
-        # Distância normalizada
-        divergence = abs(mean_fraud - mean_legit) / (std_legit + 1e-6)
-        ranking.append({'feature': col, 'divergence': divergence})
-    
-    ranking_df = pd.DataFrame(ranking).sort_values(by='divergence', ascending=False)
-    
-    print("\n--- TOP 5 FEATURES DISCRIMINANTES (Candidatas a Ouro) ---")
-    print(ranking_df.head(5))
-    
-    # 4. Plotar as Top 3 features discriminantes
-    top_features = ranking_df.head(3)['feature'].values
-    
+def plot_top_features(df, top_features, reports_path):
     plt.figure(figsize=(16, 5))
     for i, col in enumerate(top_features):
         plt.subplot(1, 3, i+1)
-        
+
         sns.boxplot(x='class', y=col, data=df, hue='class', showfliers=False, palette={0: "g", 1: "r"}, legend=False)
         plt.title(f'Separação por {col}')
-    
+
     plt.tight_layout()
     plt.savefig(os.path.join(reports_path, "3_top_features_separation.png"))
     plt.close()
-    print("✅ Gráfico de Features Discriminantes gerado.")
+    return "✅ Gráfico de Features Discriminantes gerado."
+
+def perform_eda(workers=3, kde_sample_rows=KDE_SAMPLE_ROWS, train_path=TRAIN_PATH, reports_path=REPORTS_PATH):
+    """
+    EDA do treino: ranking de separação em uma passada agrupada (groupby) e as três
+    figuras renderizadas em paralelo (workers <= 1 renderiza em sequência).
+    """
+    start = time.perf_counter()
+    if not os.path.exists(reports_path):
+        os.makedirs(reports_path)
+
+    print("--- INICIANDO EDA COM FOCO EM TREINO ---")
+
+    try:
+        df = pd.read_parquet(train_path)
+    except Exception as e:
+        print(f"Erro ao ler arquivo: {e}")
+        return
+
+    # Garante que a classe seja Inteiro (0/1) e não String ('0'/'1')
+    df['class'] = df['class'].astype(int)
+
+    # 1. Análise Temporal (Ciclos Diários) - KDE em amostra estratificada por classe
+    df['hour'] = compute_hour(df['time'])
+    temporal_df = stratified_sample(df[['hour', 'class']], kde_sample_rows)
+
+    # 2. Ranking de Separação de Variáveis (uma passada agrupada)
+    cols = [c for c in df.columns if c not in ['class', 'time', 'hour']]
+    ranking_df = separation_ranking(df, cols)
+
+    if ranking_df['divergence'].isna().all():
+        print("⚠️ Treino com uma única classe: ranking de separação indisponível.")
+
+    print("\n--- TOP 5 FEATURES DISCRIMINANTES (Candidatas a Ouro) ---")
+    print(ranking_df.head(5))
+
+    # Top 3 features discriminantes (gráfico 3)
+    top_features = list(ranking_df.head(3)['feature'].values)
+
+    # 3. Figuras (independentes entre si)
+    jobs = [
+        (plot_temporal_distribution, (temporal_df, reports_path)),
+        (plot_amount_distribution, (df[['amount', 'class']], reports_path)),
+        (plot_top_features, (df[top_features + ['class']], top_features, reports_path)),
+    ]
+    if workers <= 1:
+        messages = [func(*args) for func, args in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = [pool.submit(func, *args) for func, args in jobs]
+            messages = [future.result() for future in futures]
+    for message in messages:
+        print(message)
+
     print(f"Relatórios salvos em: {reports_path}")
+    print(f"⏱️ EDA concluída em {time.perf_counter() - start:.2f}s")
+    return ranking_df
 
 if __name__ == "__main__":
-    perform_eda()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Análise exploratória do treino")
+    parser.add_argument("--workers", type=int, default=3, help="Processos para renderizar as figuras (1 = sequencial)")
+    parser.add_argument("--kde-sample-rows", type=int, default=KDE_SAMPLE_ROWS,
+                        help="Amostra estratificada: linhas por classe no KDE temporal (padrão: todas)")
+    args = parser.parse_args()
+    perform_eda(workers=args.workers, kde_sample_rows=args.kde_sample_rows or None)
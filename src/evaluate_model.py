@@ -5,10 +5,12 @@ import os
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.metrics import precision_recall_curve, confusion_matrix
+from model_artifact import load_predictor
+from feature_cache import load_features
+from threshold_optimizer import ThresholdOptimizer
 
 def evaluate_financial_impact():
     base_path = os.path.dirname(os.path.abspath(__file__))
-    gold_path = os.path.join(base_path, "../data/gold/")
     models_path = os.path.join(base_path, "../models/")
     reports_path = os.path.join(base_path, "../reports/figures/")
     
@@ -19,25 +21,21 @@ def evaluate_financial_impact():
     
     # 1. Carrega Modelo Challenger e Dados de Teste
     try:
-        model = joblib.load(os.path.join(models_path, "challenger_model.pkl"))
-        test_df = pd.read_parquet(os.path.join(gold_path, "test_data.parquet"))
+        model = load_predictor(os.path.join(models_path, "challenger_model.pkl"),
+                               os.path.join(models_path, "challenger_artifact"))
+        test = load_features("test")
     except Exception as e:
         print(f"❌ Erro ao carregar artefatos: {e}")
         return
 
-    # Prepara dados
-    target = 'class'
-    drop_cols = [target, 'time']
-    X_test = test_df.drop(columns=drop_cols)
-    y_test = test_df[target]
+    # Prepara dados (cache de features: X float32 sem 'class' e 'time')
+    X_test = test.frame()
+    y_test = test.y
     
     # 2. Obter Probabilidades
     y_proba = model.predict_proba(X_test)[:, 1]
     
-    # 3. Simulação Financeira (Loop de Thresholds)
-    thresholds = np.arange(0.01, 1.00, 0.01)
-    costs = []
-    
+    # 3. Simulação Financeira (todos os thresholds distintos: ordena 1x + somas acumuladas)
     # Premissas de Negócio
     COST_FN = 100  # Perda média por fraude não pega (Chargeback)
     COST_FP = 2    # Custo de fricção (SMS, Call Center, Risco de Churn)
@@ -45,21 +43,14 @@ def evaluate_financial_impact():
     print(f"--- PREMISSAS ---")
     print(f"Custo Fraude (FN): €{COST_FN} | Custo Bloqueio Indevido (FP): €{COST_FP}")
     
-    best_threshold = 0.5
-    min_cost = float('inf')
+    optimizer = ThresholdOptimizer(y_test, y_proba, cost_fn=COST_FN, cost_fp=COST_FP)
+    best = optimizer.best()
+    best_threshold = best["threshold"]
+    min_cost = best["cost"]
     
-    for thresh in thresholds:
-        y_pred_t = (y_proba >= thresh).astype(int)
-        cm = confusion_matrix(y_test, y_pred_t)
-        tn, fp, fn, tp = cm.ravel()
-        
-        # Fórmula do Custo Total
-        total_cost = (fn * COST_FN) + (fp * COST_FP)
-        costs.append(total_cost)
-        
-        if total_cost < min_cost:
-            min_cost = total_cost
-            best_threshold = thresh
+    # Curva de custo na grade de 0.01 (visualização)
+    thresholds = np.arange(0.01, 1.00, 0.01)
+    costs = optimizer.evaluate(thresholds)["cost"]
 
     # 4. Resultados
     print(f"\n--- RESULTADO DA OTIMIZAÇÃO ---")
@@ -70,15 +61,19 @@ def evaluate_financial_impact():
     cost_default = (cm_def.ravel()[2] * COST_FN) + (cm_def.ravel()[1] * COST_FP)
     
     print(f"Threshold Padrão (0.50): Custo Total = €{cost_default:,.2f}")
-    print(f"Threshold Otimizado ({best_threshold:.2f}): Custo Total = €{min_cost:,.2f}")
+    print(f"Threshold Otimizado ({best_threshold:.4f}): Custo Total = €{min_cost:,.2f}")
     
     savings = cost_default - min_cost
     print(f"💰 Economia Projetada: €{savings:,.2f} (Melhora de {savings/cost_default:.1%})")
     
+    # Cenário ponderado: o chargeback custa o valor da própria transação
+    weighted = ThresholdOptimizer(y_test, y_proba, cost_fn=test.extra('amount'), cost_fp=COST_FP).best()
+    print(f"Threshold Otimizado por Valor (FN = amount): {weighted['threshold']:.4f} | Custo Total = €{weighted['cost']:,.2f}")
+    
     # 5. Gera Gráfico "Money Plot"
     plt.figure(figsize=(10, 6))
     plt.plot(thresholds, costs, color='red', label='Prejuízo Total')
-    plt.axvline(best_threshold, color='green', linestyle='--', label=f'Otimizado ({best_threshold:.2f})')
+    plt.axvline(best_threshold, color='green', linestyle='--', label=f'Otimizado ({best_threshold:.4f})')
     plt.axvline(0.5, color='gray', linestyle=':', label='Padrão (0.5)')
     
     plt.title('Curva de Custo Financeiro x Threshold de Decisão')
@@ -91,15 +86,11 @@ def evaluate_financial_impact():
     plt.savefig(plot_file)
     print(f"✅ Gráfico de impacto financeiro salvo em: {plot_file}")
     
-    # 6. Salva Métricas Finais do Otimizado
-    y_pred_opt = (y_proba >= best_threshold).astype(int)
-    cm_opt = confusion_matrix(y_test, y_pred_opt)
-    tn, fp, fn, tp = cm_opt.ravel()
-    
-    print(f"\nMatriz de Confusão (Threshold {best_threshold:.2f}):")
-    print(f"TP (Fraudes Pegas): {tp}")
-    print(f"FN (Fraudes Perdidas): {fn}")
-    print(f"FP (Bloqueios Indevidos): {fp}")
+    # 6. Salva Métricas Finais do Otimizado (já calculadas pelo otimizador)
+    print(f"\nMatriz de Confusão (Threshold {best_threshold:.4f}):")
+    print(f"TP (Fraudes Pegas): {best['tp']}")
+    print(f"FN (Fraudes Perdidas): {best['fn']}")
+    print(f"FP (Bloqueios Indevidos): {best['fp']}")
 
 if __name__ == "__main__":
     evaluate_financial_impact()
\ No newline at end of file
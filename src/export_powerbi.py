@@ -1,116 +1,205 @@
 import pandas as pd
-import joblib
 import os
+import time
+import argparse
+import resource
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor
+from feature_engineering import FraudFeatureEngineer, NIGHT_END_HOUR
+from model_artifact import load_predictor
+from gold_dataset import iter_gold, gold_exists
+import feature_cache
+from feature_cache import load_features
 
-def export_data_for_business_simulation():
+base_path = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(base_path, "../models/challenger_model.pkl")
+ARTIFACT_PATH = os.path.join(base_path, "../models/challenger_artifact")
+OUTPUT_PATH = os.path.join(base_path, "../reports/powerbi_dataset.csv")
+PARQUET_OUTPUT_PATH = os.path.join(base_path, "../reports/powerbi_dataset.parquet")
+
+# --- CÁLCULO DE IMPACTO FINANCEIRO (SIMULAÇÃO) ---
+COST_FRAUD = 100    # Custo médio de um chargeback
+COST_BLOCK = 2      # Custo operacional de revisar/bloquear cliente
+
+CHUNK_ROWS = 100_000  # Linhas por bloco pontuado (pico de memória ~ processos x bloco)
+
+# Modelo e cache de features abertos uma vez por processo do pool (mmap: páginas compartilhadas)
+_model = None
+_features = {}
+
+def _init_worker(model_path, artifact_path):
+    global _model
+    _model = load_predictor(model_path, artifact_path, mmap_mode='r')
+
+def period_of(hour):
+    """Períodos de Negócio: Madrugada (0-6h), Noite (18-23h), Dia Comercial (7-17h)."""
+    return np.select([hour <= NIGHT_END_HOUR, hour >= 18], ['Madrugada', 'Noite'], default='Dia Comercial')
+
+def threshold_cost(real, pred):
+    """Custo por transação: FN = chargeback (prejuízo total), FP = atrito com cliente bom, acertos = 0."""
+    return np.select([(real == 1) & (pred == 0), (real == 0) & (pred == 1)], [COST_FRAUD, COST_BLOCK], default=0)
+
+def score_chunk(df, first_id):
+    """Pontua um bloco e monta as colunas do relatório, tudo vetorizado."""
+    # Converte para Hora do Dia (0-23) com as mesmas regras do treino.
+    df = FraudFeatureEngineer().transform(df)
+    hour = df['hour'].to_numpy().astype(int)
+
+    # Simula Inferência
+    probs = _model.predict_proba(df[_model.feature_names_in_])[:, 1]
+
+    real = df['class'].to_numpy().astype(np.int64)
+    pred_20 = (probs >= 0.20).astype(int)  # Cenário B: Modelo Atual (Threshold 0.20 - Estratégia Aplicada)
+    pred_50 = (probs >= 0.50).astype(int)  # Cenário C: Modelo Padrão (Threshold 0.50)
+
+    return pd.DataFrame({
+        'time': df['time'].to_numpy(),
+        'amount': df['amount'].to_numpy(),
+        'class': df['class'].to_numpy(),
+        'hour': hour,
+        'Periodo': period_of(hour),
+        'transaction_id': np.arange(first_id, first_id + len(df)),  # ID Único Sequencial
+        'probability': np.round(probs, 4),
+        'transaction_status': np.where(real == 1, 'Fraude Real', 'Legítima'),
+        'cost_no_model': real * COST_FRAUD,  # Cenário A: Sem Modelo (todas as fraudes viram prejuízo)
+        'cost_threshold_0.20': threshold_cost(real, pred_20),
+        'decision_20': np.where(pred_20 == 1, 'Bloquear', 'Aprovar'),
+        'cost_threshold_0.50': threshold_cost(real, pred_50),
+    })
+
+def cached_chunk(split, start, stop):
+    """Bloco [start:stop) do split a partir do cache de features (time/amount em float64, como na Gold)."""
+    if split not in _features:
+        _features[split] = load_features(split)
+    features = _features[split]
+    df = features.frame(start=start, stop=stop)
+    df['time'] = features.extra('time', start, stop)
+    df['amount'] = features.extra('amount', start, stop)
+    df['class'] = features.y[start:stop]
+    return df
+
+def score_cached_chunk(split, start, stop, first_id):
+    """Versão do score_chunk que lê o bloco do cache dentro do worker (só índices trafegam no pool)."""
+    return score_chunk(cached_chunk(split, start, stop), first_id)
+
+def iter_tasks(columns, chunk_rows):
+    """
+    (função, argumentos, linhas) de cada bloco, em ordem de tempo (Treino + Teste).
+    Com o cache de features, os blocos são faixas de linhas lidas pelo próprio worker;
+    sem ele, blocos de DataFrame lidos da Gold em streaming.
+    """
+    if feature_cache.ENABLED:
+        for split in ("train", "test"):
+            n_rows = len(load_features(split))  # Materializa o cache antes de abrir os workers
+            for start in range(0, n_rows, chunk_rows):
+                stop = min(start + chunk_rows, n_rows)
+                yield score_cached_chunk, (split, start, stop), stop - start
+    else:
+        for chunk in iter_chunks(columns, chunk_rows):
+            yield score_chunk, (chunk,), len(chunk)
+
+def iter_chunks(columns, chunk_rows):
+    """Histórico completo (Treino + Teste, já em ordem de tempo) em blocos de `chunk_rows` linhas."""
+    pending, pending_rows = [], 0
+    for split in ("train", "test"):
+        for df in iter_gold(split, columns=columns):
+            pending.append(df)
+            pending_rows += len(df)
+            if pending_rows < chunk_rows:
+                continue
+            block = pd.concat(pending, ignore_index=True)
+            full = len(block) - len(block) % chunk_rows
+            for start in range(0, full, chunk_rows):
+                yield block.iloc[start:start + chunk_rows].reset_index(drop=True)
+            pending = [block.iloc[full:]] if full < len(block) else []
+            pending_rows = len(block) - full
+    if pending_rows:
+        yield pd.concat(pending, ignore_index=True)
+
+def export_data_for_business_simulation(chunk_rows=CHUNK_ROWS, workers=None, parquet=False):
+    """
+    Gera o dataset do Power BI em blocos: leitura da Gold em streaming, pontuação em
+    um pool de processos e escrita incremental do CSV (e, opcionalmente, do Parquet).
+    O pico de memória depende do tamanho do bloco, não do volume do histórico.
+    """
     print("--- 🏢 GERANDO SIMULAÇÃO DE NEGÓCIO (JAN/2026) ---")
-    
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    
-    #Insere dados de treino e teste
-    path_test = os.path.join(base_path, "../data/gold/test_data.parquet")
-    path_train = os.path.join(base_path, "../data/gold/train_data.parquet")
-    model_path = os.path.join(base_path, "../models/challenger_model.pkl")
-    output_path = os.path.join(base_path, "../reports/powerbi_dataset.csv")
-    
+    workers = workers or min(4, os.cpu_count() or 1)
+    start = time.perf_counter()
+
     try:
         print("1. Carregando histórico de transações...")
-        
-        # Carrega as partes
-        if os.path.exists(path_train) and os.path.exists(path_test):
-            df_train = pd.read_parquet(path_train)
-            df_test = pd.read_parquet(path_test)
-            
-            df = pd.concat([df_train, df_test], axis=0).sort_values(by='time')
-            print(f"   -> Dataset Unificado: {len(df)} transações (Simulação Total)")
-        else:
+        if not (gold_exists("train") and gold_exists("test")):
             print("   ❌ Erro: Arquivos de dados não encontrados. Verifique a pasta data/gold.")
             return
 
-        # Carrega o Modelo
-        model = joblib.load(model_path)
-        
-        # 2. Converte para Hora do Dia (0-23).
-        print("2. Calculando Ciclo de 24h...")
-        df['hour'] = (df['time'] // 3600) % 24
-        df['hour'] = df['hour'].astype(int)
-        
-        # Definição de Períodos de Negócio
-        def get_period(h):
-            if h <= 6: return 'Madrugada'
-            elif h >= 18: return 'Noite'
-            else: return 'Dia Comercial'
-        df['Periodo'] = df['hour'].apply(get_period)
-
-        # Log Amount
-        df['amount_log'] = np.log(df['amount'] + 0.001)
-        df['is_night'] = df['hour'].apply(lambda x: 1 if x <= 6 else 0)
-
-        # 3. Simula Inferência
-        print("3. Executando Modelo em todo o período...")
-        expected_cols = model.feature_names_in_
-        X = df[expected_cols]
-        probs = model.predict_proba(X)[:, 1]
-        
-        # 4. Monta Relatório Final
-        export_df = df[['time', 'amount', 'class', 'hour', 'Periodo']].copy()
-        
-        # ID Único Sequencial
-        export_df['transaction_id'] = range(1, len(export_df) + 1)
-        
-        # Probabilidade
-        export_df['probability'] = np.round(probs, 4)
-        
-        # Status Real
-        export_df['transaction_status'] = np.where(export_df['class'] == 1, 'Fraude Real', 'Legítima')
-        
-        # --- CÁLCULO DE IMPACTO FINANCEIRO (SIMULAÇÃO) ---
-        COST_FRAUD = 100    # Custo médio de um chargeback
-        COST_BLOCK = 2      # Custo operacional de revisar/bloquear cliente
-        
-        # Cenário A: Sem Modelo (Deixamos tudo passar)
-        # Custo = Todas as fraudes viram prejuízo
-        export_df['cost_no_model'] = export_df['class'] * COST_FRAUD
-        
-        # Cenário B: Modelo Atual (Threshold 0.20 -Estratégia Aplicada)
-        pred_20 = (probs >= 0.20).astype(int)
-        costs_20 = []
-        
-        # Lógica de Custo linha a linha
-        for real, pred in zip(export_df['class'], pred_20):
-            if real == 1 and pred == 1:
-                costs_20.append(0)          # Sucesso! Bloqueamos a fraude. Custo zero (ou quase zero).
-            elif real == 1 and pred == 0:
-                costs_20.append(COST_FRAUD) # Falha (FN). Fraude passou. Prejuízo total.
-            elif real == 0 and pred == 1:
-                costs_20.append(COST_BLOCK) # Atrito (FP). Bloqueamos cliente bom. Custo baixo.
+        # Carrega o Modelo (define as colunas que precisam ser lidas da Gold)
+        model = load_predictor(MODEL_PATH, ARTIFACT_PATH, mmap_mode='r')
+        columns = list(dict.fromkeys(['time', 'amount', 'class'] + list(model.feature_names_in_)))
+        del model
+
+        print(f"2. Executando Modelo em todo o período (blocos de {chunk_rows} linhas, {workers} processos)...")
+        total_rows, fraud_total, period_counts = 0, 0, {}
+        parquet_writer = None
+        tmp_csv = OUTPUT_PATH + ".tmp"
+        tmp_parquet = PARQUET_OUTPUT_PATH + ".tmp"
+
+        def write(export_chunk, csv_file):
+            nonlocal total_rows, fraud_total, parquet_writer
+            # Cabeçalho só no primeiro bloco
+            export_chunk.to_csv(csv_file, header=(total_rows == 0), index=False, sep=';', decimal=',')
+            if parquet:
+                table = pa.Table.from_pandas(export_chunk, preserve_index=False)
+                if parquet_writer is None:
+                    parquet_writer = pq.ParquetWriter(tmp_parquet, table.schema)
+                parquet_writer.write_table(table)
+            total_rows += len(export_chunk)
+            fraud_total += int(export_chunk['class'].sum())
+            for period, count in export_chunk['Periodo'].value_counts().items():
+                period_counts[period] = period_counts.get(period, 0) + int(count)
+
+        print("3. Salvando CSV formatado (streaming)...")
+        with open(tmp_csv, 'w', encoding='utf-8', newline='') as csv_file:
+            first_id = 1
+            if workers <= 1:
+                _init_worker(MODEL_PATH, ARTIFACT_PATH)
+                for func, task_args, n_rows in iter_tasks(columns, chunk_rows):
+                    write(func(*task_args, first_id), csv_file)
+                    first_id += n_rows
             else:
-                costs_20.append(0)          # Sucesso! Cliente bom passou.
-        
-        export_df['cost_threshold_0.20'] = costs_20
-        export_df['decision_20'] = np.where(pred_20 == 1, 'Bloquear', 'Aprovar')
-
-        # Cenário C: Modelo Padrão (Threshold 0.50)
-        pred_50 = (probs >= 0.50).astype(int)
-        costs_50 = []
-        for real, pred in zip(export_df['class'], pred_50):
-            if real == 1 and pred == 0: costs_50.append(COST_FRAUD)
-            elif real == 0 and pred == 1: costs_50.append(COST_BLOCK)
-            else: costs_50.append(0)
-        export_df['cost_threshold_0.50'] = costs_50
-
-        # 5. Diagnóstico Antes de Salvar
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=(MODEL_PATH, ARTIFACT_PATH)) as pool:
+                    # No máximo 2 blocos por processo em voo; a escrita segue a ordem de leitura
+                    in_flight = []
+                    for func, task_args, n_rows in iter_tasks(columns, chunk_rows):
+                        in_flight.append(pool.submit(func, *task_args, first_id))
+                        first_id += n_rows
+                        if len(in_flight) >= 2 * workers:
+                            write(in_flight.pop(0).result(), csv_file)
+                    for future in in_flight:
+                        write(future.result(), csv_file)
+
+        if parquet_writer is not None:
+            parquet_writer.close()
+            os.replace(tmp_parquet, PARQUET_OUTPUT_PATH)
+        os.replace(tmp_csv, OUTPUT_PATH)
+
+        # 4. Diagnóstico
+        elapsed = time.perf_counter() - start
+        peak_main = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        peak_worker = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
         print("\n--- DIAGNÓSTICO DO DATASET ---")
-        print(f"Total de Transações: {len(export_df)}")
-        print(f"Distribuição por Período:\n{export_df['Periodo'].value_counts()}")
-        print(f"Fraudes Totais na Amostra: {export_df['class'].sum()}")
+        print(f"Total de Transações: {total_rows}")
+        print(f"Distribuição por Período:\n{pd.Series(period_counts, name='count').sort_values(ascending=False)}")
+        print(f"Fraudes Totais na Amostra: {fraud_total}")
+        print(f"Vazão: {total_rows / elapsed:,.0f} linhas/s ({elapsed:.1f}s)")
+        print(f"Pico de memória (RSS): processo principal {peak_main:.0f} MB | maior worker {peak_worker:.0f} MB")
         print("-------------------------------------------------------")
 
-        # 6. Exporta CSV
-        print("4. Salvando CSV formatado...")
-        export_df.to_csv(output_path, index=False, sep=';', decimal=',')
-        print(f"✅ SUCESSO! Arquivo pronto em: {output_path}")
+        print(f"✅ SUCESSO! Arquivo pronto em: {OUTPUT_PATH}")
+        if parquet:
+            print(f"✅ Parquet pronto em: {PARQUET_OUTPUT_PATH}")
 
     except Exception as e:
         print(f"❌ Erro Crítico: {e}")
@@ -118,4 +207,10 @@ def export_data_for_business_simulation():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    export_data_for_business_simulation()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Dataset de simulação de negócio para o Power BI")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Linhas por bloco pontuado")
+    parser.add_argument("--workers", type=int, default=None, help="Processos de pontuação (padrão: até 4; 1 = sem pool)")
+    parser.add_argument("--parquet", action="store_true", help="Também grava reports/powerbi_dataset.parquet")
+    args = parser.parse_args()
+
+    export_data_for_business_simulation(chunk_rows=args.chunk_rows, workers=args.workers, parquet=args.parquet)
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+import os
+import json
+import shutil
+import fcntl
+import hashlib
+from datetime import datetime, timezone
+from gold_dataset import GOLD_PATH, dataset_path, legacy_file_path, read_gold
+
+# --- Cache de Matrizes de Features ---
+# data/feature_cache/<split>/: X.npy (float32, C-contíguo), y.npy (int8), time.npy e amount.npy
+# (float64, precisão original para relatórios) + manifest.json com as colunas e a versão da Gold.
+# Aberto com np.load(mmap_mode='r'): processos em paralelo dividem as mesmas páginas do page cache.
+base_path = os.path.dirname(os.path.abspath(__file__))
+FEATURE_CACHE_PATH = os.path.normpath(os.path.join(base_path, "../data/feature_cache/"))
+MANIFEST_FILE = "manifest.json"
+
+TARGET = 'class'
+EXTRA_COLUMNS = ['time', 'amount']  # Guardadas à parte em float64 (time não é feature do modelo)
+
+# FRAUD_FEATURE_CACHE=0 desativa o cache (lê a Gold a cada chamada, como antes)
+ENABLED = os.getenv("FRAUD_FEATURE_CACHE", "1") == "1"
+
+class FeatureSet:
+    """Matriz de features (float32), alvo e colunas extras de um split, abertos com mmap ou em memória."""
+    def __init__(self, X, y, extras, columns, version):
+        self.X = X
+        self.y = y
+        self.extras = extras
+        self.columns = list(columns)
+        self.version = version
+
+    def __len__(self):
+        return len(self.y)
+
+    def frame(self, columns=None, start=None, stop=None):
+        """DataFrame (sem cópia quando possível) das features, opcionalmente só `columns` e linhas [start:stop]."""
+        X = self.X[start:stop]
+        if columns is None:
+            return pd.DataFrame(X, columns=self.columns, copy=False)
+        index = [self.columns.index(c) for c in columns]
+        return pd.DataFrame(X[:, index], columns=list(columns), copy=False)
+
+    def extra(self, name, start=None, stop=None):
+        return self.extras[name][start:stop]
+
+def cache_dir(split):
+    return os.path.join(FEATURE_CACHE_PATH, split)
+
+def gold_version(split):
+    """
+    Versão da Gold pelo nome, tamanho e mtime de cada arquivo (sem ler conteúdo).
+    A Gold é trocada atomicamente (write_gold), então qualquer regravação muda a versão.
+    """
+    path = dataset_path(split)
+    if os.path.isdir(path):
+        files = [os.path.join(root, name) for root, _, names in os.walk(path) for name in names]
+    else:
+        files = [legacy_file_path(split)]
+    digest = hashlib.blake2b(digest_size=16)
+    for file in sorted(files):
+        stat = os.stat(file)
+        digest.update(f"{os.path.relpath(file, GOLD_PATH)}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+def _read_manifest(split):
+    manifest_file = os.path.join(cache_dir(split), MANIFEST_FILE)
+    if not os.path.exists(manifest_file):
+        return None
+    with open(manifest_file, encoding="utf-8") as f:
+        return json.load(f)
+
+def _from_gold(split):
+    """Lê a Gold e separa X (float32 contíguo), y e as colunas extras."""
+    df = read_gold(split)
+    columns = [c for c in df.columns if c not in (TARGET, 'time')]
+    X = np.ascontiguousarray(df[columns].to_numpy(dtype=np.float32))
+    y = df[TARGET].to_numpy().astype(np.int8)
+    extras = {name: df[name].to_numpy(dtype=np.float64) for name in EXTRA_COLUMNS}
+    return X, y, extras, columns
+
+def materialize(split, version=None):
+    """Grava o cache do split (diretório temporário + troca, como a Gold). Retorna o manifest."""
+    version = version or gold_version(split)
+    X, y, extras, columns = _from_gold(split)
+
+    target = cache_dir(split)
+    tmp_dir = f"{target}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, "X.npy"), X)
+    np.save(os.path.join(tmp_dir, "y.npy"), y)
+    for name, values in extras.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), values)
+    manifest = {
+        "split": split,
+        "gold_version": version,
+        "rows": int(len(y)),
+        "columns": columns,
+        "extras": list(extras),
+        "dtype": "float32",
+        "created_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    old_dir = f"{target}.old-{os.getpid()}"
+    if os.path.exists(target):
+        os.replace(target, old_dir)
+    os.replace(tmp_dir, target)
+    if os.path.exists(old_dir):
+        shutil.rmtree(old_dir)
+    return manifest
+
+def ensure_cache(split):
+    """
+    Manifest do cache do split, (re)materializado só quando a Gold mudou.
+    Processos concorrentes (ex.: treinos em paralelo no pipeline) se serializam
+    em um lock de arquivo e reconferem a versão depois de adquiri-lo: só um grava.
+    """
+    version = gold_version(split)
+    manifest = _read_manifest(split)
+    if manifest is not None and manifest["gold_version"] == version:
+        return manifest
+
+    os.makedirs(FEATURE_CACHE_PATH, exist_ok=True)
+    with open(os.path.join(FEATURE_CACHE_PATH, f"{split}.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        manifest = _read_manifest(split)
+        if manifest is None or manifest["gold_version"] != version:
+            print(f"🧊 Materializando cache de features ({split})...")
+            manifest = materialize(split, version)
+    return manifest
+
+def load_features(split, mmap_mode='r'):
+    """
+    X/y do split. Com o cache ativo, (re)materializa só quando a Gold mudou e abre
+    os .npy com mmap; com FRAUD_FEATURE_CACHE=0, lê a Gold em memória.
+    """
+    if not ENABLED:
+        X, y, extras, columns = _from_gold(split)
+        return FeatureSet(X, y, extras, columns, version=None)
+
+    manifest = ensure_cache(split)
+
+    directory = cache_dir(split)
+    def open_array(name):
+        return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+    extras = {name: open_array(name) for name in manifest["extras"]}
+    return FeatureSet(open_array("X"), open_array("y"), extras, manifest["columns"], manifest["gold_version"])
+
+if __name__ == "__main__":
+    # Etapa "feature_cache" do pipeline: materializa os dois splits antes das etapas que os leem
+    for split in ("train", "test"):
+        features = load_features(split)
+        print(f"✅ {split}: {len(features)} linhas x {len(features.columns)} features | Gold {features.version}")
@@ -1,9 +1,45 @@
 import pandas as pd
 import numpy as np
 import os
+import math
 from sklearn.base import BaseEstimator, TransformerMixin
+from gold_dataset import write_gold, list_windows, PARTITION_SECONDS
 
-# Cria classe para produção futura
+# --- Kernels Vetorizados (Fonte Única das Regras de Feature) ---
+# Usados por treino (Gold), API, Power BI e EDA para evitar Training-Serving Skew.
+# Funcionam com escalares, arrays NumPy e Series do pandas.
+SECONDS_PER_HOUR = 3600
+NIGHT_END_HOUR = 6        # Madrugada: 0h até 6h (inclusive)
+AMOUNT_LOG_OFFSET = 0.001 # Evita log(0)
+
+def compute_hour(time):
+    """Hora do dia (0-23, float) a partir dos segundos desde a primeira transação."""
+    return np.floor(time / SECONDS_PER_HOUR) % 24
+
+def compute_is_night(hour):
+    """Flag 1/0 (int64) de transação na madrugada."""
+    return np.where(hour <= NIGHT_END_HOUR, 1, 0)
+
+def compute_amount_log(amount):
+    """Log do valor da transação."""
+    return np.log(amount + AMOUNT_LOG_OFFSET)
+
+def compute_features_scalar(time, amount):
+    """
+    Versão escalar (math puro) dos kernels acima para o fast path da API,
+    onde criar arrays para uma única transação custa mais que a conta.
+    Retorna (hour, is_night, amount_log), com a mesma semântica do NumPy nas bordas:
+    time infinito/NaN -> hour NaN (is_night 0); amount + offset < 0 ou NaN -> NaN; = 0 -> -inf.
+    """
+    hour = float(math.floor(time / SECONDS_PER_HOUR) % 24) if math.isfinite(time) else math.nan
+    shifted = amount + AMOUNT_LOG_OFFSET
+    if shifted > 0:
+        amount_log = math.log(shifted)
+    else:
+        amount_log = -math.inf if shifted == 0 else math.nan
+    return hour, (1.0 if hour <= NIGHT_END_HOUR else 0.0), amount_log
+
+# Classe para produção (Pipeline sklearn), delegando aos kernels
 class FraudFeatureEngineer(BaseEstimator, TransformerMixin):
     def __init__(self):
         pass
@@ -16,15 +52,15 @@ class FraudFeatureEngineer(BaseEstimator, TransformerMixin):
         
         # 1. Feature: Hora do Dia (0-23)
         # Assume ciclos de 24h.
-        X['hour'] = X['time'].apply(lambda x: np.floor(x / 3600)) % 24
+        X['hour'] = compute_hour(X['time'])
         
         # 2. Feature: Is Night (Madrugada) - Insight da EDA
         # Transações legítimas caem drasticamente entre 0h e 6h.
-        X['is_night'] = X['hour'].apply(lambda x: 1 if x <= 6 else 0)
+        X['is_night'] = compute_is_night(X['hour'])
         
         # 3. Transformação de Log no Amount.
         # Adicionamos +0.001 para evitar log(0)
-        X['amount_log'] = np.log(X['amount'] + 0.001)
+        X['amount_log'] = compute_amount_log(X['amount'])
         
         return X
 
@@ -39,13 +75,13 @@ def run_feature_engineering():
     print("--- INICIANDO FEATURE ENGINEERING ---")
     
     # Processa Treino e Teste separadamente, usando a MESMA lógica
-    files = ["train_data.parquet", "test_data.parquet"]
+    splits = ["train", "test"]
     
     engineer = FraudFeatureEngineer()
     
-    for file in files:
+    for split in splits:
+        file = f"{split}_data.parquet"
         input_file = os.path.join(trusted_path, file)
-        output_file = os.path.join(gold_path, file)
         
         try:
             df = pd.read_parquet(input_file)
@@ -54,9 +90,9 @@ def run_feature_engineering():
             # Aplica a engenharia
             df_gold = engineer.transform(df)
             
-            # Salva na camada Gold
-            df_gold.to_parquet(output_file, index=False)
-            print(f"✅ Salvo em Gold: {output_file} | Colunas: {df_gold.columns.tolist()[-3:]}")
+            # Salva na camada Gold, particionada por janela de tempo (gold_dataset.py)
+            output_dir = write_gold(df_gold, split)
+            print(f"✅ Salvo em Gold: {output_dir} ({len(list_windows(split))} janelas de {PARTITION_SECONDS // 3600}h) | Colunas: {df_gold.columns.tolist()[-3:]}")
             
         except Exception as e:
             print(f"❌ Erro em {file}: {e}")
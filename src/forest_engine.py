@@ -0,0 +1,133 @@
+import numpy as np
+
+TREE_LEAF = -1  # Mesmo marcador de folha usado por sklearn.tree._tree
+ARRAY_NAMES = ['feature', 'threshold', 'children_left', 'children_right', 'value']
+
+def round_down_to_float32(threshold):
+    """
+    Converte thresholds float64 para o maior float32 <= threshold.
+    O sklearn compara X (convertido para float32) contra thresholds float64;
+    para um x float32 vale: x <= t  <=>  x <= floor32(t). A comparação
+    float32 x float32 fica exata e mais barata.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    t32 = threshold.astype(np.float32)
+    above = t32.astype(np.float64) > threshold
+    t32[above] = np.nextafter(t32[above], np.float32(-np.inf))
+    return t32
+
+class FlatForest:
+    """
+    Motor de inferência para RandomForestClassifier com as árvores achatadas
+    em arrays NumPy empacotados (n_trees x max_nodes): feature, threshold,
+    filho esquerdo/direito (índices locais da árvore) e valor da folha.
+
+    Todas as árvores são percorridas juntas, nível a nível, de forma vetorizada.
+    Folhas apontam para si mesmas (threshold = +inf), então `max_depth` passos
+    sempre terminam em uma folha. As probabilidades são bit a bit iguais às de
+    `model.predict_proba` (acúmulo sequencial árvore a árvore, como o sklearn
+    faz com n_jobs=1).
+    """
+    def __init__(self, feature, threshold, children_left, children_right, value,
+                 max_depth, feature_names_in_=None, classes_=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.max_depth = int(max_depth)
+        self.feature_names_in_ = feature_names_in_
+        self.classes_ = classes_
+
+        self.n_trees, self.max_nodes = feature.shape
+        self.n_classes = value.shape[2]
+        self.n_features_in_ = len(feature_names_in_) if feature_names_in_ is not None else None
+
+        # Visões 1D (sem cópia) para indexação plana: nó global = offset da árvore + nó local
+        self._feature_flat = feature.reshape(-1)
+        self._threshold_flat = threshold.reshape(-1)
+        self._left_flat = children_left.reshape(-1)
+        self._right_flat = children_right.reshape(-1)
+        self._value_flat = value.reshape(-1, self.n_classes)
+        self._offsets = (np.arange(self.n_trees, dtype=np.intp) * self.max_nodes)[np.newaxis, :]
+
+    @classmethod
+    def from_model(cls, model):
+        """Exporta as árvores de um RandomForestClassifier treinado."""
+        estimators = getattr(model, 'estimators_', None)
+        if not estimators or not hasattr(estimators[0], 'tree_') or not hasattr(model, 'classes_'):
+            raise ValueError(f"FlatForest suporta apenas florestas de classificação, recebido: {type(model).__name__}")
+
+        trees = [est.tree_ for est in estimators]
+        if trees[0].n_outputs != 1:
+            raise ValueError("FlatForest suporta apenas modelos de saída única.")
+
+        n_trees = len(trees)
+        max_nodes = max(tree.node_count for tree in trees)
+        n_classes = int(trees[0].n_classes[0])
+        # Índices locais cabem em int16 para árvores de até 32k nós (max_depth=10 => 2047)
+        index_dtype = np.int16 if max_nodes <= np.iinfo(np.int16).max else np.int32
+
+        feature = np.zeros((n_trees, max_nodes), dtype=np.int16)
+        threshold = np.full((n_trees, max_nodes), np.inf, dtype=np.float32)
+        children_left = np.zeros((n_trees, max_nodes), dtype=index_dtype)
+        children_right = np.zeros((n_trees, max_nodes), dtype=index_dtype)
+        value = np.zeros((n_trees, max_nodes, n_classes), dtype=np.float64)
+
+        for i, tree in enumerate(trees):
+            n = tree.node_count
+            nodes = np.arange(n)
+            is_leaf = tree.children_left == TREE_LEAF
+
+            feature[i, :n] = np.where(is_leaf, 0, tree.feature)
+            threshold[i, :n] = np.where(is_leaf, np.inf, round_down_to_float32(tree.threshold))
+            children_left[i, :n] = np.where(is_leaf, nodes, tree.children_left)
+            children_right[i, :n] = np.where(is_leaf, nodes, tree.children_right)
+
+            # Mesma normalização de DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :n_classes].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            proba /= normalizer
+            value[i, :n] = proba
+
+        return cls(
+            feature, threshold, children_left, children_right, value,
+            max_depth=max(tree.max_depth for tree in trees),
+            feature_names_in_=getattr(model, 'feature_names_in_', None),
+            classes_=model.classes_,
+        )
+
+    def _as_float32(self, X):
+        # DataFrames são alinhados pela ordem de treino; arrays já devem estar na ordem certa
+        if hasattr(X, 'columns') and self.feature_names_in_ is not None:
+            X = X[self.feature_names_in_].to_numpy(dtype=np.float32)
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return X
+
+    def apply(self, X):
+        """Retorna o índice (local) da folha de cada amostra em cada árvore: (n_samples, n_trees)."""
+        X = self._as_float32(X)
+        rows = np.arange(X.shape[0], dtype=np.intp)[:, np.newaxis]
+        nodes = np.broadcast_to(self._offsets, (X.shape[0], self.n_trees))
+
+        for _ in range(self.max_depth):
+            go_left = X[rows, self._feature_flat[nodes]] <= self._threshold_flat[nodes]
+            local = np.where(go_left, self._left_flat[nodes], self._right_flat[nodes])
+            nodes = local + self._offsets
+
+        return nodes - self._offsets
+
+    def predict_proba(self, X):
+        leaves = self.apply(X) + self._offsets
+        leaf_values = self._value_flat[leaves]  # (n_samples, n_trees, n_classes)
+
+        # Soma sequencial árvore a árvore (cumsum preserva a ordem do acúmulo do sklearn)
+        proba = np.cumsum(leaf_values, axis=1)[:, -1, :].copy()
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
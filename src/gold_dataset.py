@@ -0,0 +1,148 @@
+import numpy as np
+import os
+import shutil
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# --- Camada Gold particionada ---
+# data/gold/<split>/time_window=<n>/part-0.parquet, com n = floor(time / PARTITION_SECONDS).
+# Dentro de cada partição as linhas ficam ordenadas por `time`, então as estatísticas
+# de min/max dos row groups também permitem pular row groups inteiros.
+base_path = os.path.dirname(os.path.abspath(__file__))
+GOLD_PATH = os.path.normpath(os.path.join(base_path, "../data/gold/"))
+
+PARTITION_COLUMN = "time_window"
+PARTITION_SECONDS = 3600  # Janelas de 1h (86400 para janelas diárias em históricos longos)
+ROW_GROUP_ROWS = 65_536
+
+SPLITS = ("train", "test")
+
+def dataset_path(split):
+    return os.path.join(GOLD_PATH, split)
+
+def legacy_file_path(split):
+    """Layout antigo (arquivo único): data/gold/<split>_data.parquet"""
+    return os.path.join(GOLD_PATH, f"{split}_data.parquet")
+
+def _partitioning():
+    return ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.int32())]), flavor="hive")
+
+def time_window_of(time):
+    return np.floor(np.asarray(time, dtype=np.float64) / PARTITION_SECONDS).astype(np.int32)
+
+def write_gold(df, split):
+    """
+    Grava o split como dataset particionado por janela de tempo. Escreve em um
+    diretório temporário e troca no final (leitores nunca veem o dataset pela metade).
+    """
+    df = df.sort_values(by="time", kind="stable")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.append_column(PARTITION_COLUMN, pa.array(time_window_of(df["time"].to_numpy())))
+
+    target = dataset_path(split)
+    tmp_dir = target + ".tmp"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+
+    ds.write_dataset(
+        table, tmp_dir, format="parquet",
+        partitioning=_partitioning(),
+        basename_template="part-{i}.parquet",
+        max_rows_per_group=ROW_GROUP_ROWS,
+        preserve_order=True,
+    )
+
+    old_dir = target + ".old"
+    if os.path.exists(target):
+        os.replace(target, old_dir)
+    os.replace(tmp_dir, target)
+    if os.path.exists(old_dir):
+        shutil.rmtree(old_dir)
+    return target
+
+def list_windows(split):
+    """Janelas de tempo disponíveis, lidas só dos nomes dos diretórios (sem abrir arquivos)."""
+    path = dataset_path(split)
+    if not os.path.isdir(path):
+        return []
+    prefix = f"{PARTITION_COLUMN}="
+    return sorted(int(name[len(prefix):]) for name in os.listdir(path) if name.startswith(prefix))
+
+def read_gold(split, columns=None, time_range=None):
+    """
+    Lê um split da Gold trazendo do disco só as colunas e a faixa de tempo pedidas.
+    `time_range` = (início, fim) em segundos, fim exclusivo (None = sem limite).
+    O filtro poda partições pelo `time_window` e row groups pelas estatísticas de `time`.
+    Retorna as linhas em ordem de `time` (mesma ordem do arquivo único antigo).
+    Sem o dataset particionado, lê o arquivo único com o mesmo filtro.
+    """
+    read_columns = None
+    if columns is not None:
+        read_columns = list(columns) + (["time"] if "time" not in columns else [])
+
+    filter_expr = None
+    if time_range is not None:
+        start, end = time_range
+        if start is not None:
+            filter_expr = ds.field("time") >= start
+        if end is not None:
+            upper = ds.field("time") < end
+            filter_expr = upper if filter_expr is None else filter_expr & upper
+
+    path = dataset_path(split)
+    if os.path.isdir(path):
+        dataset = ds.dataset(path, format="parquet", partitioning=_partitioning())
+        if time_range is not None:
+            # Poda explícita de partições (o filtro em `time` sozinho não toca a chave de partição)
+            start, end = time_range
+            window = ds.field(PARTITION_COLUMN)
+            if start is not None:
+                prune = window >= int(time_window_of(start))
+                filter_expr = filter_expr & prune
+            if end is not None:
+                prune = window <= int(time_window_of(end))
+                filter_expr = filter_expr & prune
+        df = dataset.to_table(columns=read_columns, filter=filter_expr).to_pandas()
+        df = df.drop(columns=[PARTITION_COLUMN], errors="ignore")
+        # Partições são descobertas em ordem lexicográfica (10 antes de 2): reordena por tempo
+        df = df.sort_values(by="time", kind="stable").reset_index(drop=True)
+    else:
+        df = ds.dataset(legacy_file_path(split), format="parquet").to_table(
+            columns=read_columns, filter=filter_expr).to_pandas()
+
+    if columns is not None:
+        df = df[list(columns)]
+    return df
+
+def iter_gold(split, columns=None, batch_rows=ROW_GROUP_ROWS):
+    """
+    Itera o split em DataFrames de até `batch_rows` linhas, em ordem de `time`,
+    sem carregar o split inteiro (partições em ordem numérica, row groups em sequência).
+    """
+    path = dataset_path(split)
+    if os.path.isdir(path):
+        files = []
+        for window in list_windows(split):
+            window_dir = os.path.join(path, f"{PARTITION_COLUMN}={window}")
+            files += [os.path.join(window_dir, name)
+                      for name in sorted(os.listdir(window_dir), key=lambda n: (len(n), n))]
+    else:
+        files = [legacy_file_path(split)]
+
+    for file in files:
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=batch_rows, columns=columns):
+            yield batch.to_pandas()
+
+def gold_exists(split):
+    return os.path.isdir(dataset_path(split)) or os.path.exists(legacy_file_path(split))
+
+def latest_time_range(split, hours):
+    """(início, None) cobrindo as últimas `hours` horas do split, terminando no fim da última janela."""
+    windows = list_windows(split)
+    if windows:
+        end = (windows[-1] + 1) * PARTITION_SECONDS
+    else:
+        times = ds.dataset(legacy_file_path(split), format="parquet").to_table(columns=["time"])["time"]
+        end = float(np.nanmax(times.to_numpy()))
+    return end - hours * 3600, None
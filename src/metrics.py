@@ -0,0 +1,152 @@
+import threading
+from bisect import bisect_left
+from time import perf_counter_ns
+
+# Limites dos buckets em nanossegundos: 1-2-5 por década, de 1µs a 10s
+DEFAULT_BOUNDS_NS = [m * 10 ** e for e in range(3, 10) for m in (1, 2, 5)] + [10 ** 10]
+
+class _Sharded:
+    """
+    Base para métricas sem lock no caminho quente: cada thread escreve apenas no
+    seu próprio shard; a leitura (/metrics) soma os shards. O lock só é usado
+    uma vez por thread, no registro do shard.
+    """
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._register_lock = threading.Lock()
+
+    def _new_shard(self):
+        raise NotImplementedError
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._new_shard()
+            with self._register_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+class LatencyHistogram(_Sharded):
+    """Histograma de latência com buckets fixos (ns); quantis por interpolação dentro do bucket."""
+    def __init__(self, bounds_ns=DEFAULT_BOUNDS_NS):
+        super().__init__()
+        self.bounds_ns = list(bounds_ns)
+
+    def _new_shard(self):
+        # [contagens por bucket (+ overflow), soma em ns]
+        return [[0] * (len(self.bounds_ns) + 1), 0]
+
+    def observe(self, elapsed_ns):
+        shard = self._shard()
+        shard[0][bisect_left(self.bounds_ns, elapsed_ns)] += 1
+        shard[1] += elapsed_ns
+
+    def snapshot(self):
+        counts = [0] * (len(self.bounds_ns) + 1)
+        total_ns = 0
+        for shard_counts, shard_sum in list(self._shards):
+            for i, c in enumerate(shard_counts):
+                counts[i] += c
+            total_ns += shard_sum
+        return counts, total_ns
+
+    def quantiles(self, qs=(0.5, 0.95, 0.99)):
+        """Quantis em nanossegundos (None se não houver observações)."""
+        counts, _ = self.snapshot()
+        n = sum(counts)
+        if n == 0:
+            return {q: None for q in qs}
+
+        result = {}
+        for q in qs:
+            target = q * n
+            cumulative = 0
+            for i, c in enumerate(counts):
+                if c and cumulative + c >= target:
+                    lower = self.bounds_ns[i - 1] if i > 0 else 0
+                    upper = self.bounds_ns[i] if i < len(self.bounds_ns) else self.bounds_ns[-1]
+                    result[q] = lower + (upper - lower) * (target - cumulative) / c
+                    break
+                cumulative += c
+        return result
+
+class LabeledCounter(_Sharded):
+    """Contador por combinação de labels (ex.: decision x risk_level)."""
+    def _new_shard(self):
+        return {}
+
+    def inc(self, labels):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + 1
+
+    def snapshot(self):
+        totals = {}
+        for shard in list(self._shards):
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+class ServingMetrics:
+    """Métricas da API: latência por etapa, decisões e tempo de carga do modelo."""
+    STAGES = ("parse", "features", "align", "inference", "batch_wait", "total")
+
+    def __init__(self):
+        self.stages = {stage: LatencyHistogram() for stage in self.STAGES}
+        self.decisions = LabeledCounter()
+        self.model_load_seconds = None
+        self.model_version = None
+
+    def observe(self, stage, elapsed_ns):
+        self.stages[stage].observe(elapsed_ns)
+
+    def count_decision(self, decision, risk_level):
+        self.decisions.inc((decision, risk_level))
+
+    def render_prometheus(self, gauges=None):
+        """Exposição em formato texto do Prometheus (version 0.0.4)."""
+        lines = [
+            "# HELP fraud_stage_latency_seconds Latência por etapa do predict_fraud.",
+            "# TYPE fraud_stage_latency_seconds summary",
+        ]
+        for stage, histogram in self.stages.items():
+            counts, total_ns = histogram.snapshot()
+            for q, value in histogram.quantiles().items():
+                if value is not None:
+                    lines.append(f'fraud_stage_latency_seconds{{stage="{stage}",quantile="{q}"}} {value / 1e9:.9f}')
+            lines.append(f'fraud_stage_latency_seconds_sum{{stage="{stage}"}} {total_ns / 1e9:.9f}')
+            lines.append(f'fraud_stage_latency_seconds_count{{stage="{stage}"}} {sum(counts)}')
+
+        lines += [
+            "# HELP fraud_requests_total Transações pontuadas por decisão e nível de risco.",
+            "# TYPE fraud_requests_total counter",
+        ]
+        for (decision, risk_level), value in sorted(self.decisions.snapshot().items()):
+            lines.append(f'fraud_requests_total{{decision="{decision}",risk_level="{risk_level}"}} {value}')
+
+        all_gauges = {
+            "fraud_model_load_seconds": self.model_load_seconds,
+            "fraud_model_version": self.model_version,
+        }
+        all_gauges.update(gauges or {})
+        for name, value in all_gauges.items():
+            if value is not None:
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+class RequestStartMiddleware:
+    """
+    Middleware ASGI puro (sem o custo do BaseHTTPMiddleware) que marca o início
+    de cada requisição em scope['state'], lido pelas rotas como
+    `request.state.request_start_ns` para medir a etapa de parsing.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["request_start_ns"] = perf_counter_ns()
+        await self.app(scope, receive, send)
@@ -0,0 +1,143 @@
+import asyncio
+import numpy as np
+
+class MicroBatcher:
+    """
+    Agrupa requisições individuais em lotes para uma única inferência vetorizada.
+
+    Cada chamada de `submit` enfileira uma linha de features e aguarda sua
+    probabilidade. O worker dispara o lote quando ele atinge `max_batch_size`
+    ou quando a primeira linha já esperou `max_wait_us` microssegundos.
+    O `context` opcional (ex.: o modelo que codificou a linha) é repassado ao
+    `predict_fn`; linhas de contextos diferentes nunca vão na mesma inferência.
+    Obs.: o loop do asyncio arredonda timeouts para a resolução do seletor
+    (1 ms no epoll), então esperas abaixo disso valem ~1 ms na prática.
+    """
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_us=500):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size deve ser >= 1")
+        self.predict_fn = predict_fn  # Recebe (linhas (n, n_features), context) e devolve n probabilidades
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait_us = int(max_wait_us)
+
+        self._queue = None
+        self._batch_full = None
+        self._worker = None
+
+        # Estatísticas (lidas por /batcher/stats)
+        self.requests = 0
+        self.batches = 0
+        self.max_queue_depth = 0
+        self.batch_size_counts = np.zeros(self.max_batch_size + 1, dtype=np.int64)
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._batch_full = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        # Ninguém fica esperando para sempre no shutdown (o lote em voo já foi tratado pelo worker)
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._fail_pending(pending)
+
+    @staticmethod
+    def _fail_pending(batch):
+        """Falha os futures ainda sem resposta (lote interrompido pelo cancelamento do worker)."""
+        for _, _, future in batch:
+            if not future.done():
+                future.set_exception(RuntimeError("MicroBatcher encerrado"))
+
+    async def submit(self, row, context=None):
+        """Enfileira uma linha (1, n_features) e retorna sua probabilidade de fraude."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, context, future))
+
+        depth = self._queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+        if depth >= self.max_batch_size:
+            self._batch_full.set()
+
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                # Espera mais itens até encher o lote ou estourar o tempo máximo
+                if self.max_wait_us > 0 and self._queue.qsize() + 1 < self.max_batch_size:
+                    self._batch_full.clear()
+                    try:
+                        await asyncio.wait_for(self._batch_full.wait(), self.max_wait_us / 1e6)
+                    except asyncio.TimeoutError:
+                        pass
+
+                while len(batch) < self.max_batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+
+                await self._flush(loop, batch)
+            finally:
+                # Cancelado no meio do lote (stop): os itens já saíram da fila e não podem ficar pendurados
+                self._fail_pending(batch)
+
+    async def _flush(self, loop, batch):
+        # Agrupa por contexto (normalmente um único grupo; dois durante a troca de modelo)
+        groups = {}
+        for row, context, future in batch:
+            groups.setdefault(id(context), (context, [], []))
+            groups[id(context)][1].append(row)
+            groups[id(context)][2].append(future)
+
+        for context, rows, futures in groups.values():
+            try:
+                # Fora do event loop: novas requisições continuam sendo enfileiradas
+                probas = await loop.run_in_executor(None, self.predict_fn, np.vstack(rows), context)
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for future, proba in zip(futures, probas):
+                    if not future.done():
+                        future.set_result(proba)
+
+        self.requests += len(batch)
+        self.batches += 1
+        self.batch_size_counts[len(batch)] += 1
+
+    def stats(self):
+        """Profundidade da fila e distribuição dos tamanhos de lote."""
+        sizes = np.arange(self.max_batch_size + 1)
+        counts = self.batch_size_counts
+        cumulative = np.cumsum(counts)
+
+        def percentile(q):
+            if self.batches == 0:
+                return 0
+            return int(np.searchsorted(cumulative, q * self.batches))
+
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_us": self.max_wait_us,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": round(float((sizes * counts).sum() / self.batches), 2) if self.batches else 0.0,
+            "p50_batch_size": percentile(0.50),
+            "p95_batch_size": percentile(0.95),
+            "p99_batch_size": percentile(0.99),
+            "batch_size_histogram": {int(s): int(c) for s, c in zip(sizes, counts) if c},
+        }
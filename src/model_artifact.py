@@ -0,0 +1,154 @@
+import numpy as np
+import joblib
+import json
+import os
+from datetime import datetime, timezone
+from scipy.special import expit
+from forest_engine import FlatForest, ARRAY_NAMES
+
+# --- Formato do Artefato ---
+# <diretório>/manifest.json  -> versão, tipo, colunas, threshold, metadados de treino
+# <diretório>/<array>.npy    -> arrays soltos (abríveis com mmap_mode='r')
+ARTIFACT_FORMAT_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+
+class LinearPredictor:
+    """
+    Preditor para o Baseline (StandardScaler + LogisticRegression) reconstruído
+    a partir de quatro arrays: média, escala, coeficientes e intercepto.
+    """
+    def __init__(self, mean, scale, coef, intercept, feature_names_in_=None, classes_=None):
+        self.mean = mean
+        self.scale = scale
+        self.coef = coef
+        self.intercept = intercept
+        self.feature_names_in_ = feature_names_in_
+        self.classes_ = classes_
+
+    @classmethod
+    def from_model(cls, model):
+        steps = getattr(model, 'named_steps', None)
+        if not steps or 'scaler' not in steps or 'model' not in steps or not hasattr(steps['model'], 'coef_'):
+            raise ValueError(f"LinearPredictor espera Pipeline(scaler, model linear), recebido: {type(model).__name__}")
+        scaler, linear = steps['scaler'], steps['model']
+        if linear.coef_.shape[0] != 1:
+            raise ValueError("LinearPredictor suporta apenas classificação binária.")
+        return cls(
+            mean=scaler.mean_.astype(np.float64),
+            scale=scaler.scale_.astype(np.float64),
+            coef=linear.coef_.astype(np.float64),
+            intercept=linear.intercept_.astype(np.float64),
+            feature_names_in_=getattr(model, 'feature_names_in_', None),
+            classes_=linear.classes_,
+        )
+
+    def arrays(self):
+        return {'mean': self.mean, 'scale': self.scale, 'coef': self.coef, 'intercept': self.intercept}
+
+    def _as_float64(self, X):
+        if hasattr(X, 'columns') and self.feature_names_in_ is not None:
+            X = X[self.feature_names_in_]
+        X = np.array(X, dtype=np.float64)
+        return X.reshape(1, -1) if X.ndim == 1 else X
+
+    def decision_function(self, X):
+        # Mesmas operações de StandardScaler.transform + LogisticRegression.decision_function
+        X = self._as_float64(X)
+        X -= self.mean
+        X /= self.scale
+        return (X @ self.coef.T + self.intercept).ravel()
+
+    def predict_proba(self, X):
+        proba = expit(self.decision_function(X))
+        return np.vstack([1 - proba, proba]).T
+
+    def predict(self, X):
+        return self.classes_.take((self.decision_function(X) > 0).astype(int))
+
+def _json_safe(value):
+    if isinstance(value, dict):
+        return {str(k): _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+def export_artifact(model, directory, threshold=None, metadata=None):
+    """
+    Exporta um modelo sklearn treinado para o artefato compacto versionado.
+    RandomForest -> árvores achatadas (feature/filhos int16, threshold float32 arredondado
+    para baixo, valores das folhas float64 para manter a paridade bit a bit).
+    Pipeline(StandardScaler, LogisticRegression) -> média/escala/coef/intercepto.
+    """
+    try:
+        predictor, model_type = FlatForest.from_model(model), "random_forest"
+        arrays = {name: getattr(predictor, name) for name in ARRAY_NAMES}
+        params = {"max_depth": predictor.max_depth}
+    except ValueError:
+        predictor, model_type = LinearPredictor.from_model(model), "logistic_regression"
+        arrays = predictor.arrays()
+        params = {}
+
+    os.makedirs(directory, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(array))
+
+    feature_names = getattr(model, 'feature_names_in_', None)
+    manifest = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "model_type": model_type,
+        "exported_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "feature_names_in_": [str(c) for c in feature_names] if feature_names is not None else None,
+        "classes_": np.asarray(predictor.classes_).tolist(),
+        "threshold": threshold,
+        "params": params,
+        "arrays": {name: {"dtype": str(a.dtype), "shape": list(a.shape)} for name, a in arrays.items()},
+        "metadata": _json_safe(metadata or {}),
+    }
+    with open(os.path.join(directory, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+def read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_FILE), encoding='utf-8') as f:
+        manifest = json.load(f)
+    version = manifest.get("format_version")
+    if version != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Versão de artefato não suportada: {version} (esperado {ARTIFACT_FORMAT_VERSION})")
+    return manifest
+
+def load_artifact(directory, mmap_mode=None):
+    """
+    Reconstrói o preditor (FlatForest ou LinearPredictor) a partir do artefato.
+    Com mmap_mode='r' os arrays não são copiados: vários processos dividem as páginas.
+    O manifest fica disponível em `predictor.manifest`.
+    """
+    manifest = read_manifest(directory)
+    arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+              for name in manifest["arrays"]}
+
+    feature_names = manifest.get("feature_names_in_")
+    common = {
+        "feature_names_in_": np.asarray(feature_names, dtype=object) if feature_names is not None else None,
+        "classes_": np.asarray(manifest["classes_"]),
+    }
+    if manifest["model_type"] == "random_forest":
+        predictor = FlatForest(**arrays, max_depth=manifest["params"]["max_depth"], **common)
+    elif manifest["model_type"] == "logistic_regression":
+        predictor = LinearPredictor(**arrays, **common)
+    else:
+        raise ValueError(f"Tipo de modelo desconhecido no artefato: {manifest['model_type']}")
+
+    predictor.manifest = manifest
+    return predictor
+
+def load_predictor(pickle_path, artifact_path, mmap_mode=None):
+    """Prefere o artefato compacto quando ele existe e é mais novo que o pickle; senão usa o pickle."""
+    manifest_file = os.path.join(artifact_path, MANIFEST_FILE)
+    if os.path.exists(manifest_file) and (
+            not os.path.exists(pickle_path) or os.path.getmtime(manifest_file) >= os.path.getmtime(pickle_path)):
+        return load_artifact(artifact_path, mmap_mode=mmap_mode)
+    return joblib.load(pickle_path)
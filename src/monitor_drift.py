@@ -1,46 +1,78 @@
 import pandas as pd
 import numpy as np
 import os
+import argparse
 from scipy.stats import ks_2samp
+from gold_dataset import read_gold, latest_time_range
+from reference_sketch import FEATURES_TO_MONITOR, load_reference_sketch
 
-def check_data_drift():
+def check_data_drift(window_hours=None, exact=False):
+    """
+    KS-Test entre Treino (referência) e Teste (produção).
+    window_hours=None simula a produção com 50% do teste; com window_hours=N compara
+    só as últimas N horas, lidas direto das partições da Gold (sem carregar o resto).
+    Com o sketch de referência (models/reference_sketch.json, gerado no treino do
+    Challenger) o treino não é lido: KS e PSI saem do sketch + janela, com erro do
+    KS <= 1/m. exact=True força o ks_2samp contra o treino completo.
+    """
     print("--- 🔍 INICIANDO MONITORAMENTO DE DRIFT (CUSTOM KS-TEST) ---")
     
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    # Reference: O dado que o modelo aprendeu (Treino)
-    train_path = os.path.join(base_path, "../data/gold/train_data.parquet")
-    # Current: O dado que está chegando (Teste/Produção)
-    prod_path = os.path.join(base_path, "../data/gold/test_data.parquet")
+    # Definir Features Críticas para Monitorar (monitora somente dados importantes)
+    features_to_monitor = FEATURES_TO_MONITOR
     
     try:
-        # 1. Carrega Dados
-        ref_df = pd.read_parquet(train_path)
-        curr_df = pd.read_parquet(prod_path)
+        # 1. Carrega Dados (apenas as colunas monitoradas)
+        # Reference: O dado que o modelo aprendeu (Treino) - sketch pré-calculado ou Gold completa
+        sketch = None if exact else load_reference_sketch()
+        if sketch is not None and not all(f in sketch["features"] for f in features_to_monitor):
+            print("⚠️ Sketch de referência sem todas as features monitoradas. Usando o treino completo.")
+            sketch = None
+        if sketch is None:
+            ref_df = read_gold("train", columns=features_to_monitor)
+            ref_rows = len(ref_df)
+        else:
+            ref_rows = sketch["features"][features_to_monitor[0]].count
+            print(f"Referência: sketch de {sketch['points']} pontos gerado em {sketch['created_at']}")
         
-        # Simula uma janela de produção (50% do teste aleatoriamente)
-        curr_sample = curr_df.sample(frac=0.5, random_state=42)
+        # Current: O dado que está chegando (Teste/Produção)
+        if window_hours:
+            time_range = latest_time_range("test", window_hours)
+            curr_sample = read_gold("test", columns=features_to_monitor, time_range=time_range)
+            print(f"Janela de produção: últimas {window_hours}h (time >= {time_range[0]:.0f}s)")
+        else:
+            # Simula uma janela de produção (50% do teste aleatoriamente)
+            curr_df = read_gold("test", columns=features_to_monitor)
+            curr_sample = curr_df.sample(frac=0.5, random_state=42)
         
-        # 2. Definir Features Críticas para Monitorar (monitora somente dados importantes)
-        features_to_monitor = ['amount_log', 'is_night', 'v14', 'v17', 'v12', 'v4', 'v11']
+        if curr_sample.empty:
+            print("❌ Nenhuma transação na janela de produção selecionada.")
+            return
         
-        print(f"\nComparando Distribuições: Treino ({len(ref_df)} linhas) vs Produção ({len(curr_sample)} linhas)")
+        print(f"\nComparando Distribuições: Treino ({ref_rows} linhas) vs Produção ({len(curr_sample)} linhas)")
         print(f"Teste Estatístico: Kolmogorov-Smirnov (KS-Test)")
+        if sketch is not None:
+            print(f"Erro máximo do KS estimado pelo sketch: {1 / sketch['points']:.4f} (PSI nos decis do treino)")
         print(f"Limiar de Alerta (P-Value): < 0.05 (Confiança de 95%)\n")
         
-        print(f"{'FEATURE':<15} | {'DRIFT?':<10} | {'P-VALUE':<10} | {'STATUS'}")
-        print("-" * 60)
+        print(f"{'FEATURE':<15} | {'DRIFT?':<10} | {'P-VALUE':<10} | {'PSI':<8} | {'STATUS'}")
+        print("-" * 71)
         
         drift_count = 0
         
         for feature in features_to_monitor:
             # Pega as séries de dados
-            data_ref = ref_df[feature].dropna()
             data_cur = curr_sample[feature].dropna()
             
             # Aplica Teste KS
             # Null Hypothesis (H0): As distribuições são iguais.
             # Se p_value < 0.05, rejeitamos H0 -> Ocorreu Drift.
-            stat, p_value = ks_2samp(data_ref, data_cur)
+            if sketch is None:
+                stat, p_value = ks_2samp(ref_df[feature].dropna(), data_cur)
+                psi = None
+            else:
+                reference = sketch["features"][feature]
+                stat, p_value = reference.ks(data_cur.to_numpy())
+                psi = reference.psi(data_cur.to_numpy())
             
             # Formata output
             is_drift = p_value < 0.05
@@ -48,9 +80,10 @@ def check_data_drift():
             if is_drift:
                 drift_count += 1
             
-            print(f"{feature:<15} | {str(is_drift):<10} | {p_value:.4f}     | {drift_status}")
+            psi_text = f"{psi:.4f}" if psi is not None else "-"
+            print(f"{feature:<15} | {str(is_drift):<10} | {p_value:.4f}     | {psi_text:<8} | {drift_status}")
 
-        print("-" * 60)
+        print("-" * 71)
         
         # 3. Veredito Final
         drift_ratio = drift_count / len(features_to_monitor)
@@ -69,4 +102,10 @@ def check_data_drift():
         print(f"❌ Erro crítico no monitoramento: {e}")
 
 if __name__ == "__main__":
-    check_data_drift()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Monitoramento de drift (KS-Test)")
+    parser.add_argument("--window-hours", type=int, default=None,
+                        help="Compara apenas as últimas N horas de produção")
+    parser.add_argument("--exact", action="store_true",
+                        help="Ignora o sketch de referência e compara contra o treino completo")
+    args = parser.parse_args()
+    check_data_drift(args.window_hours, args.exact)
\ No newline at end of file
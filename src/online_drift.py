@@ -0,0 +1,132 @@
+import time
+import numpy as np
+from bisect import bisect_left
+from metrics import _Sharded
+from reference_sketch import FEATURES_TO_MONITOR, PSI_BINS, psi_from_fractions, ks_p_value
+
+DRIFT_BINS = 100        # Bins fixos nos percentis do treino (contêm os cortes dos decis do PSI)
+MIN_WINDOW_ROWS = 100   # Abaixo disso a janela não tem amostra suficiente para comparar
+DRIFT_P_VALUE = 0.05    # Mesmo limiar do monitor_drift.py
+
+class OnlineDriftMonitor(_Sharded):
+    """
+    Drift em tempo real dentro da API, sem guardar transações.
+
+    Cada feature monitorada (e o score do modelo) tem um histograma de bins fixos
+    nos percentis do treino, vindos do sketch de referência. Por requisição: um
+    bisect em ~100 limites e um incremento por série, no shard da própria thread
+    (sem lock e sem alocar buffers). As contagens ficam em um anel de janelas
+    tumbling de `window_seconds`; a leitura soma as últimas k janelas (janela
+    deslizante) e compara com a referência: PSI nos decis do treino e KS na grade
+    de bins (limite inferior do KS exato: a variação dentro de um bin não é vista).
+    """
+    def __init__(self, sketch, window_seconds=3600, windows=24, bins=DRIFT_BINS, clock=time.time):
+        super().__init__()
+        self.references = {f: sketch["features"][f] for f in FEATURES_TO_MONITOR}
+        if "score" in sketch:
+            self.references["score"] = sketch["score"]
+        self.names = list(self.references)
+        self._edge_arrays = [self.references[name].quantile_edges(bins) for name in self.names]
+        self.edges = [edges.tolist() for edges in self._edge_arrays]  # Listas: bisect sem overhead do NumPy
+        self.has_score = "score" in self.references
+        self.window_seconds = window_seconds
+        self.windows = windows
+        self.reference_created_at = sketch.get("created_at")
+        self._clock = clock
+
+    @staticmethod
+    def columns_for(feature_names):
+        """Índice de cada feature monitorada na linha do modelo (None se o modelo não tiver todas)."""
+        names = list(feature_names)
+        if not all(f in names for f in FEATURES_TO_MONITOR):
+            return None
+        return [names.index(f) for f in FEATURES_TO_MONITOR]
+
+    def _new_shard(self):
+        # Anel de janelas: [id da janela, contagens por série (bins + overflow)]
+        return [[None, [[0] * (len(edges) + 1) for edges in self.edges]] for _ in range(self.windows)]
+
+    def _window_id(self):
+        return int(self._clock() // self.window_seconds)
+
+    def _counts(self):
+        window_id = self._window_id()
+        slot = self._shard()[window_id % self.windows]
+        if slot[0] != window_id:
+            # Janela nova: zera as contagens no lugar (uma vez por janela, por thread)
+            for counts in slot[1]:
+                for i in range(len(counts)):
+                    counts[i] = 0
+            slot[0] = window_id
+        return slot[1]
+
+    def observe(self, row, columns, score):
+        """`row`: linha de features do modelo; `columns`: saída de columns_for; `score`: probabilidade."""
+        counts = self._counts()
+        edges = self.edges
+        for i, col in enumerate(columns):
+            counts[i][bisect_left(edges[i], row[col])] += 1
+        if self.has_score:
+            counts[-1][bisect_left(edges[-1], score)] += 1
+
+    def observe_many(self, rows, columns, scores):
+        """Versão vetorizada de `observe` para lotes (/predict/batch): um searchsorted por série."""
+        counts = self._counts()
+        series = [rows[:, col] for col in columns]
+        if self.has_score:
+            series.append(np.asarray(scores))
+        for i, values in enumerate(series):
+            hist = np.bincount(np.searchsorted(self._edge_arrays[i], values, side='left'),
+                               minlength=len(self.edges[i]) + 1)
+            for b in np.flatnonzero(hist):
+                counts[i][b] += int(hist[b])
+
+    def snapshot(self, last_windows=1):
+        """Contagens somadas das últimas `last_windows` janelas (a atual incluída), por série."""
+        current = self._window_id()
+        wanted = range(current - last_windows + 1, current + 1)
+        totals = [np.zeros(len(edges) + 1, dtype=np.int64) for edges in self.edges]
+        for shard in list(self._shards):
+            for slot in shard:
+                window_id, counts = slot[0], slot[1]
+                if window_id in wanted:
+                    for total, series in zip(totals, counts):
+                        total += series
+        return totals
+
+    def report(self, last_windows=1):
+        """PSI/KS de cada série contra a referência na janela pedida."""
+        last_windows = max(1, min(int(last_windows), self.windows))
+        series = {}
+        for name, edges, counts in zip(self.names, self.edges, self.snapshot(last_windows)):
+            rows = int(counts.sum())
+            entry = {"rows": rows, "psi": None, "ks": None, "p_value": None, "drift": None}
+            if rows >= MIN_WINDOW_ROWS and edges:
+                reference = self.references[name]
+                edges = np.asarray(edges)
+                current_cdf = np.cumsum(counts)[:-1] / rows
+                stat = float(np.max(np.abs(reference.cdf_at(edges) - current_cdf)))
+                p_value = ks_p_value(stat, reference.count, rows)
+
+                # Decis do treino: subconjunto dos percentis usados como bins
+                deciles = reference.quantile_edges(PSI_BINS)
+                at = np.minimum(np.searchsorted(edges, deciles), len(edges) - 1)
+                actual = np.diff(np.r_[0.0, current_cdf[at], 1.0])
+                entry.update({
+                    "psi": round(psi_from_fractions(reference.bin_fractions(deciles), actual), 6),
+                    "ks": round(stat, 6),
+                    "p_value": p_value,
+                    "drift": bool(p_value < DRIFT_P_VALUE),
+                })
+            series[name] = entry
+
+        features = [series[f] for f in FEATURES_TO_MONITOR if series[f]["drift"] is not None]
+        drift_count = sum(entry["drift"] for entry in features)
+        return {
+            "window_seconds": self.window_seconds,
+            "windows": last_windows,
+            "reference_created_at": self.reference_created_at,
+            "features_with_drift": drift_count,
+            "drift_ratio": round(drift_count / len(features), 4) if features else None,
+            "series": series,
+        }
@@ -0,0 +1,298 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# --- Configura Caminhos ---
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+ROOT_PATH = os.path.normpath(os.path.join(BASE_PATH, ".."))
+STATE_FILE = os.path.join(ROOT_PATH, "data/.pipeline_state.json")
+LOGS_PATH = os.path.join(ROOT_PATH, "data/.pipeline_logs/")
+
+# --- DAG da Arquitetura Medalhão ---
+# Caminhos relativos à raiz do repositório. As dependências entre etapas são deduzidas:
+# B depende de A se alguma entrada de B é (ou está dentro de) uma saída de A.
+# `code` lista os módulos locais importados pelo script (além dele mesmo).
+STAGES = [
+    {"name": "ingest_silver", "script": "src/data/ingestion_silver.py", "args": [],
+     "inputs": ["data/raw/creditcard.csv"],
+     "outputs": ["data/silver/fraud_data_silver.parquet"]},
+    {"name": "profile_silver", "script": "src/data/profiling.py", "args": ["--silver", "--force"],
+     "code": ["src/sketches.py"],
+     "inputs": ["data/silver/fraud_data_silver.parquet"],
+     "outputs": ["data/silver/fraud_data_silver_profile.json"]},
+    {"name": "clean", "script": "src/clean_data.py", "args": [],
+     "code": ["src/sketches.py"],
+     "inputs": ["data/silver/fraud_data_silver.parquet"],
+     "outputs": ["data/trusted/train_data.parquet", "data/trusted/test_data.parquet"]},
+    {"name": "eda", "script": "src/eda_analysis.py", "args": [],
+     "code": ["src/feature_engineering.py", "src/gold_dataset.py"],
+     "inputs": ["data/trusted/train_data.parquet"],
+     "outputs": ["reports/figures/1_temporal_distribution.png", "reports/figures/2_amount_distribution.png",
+                 "reports/figures/3_top_features_separation.png"]},
+    {"name": "features", "script": "src/feature_engineering.py", "args": [],
+     "code": ["src/gold_dataset.py"],
+     "inputs": ["data/trusted/train_data.parquet", "data/trusted/test_data.parquet"],
+     "outputs": ["data/gold/train", "data/gold/test"]},
+    {"name": "feature_cache", "script": "src/feature_cache.py", "args": [],
+     "code": ["src/gold_dataset.py"],
+     "inputs": ["data/gold/train", "data/gold/test"],
+     "outputs": ["data/feature_cache/train", "data/feature_cache/test"]},
+    {"name": "train_baseline", "script": "src/train_baseline.py", "args": [],
+     "code": ["src/model_artifact.py", "src/forest_engine.py", "src/gold_dataset.py"],
+     "inputs": ["data/gold/train", "data/gold/test"],
+     "outputs": ["models/baseline_model.pkl", "models/baseline_artifact"]},
+    {"name": "train_challenger", "script": "src/train_challenger.py", "args": [],
+     "code": ["src/model_artifact.py", "src/forest_engine.py", "src/gold_dataset.py", "src/reference_sketch.py",
+              "src/tune_challenger.py", "src/threshold_optimizer.py", "src/feature_cache.py"],
+     "inputs": ["data/gold/train", "data/gold/test", "data/feature_cache/train", "data/feature_cache/test"],
+     "outputs": ["models/challenger_model.pkl", "models/challenger_artifact", "models/reference_sketch.json"]},
+    {"name": "evaluate", "script": "src/evaluate_model.py", "args": [],
+     "code": ["src/model_artifact.py", "src/forest_engine.py", "src/gold_dataset.py", "src/threshold_optimizer.py",
+              "src/feature_cache.py"],
+     "inputs": ["data/gold/test", "data/feature_cache/test", "models/challenger_model.pkl",
+                "models/challenger_artifact"],
+     "outputs": ["reports/figures/8_financial_impact_analysis.png"]},
+    {"name": "compact_forest", "script": "src/compact_forest.py", "args": [],
+     "code": ["src/model_artifact.py", "src/forest_engine.py", "src/gold_dataset.py", "src/feature_cache.py",
+              "src/threshold_optimizer.py", "src/tune_challenger.py"],
+     "inputs": ["data/gold/test", "data/feature_cache/test", "models/challenger_model.pkl"],
+     "outputs": ["models/challenger_compact.pkl", "models/challenger_compact_artifact", "reports/forest_compaction.json"]},
+    {"name": "export_powerbi", "script": "src/export_powerbi.py", "args": [],
+     "code": ["src/feature_engineering.py", "src/model_artifact.py", "src/forest_engine.py", "src/gold_dataset.py",
+              "src/feature_cache.py"],
+     "inputs": ["data/gold/train", "data/gold/test", "data/feature_cache/train", "data/feature_cache/test",
+                "models/challenger_model.pkl", "models/challenger_artifact"],
+     "outputs": ["reports/powerbi_dataset.csv"]},
+    {"name": "monitor_drift", "script": "src/monitor_drift.py", "args": [],
+     "code": ["src/gold_dataset.py", "src/reference_sketch.py"],
+     "inputs": ["data/gold/train", "data/gold/test", "models/reference_sketch.json"],
+     "outputs": []},
+    {"name": "dashboard_drift", "script": "src/dashboard_drift.py", "args": [],
+     "code": ["src/gold_dataset.py"],
+     "inputs": ["data/gold/train", "data/gold/test"],
+     "outputs": ["reports/10_executive_drift_dashboard.html"]},
+]
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+def _abs(path):
+    return os.path.join(ROOT_PATH, path)
+
+def _is_within(path, parent):
+    return path == parent or path.startswith(parent.rstrip("/") + "/")
+
+def stage_dependencies(stages):
+    """Mapa etapa -> etapas das quais ela consome saídas."""
+    deps = {}
+    for stage in stages:
+        deps[stage["name"]] = {
+            other["name"] for other in stages if other is not stage
+            and any(_is_within(i, o) for i in stage["inputs"] for o in other["outputs"])
+        }
+    return deps
+
+class ContentHasher:
+    """
+    Hash de conteúdo (blake2b) de arquivos e diretórios. O hash de cada arquivo fica
+    em cache por (tamanho, mtime_ns): em uma re-execução sem mudanças só há chamadas
+    a os.stat, sem reler os dados.
+    """
+    def __init__(self, cache=None):
+        self.cache = dict(cache or {})
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.cache)
+
+    def file_hash(self, path):
+        stat = os.stat(path)
+        key = os.path.relpath(path, ROOT_PATH)
+        with self._lock:
+            cached = self.cache.get(key)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["hash"]
+
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+        value = digest.hexdigest()
+        with self._lock:
+            self.cache[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": value}
+        return value
+
+    def path_hash(self, path):
+        """Arquivo, diretório (arquivos em ordem) ou None se não existir."""
+        full = _abs(path)
+        if os.path.isfile(full):
+            return self.file_hash(full)
+        if os.path.isdir(full):
+            digest = hashlib.blake2b(digest_size=16)
+            for root, dirs, files in os.walk(full):
+                dirs.sort()
+                for name in sorted(files):
+                    file_path = os.path.join(root, name)
+                    digest.update(os.path.relpath(file_path, full).encode())
+                    digest.update(self.file_hash(file_path).encode())
+            return digest.hexdigest()
+        return None
+
+def stage_fingerprint(stage, hasher):
+    """Hash de entradas (conteúdo), código (script + módulos locais) e parâmetros."""
+    payload = {
+        "inputs": {path: hasher.path_hash(path) for path in stage["inputs"]},
+        "code": {path: hasher.path_hash(path) for path in [stage["script"]] + stage.get("code", [])},
+        "params": {"args": stage["args"], "python": sys.version.split()[0]},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest(), payload
+
+def _latest_mtime(path):
+    full = _abs(path)
+    if os.path.isdir(full):
+        mtimes = [os.path.getmtime(os.path.join(root, name)) for root, _, files in os.walk(full) for name in files]
+        return max(mtimes, default=None)
+    return os.path.getmtime(full) if os.path.exists(full) else None
+
+def load_state():
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    return {"file_hashes": {}, "stages": {}}
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp_file = STATE_FILE + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, STATE_FILE)
+
+def run_stage(stage):
+    """
+    Executa o script em um subprocesso e valida as saídas. Os scripts do projeto
+    capturam as próprias exceções, então uma saída ausente (ou não atualizada)
+    também conta como falha.
+    """
+    os.makedirs(LOGS_PATH, exist_ok=True)
+    log_file = os.path.join(LOGS_PATH, f"{stage['name']}.log")
+    start = time.time()
+    with open(log_file, 'w', encoding='utf-8') as log:
+        result = subprocess.run([sys.executable, _abs(stage["script"])] + stage["args"],
+                                cwd=ROOT_PATH, stdout=log, stderr=subprocess.STDOUT)
+    elapsed = time.time() - start
+
+    if result.returncode != 0:
+        return False, elapsed, f"código de saída {result.returncode} (log: {log_file})"
+    for output in stage["outputs"]:
+        mtime = _latest_mtime(output)
+        if mtime is None:
+            return False, elapsed, f"saída ausente: {output} (log: {log_file})"
+        if mtime < start - 1:
+            return False, elapsed, f"saída não atualizada: {output} (log: {log_file})"
+    return True, elapsed, log_file
+
+def run_pipeline(selected=None, force=False, jobs=4, dry_run=False):
+    """
+    Executa o DAG em paralelo: uma etapa roda assim que suas dependências terminam,
+    e é pulada se o fingerprint (entradas + código + parâmetros) não mudou desde a
+    última execução bem-sucedida e todas as saídas existem.
+    """
+    start = time.perf_counter()
+    stages = [s for s in STAGES if selected is None or s["name"] in selected]
+    names = {s["name"] for s in stages}
+    deps = {name: d & names for name, d in stage_dependencies(stages).items()}
+
+    state = load_state()
+    hasher = ContentHasher(state.get("file_hashes"))
+    state_lock = threading.Lock()
+
+    def persist():
+        # Chamado com state_lock: grava fingerprints + cache de hashes (crash no meio não perde o progresso)
+        state["file_hashes"] = hasher.snapshot()
+        save_state(state)
+    print(f"--- 🔁 PIPELINE INCREMENTAL ({len(stages)} etapas, até {jobs} em paralelo) ---")
+
+    def process(stage):
+        fingerprint, payload = stage_fingerprint(stage, hasher)
+        previous = state["stages"].get(stage["name"], {})
+        missing = [i for i in stage["inputs"] if payload["inputs"][i] is None]
+        outputs_ok = all(os.path.exists(_abs(o)) for o in stage["outputs"])
+
+        if missing:
+            return "failed", f"entradas ausentes: {missing}"
+        if not force and previous.get("fingerprint") == fingerprint and outputs_ok:
+            return "skipped", "sem mudanças"
+        if dry_run:
+            return "would_run", "entradas, código ou parâmetros mudaram"
+
+        ok, elapsed, detail = run_stage(stage)
+        if not ok:
+            return "failed", detail
+        with state_lock:
+            state["stages"][stage["name"]] = {
+                "fingerprint": fingerprint,
+                "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "duration_seconds": round(elapsed, 2),
+            }
+            persist()
+        return "ran", f"{elapsed:.1f}s"
+
+    status = {}
+    pending = {s["name"]: s for s in stages}
+    running = {}
+    icons = {"ran": "✅", "skipped": "⏭️", "would_run": "📝", "failed": "❌", "blocked": "⛔"}
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            # Dispara as etapas prontas; bloqueia as que dependem de uma falha
+            for name in list(pending):
+                if any(status.get(d) in ("failed", "blocked") for d in deps[name]):
+                    status[name] = "blocked"
+                    print(f"{icons['blocked']} {name:<18} | dependência falhou")
+                    del pending[name]
+                elif dry_run and any(status.get(d) == "would_run" for d in deps[name]):
+                    status[name] = "would_run"
+                    print(f"{icons['would_run']} {name:<18} | dependência será executada")
+                    del pending[name]
+                elif all(status.get(d) in ("ran", "skipped", "would_run") for d in deps[name]):
+                    running[pool.submit(process, pending.pop(name))] = name
+
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    status[name], detail = future.result()
+                except Exception as e:
+                    status[name], detail = "failed", str(e)
+                print(f"{icons[status[name]]} {name:<18} | {detail}")
+
+    if not dry_run:
+        with state_lock:
+            persist()
+
+    failed = [name for name, s in status.items() if s in ("failed", "blocked")]
+    print(f"\n⏱️ Pipeline finalizado em {time.perf_counter() - start:.2f}s"
+          f" | executadas: {sum(s == 'ran' for s in status.values())}"
+          f" | puladas: {sum(s == 'skipped' for s in status.values())}"
+          f" | falhas: {len(failed)}")
+    return not failed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Executa o pipeline medalhão de forma incremental")
+    parser.add_argument("--stages", nargs="+", choices=[s["name"] for s in STAGES],
+                        help="Executa apenas estas etapas (as demais são consideradas em dia)")
+    parser.add_argument("--force", action="store_true", help="Ignora os fingerprints e executa tudo")
+    parser.add_argument("--jobs", type=int, default=4, help="Etapas independentes em paralelo")
+    parser.add_argument("--dry-run", action="store_true", help="Só mostra o que seria executado")
+    args = parser.parse_args()
+
+    ok = run_pipeline(args.stages, force=args.force, jobs=args.jobs, dry_run=args.dry_run)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,139 @@
+import numpy as np
+import json
+import os
+from datetime import datetime, timezone
+from scipy.stats import kstwo
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+REFERENCE_SKETCH_FILE = os.path.normpath(os.path.join(base_path, "../models/reference_sketch.json"))
+
+# Features Críticas para Monitorar (monitor_drift.py e monitor online da API)
+FEATURES_TO_MONITOR = ['amount_log', 'is_night', 'v14', 'v17', 'v12', 'v4', 'v11']
+REFERENCE_POINTS = 1000  # m: erro máximo da estatística KS = 1/m
+PSI_BINS = 10            # PSI em decis da referência
+PSI_EPSILON = 1e-4       # Evita log(0) em faixas vazias
+
+class ReferenceDistribution:
+    """
+    Resumo da distribuição de referência (treino) com m+1 pontos de quantil.
+
+    Os pontos são itens da amostra ordenada com no máximo n/m itens entre dois
+    pontos consecutivos, e a CDF empírica é guardada EXATA em cada ponto. Para
+    qualquer x, F_ref(x) fica em [L(x), L(x) + 1/m), onde L é a CDF no último
+    ponto <= x. Logo o KS calculado com L difere do KS exato em menos de 1/m,
+    com custo O((m + w) log(m + w)) para uma janela de w linhas, sem depender
+    do tamanho do treino.
+    """
+    def __init__(self, values, cdf, count, error_bound):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.cdf = np.asarray(cdf, dtype=np.float64)
+        self.count = int(count)
+        self.error_bound = float(error_bound)  # Máximo |KS_sketch - KS_exato|
+
+    @classmethod
+    def from_values(cls, data, m=REFERENCE_POINTS):
+        data = np.asarray(data, dtype=np.float64).ravel()
+        data = np.sort(data[~np.isnan(data)])
+        n = len(data)
+        if n == 0:
+            return cls([], [], 0, 0.0)
+        picks = np.floor(np.linspace(0, n - 1, m + 1)).astype(np.int64)
+        values = np.unique(data[picks])
+        cdf = np.searchsorted(data, values, side='right') / n
+        # Features discretas (ex.: is_night) cabem inteiras no sketch: KS exato
+        exact = len(values) == np.count_nonzero(np.diff(data)) + 1
+        return cls(values, cdf, n, 0.0 if exact else 1.0 / m)
+
+    def cdf_at(self, x):
+        """Limite inferior L(x) da CDF de referência (erro < 1/m)."""
+        j = np.searchsorted(self.values, np.asarray(x, dtype=np.float64), side='right')
+        return np.where(j == 0, 0.0, self.cdf[np.maximum(j - 1, 0)])
+
+    def ks(self, sample):
+        """(estatística, p-value) do KS de duas amostras contra a referência (p-value assintótico, como o ks_2samp)."""
+        sample = np.asarray(sample, dtype=np.float64).ravel()
+        sample = np.sort(sample[~np.isnan(sample)])
+        w = len(sample)
+        if w == 0 or self.count == 0:
+            return float('nan'), float('nan')
+
+        # |L - F_cur| é constante entre pontos de quebra: basta avaliar a união dos pontos
+        points = np.concatenate([self.values, sample])
+        f_cur = np.searchsorted(sample, points, side='right') / w
+        stat = float(np.max(np.abs(self.cdf_at(points) - f_cur)))
+
+        return stat, ks_p_value(stat, self.count, w)
+
+    def quantile_edges(self, bins=PSI_BINS):
+        """Cortes de `bins` quantis da referência (decis por padrão; pontos do sketch: CDF exata em cada corte)."""
+        idx = np.searchsorted(self.cdf, np.arange(1, bins) / bins, side='left')
+        return np.unique(self.values[np.minimum(idx, len(self.values) - 1)])
+
+    def bin_fractions(self, edges):
+        """Proporção da referência em (-inf, e1], (e1, e2], ..., (ek, inf)."""
+        return np.diff(np.r_[0.0, self.cdf_at(edges), 1.0])
+
+    def psi(self, sample, bins=PSI_BINS):
+        """Population Stability Index nos decis da referência."""
+        sample = np.asarray(sample, dtype=np.float64).ravel()
+        sample = np.sort(sample[~np.isnan(sample)])
+        if len(sample) == 0 or self.count == 0:
+            return float('nan')
+        edges = self.quantile_edges(bins)
+        actual = np.diff(np.r_[0, np.searchsorted(sample, edges, side='right'), len(sample)]) / len(sample)
+        return psi_from_fractions(self.bin_fractions(edges), actual)
+
+    def to_dict(self):
+        return {"count": self.count, "error_bound": self.error_bound,
+                "values": self.values.tolist(), "cdf": self.cdf.tolist()}
+
+    @classmethod
+    def from_dict(cls, payload):
+        return cls(payload["values"], payload["cdf"], payload["count"], payload["error_bound"])
+
+def psi_from_fractions(expected, actual):
+    """PSI entre as proporções por faixa da referência (expected) e da janela atual (actual)."""
+    expected = np.clip(np.asarray(expected, dtype=np.float64), PSI_EPSILON, None)
+    actual = np.clip(np.asarray(actual, dtype=np.float64), PSI_EPSILON, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+def ks_p_value(stat, reference_rows, window_rows):
+    """P-value assintótico do KS de duas amostras (mesma fórmula do ks_2samp para amostras grandes)."""
+    effective_n = np.round(reference_rows * window_rows / (reference_rows + window_rows))
+    return float(kstwo.sf(stat, effective_n))
+
+def build_reference_sketch(train_df, scores=None, features=FEATURES_TO_MONITOR, m=REFERENCE_POINTS):
+    """
+    Sketch de referência de cada feature monitorada (e, opcionalmente, da distribuição
+    de scores do modelo). Gerado uma vez por treino e salvo ao lado do modelo.
+    """
+    sketch = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "points": m,
+        "features": {f: ReferenceDistribution.from_values(train_df[f].to_numpy(), m) for f in features},
+    }
+    if scores is not None:
+        sketch["score"] = ReferenceDistribution.from_values(scores, m)
+    return sketch
+
+def save_reference_sketch(sketch, path=REFERENCE_SKETCH_FILE):
+    payload = dict(sketch)
+    payload["features"] = {f: dist.to_dict() for f, dist in sketch["features"].items()}
+    if "score" in sketch:
+        payload["score"] = sketch["score"].to_dict()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+    return path
+
+def load_reference_sketch(path=REFERENCE_SKETCH_FILE):
+    """Sketch salvo (None se ainda não foi gerado)."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        payload = json.load(f)
+    payload["features"] = {f: ReferenceDistribution.from_dict(d) for f, d in payload["features"].items()}
+    if "score" in payload:
+        payload["score"] = ReferenceDistribution.from_dict(payload["score"])
+    return payload
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+
+EVICTION_POLICIES = ("lru", "fifo")
+
+class ScoreCache:
+    """
+    Cache limitado de decisões para transações repetidas (retentativas do sistema).
+
+    A chave são os bytes exatos do vetor de features (o dict do Python faz o hash
+    e a comparação completa, então não há falso acerto por colisão). Cada entrada
+    expira após `ttl_seconds`; ao atingir `max_entries`, remove a menos usada
+    ("lru") ou a mais antiga ("fifo").
+
+    O cache pertence a uma geração (ex.: versão do modelo + threshold): se a
+    geração mudar, todas as entradas são descartadas na próxima consulta.
+    """
+    def __init__(self, max_entries=10_000, ttl_seconds=300.0, policy="lru"):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Política de eviction desconhecida: {policy} (use {EVICTION_POLICIES})")
+        if max_entries < 1:
+            raise ValueError("max_entries deve ser >= 1")
+        self.max_entries = int(max_entries)
+        self.ttl_seconds = float(ttl_seconds)
+        self.policy = policy
+
+        self._entries = OrderedDict()  # chave -> (expira_em, valor)
+        self._generation = None
+        self._lock = threading.Lock()
+
+        # Contadores (lidos por /cache/stats e /metrics)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(row):
+        """Chave do vetor de features (array NumPy contíguo)."""
+        return row.tobytes()
+
+    def _check_generation(self, generation):
+        # Chamado com o lock adquirido
+        if generation != self._generation:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._generation = generation
+
+    def get(self, key, generation):
+        """Retorna o valor em cache ou None."""
+        now = time.monotonic()
+        with self._lock:
+            self._check_generation(generation)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if now >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            if self.policy == "lru":
+                self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, generation):
+        now = time.monotonic()
+        with self._lock:
+            self._check_generation(generation)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = (now + self.ttl_seconds, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "policy": self.policy,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,50 @@
+import argparse
+import os
+import joblib
+import uvicorn
+from model_artifact import export_artifact, MANIFEST_FILE
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_PATH, "../models/challenger_model.pkl")
+ARTIFACT_PATH = os.path.join(BASE_PATH, "../models/challenger_artifact/")
+
+def export_model_artifact(model_path=MODEL_PATH, artifact_path=ARTIFACT_PATH):
+    """
+    Garante o artefato compacto (model_artifact.py) do modelo servido.
+    Reaproveita o artefato existente (ex.: gravado pelo train_challenger.py) se ele
+    for mais novo que o pickle.
+    """
+    manifest = os.path.join(artifact_path, MANIFEST_FILE)
+    if os.path.exists(manifest) and os.path.getmtime(manifest) >= os.path.getmtime(model_path):
+        print(f"♻️ Artefato já exportado em: {artifact_path}")
+        return artifact_path
+
+    print(f"🌲 Exportando artefato de {model_path}...")
+    export_artifact(joblib.load(model_path), artifact_path)
+    print(f"✅ Artefato salvo em: {artifact_path}")
+    return artifact_path
+
+def serve(workers=4, host="0.0.0.0", port=8000, shared_model=True):
+    """
+    Sobe a API com um pool de `workers` processos do uvicorn.
+    Com shared_model=True todos os workers abrem as mesmas árvores via mmap,
+    então o modelo ocupa uma única cópia física no page cache.
+    """
+    if shared_model:
+        # Os workers herdam o ambiente do processo mestre
+        os.environ["FRAUD_MODEL_ARRAYS"] = export_model_artifact()
+    else:
+        os.environ.pop("FRAUD_MODEL_ARRAYS", None)
+
+    print(f"🚀 Iniciando {workers} worker(s) em {host}:{port} | Modelo compartilhado (mmap): {shared_model}")
+    uvicorn.run("app:app", host=host, port=port, workers=workers, app_dir=BASE_PATH)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fraud Detection API (multi-worker)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("FRAUD_WORKERS", "4")))
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--no-shared-model", action="store_true",
+                        help="Cada worker carrega sua própria cópia do pickle")
+    args = parser.parse_args()
+    serve(args.workers, args.host, args.port, shared_model=not args.no_shared_model)
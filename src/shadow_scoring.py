@@ -0,0 +1,80 @@
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+class ShadowScorer:
+    """
+    Pontua as mesmas transações com um segundo modelo (ex.: o Baseline) fora do
+    caminho da resposta. O trabalho vai para uma thread dedicada; se a fila passar
+    de `max_pending` lotes, o lote é descartado (e contado) em vez de atrasar a API.
+    """
+    def __init__(self, score_fn, primary_threshold, shadow_threshold, source, max_pending=1000):
+        self.score_fn = score_fn  # Recebe a lista de transações e devolve as probabilidades
+        self.primary_threshold = primary_threshold
+        self.shadow_threshold = shadow_threshold
+        self.source = source
+        self.max_pending = max_pending
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        # Estatísticas de concordância
+        self.scored = 0
+        self.agreements = 0
+        self.primary_only_blocks = 0  # Primário bloqueou, sombra aprovou
+        self.shadow_only_blocks = 0   # Sombra bloqueou, primário aprovou
+        self.abs_diff_sum = 0.0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+    def submit(self, transactions, primary_probas):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += len(transactions)
+                return
+            self._pending += 1
+        self._executor.submit(self._run, transactions, np.asarray(primary_probas, dtype=np.float64))
+
+    def _run(self, transactions, primary_probas):
+        start = time.perf_counter()
+        try:
+            shadow_probas = np.asarray(self.score_fn(transactions), dtype=np.float64)
+            primary_block = primary_probas >= self.primary_threshold
+            shadow_block = shadow_probas >= self.shadow_threshold
+            with self._lock:
+                self.scored += len(transactions)
+                self.agreements += int((primary_block == shadow_block).sum())
+                self.primary_only_blocks += int((primary_block & ~shadow_block).sum())
+                self.shadow_only_blocks += int((shadow_block & ~primary_block).sum())
+                self.abs_diff_sum += float(np.abs(primary_probas - shadow_probas).sum())
+        except Exception:
+            with self._lock:
+                self.errors += len(transactions)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.busy_seconds += time.perf_counter() - start
+
+    def stats(self):
+        with self._lock:
+            scored = self.scored
+            return {
+                "source": self.source,
+                "primary_threshold": self.primary_threshold,
+                "shadow_threshold": self.shadow_threshold,
+                "scored": scored,
+                "agreement_rate": round(self.agreements / scored, 6) if scored else None,
+                "primary_only_blocks": self.primary_only_blocks,
+                "shadow_only_blocks": self.shadow_only_blocks,
+                "mean_abs_probability_diff": round(self.abs_diff_sum / scored, 6) if scored else None,
+                "pending_batches": self._pending,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "mean_shadow_ms_per_transaction": round(self.busy_seconds / max(scored, 1) * 1e3, 4),
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,108 @@
+import numpy as np
+
+class MomentsAccumulator:
+    """
+    Contagem, mínimo, máximo, média e variância em uma passada (Welford/Chan).
+    Acumuladores de partes diferentes do dado podem ser combinados com `merge`.
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Soma dos quadrados dos desvios
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        batch = MomentsAccumulator()
+        batch.count = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self):
+        """Desvio padrão amostral (ddof=1, igual ao pandas)."""
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else 0.0
+
+    def to_dict(self):
+        if self.count == 0:
+            return {"count": 0, "min": None, "max": None, "mean": None, "std": None}
+        return {"count": self.count, "min": self.min, "max": self.max, "mean": self.mean, "std": self.std}
+
+class QuantileSketch:
+    """
+    Sketch de quantis mesclável no estilo KLL: buffers por nível, cada um com até
+    2k itens; ao encher, o buffer é ordenado e metade dos itens (posições pares ou
+    ímpares, ao acaso) sobe para o próximo nível com o dobro do peso.
+    Memória O(k log(n/k)); erro de rank tipicamente ~1/k.
+    """
+    def __init__(self, k=200, seed=0):
+        self.k = int(k)
+        self.count = 0
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) >= 2 * self.k:
+                items = np.sort(items)
+                # Número ímpar: o último item fica no nível atual
+                keep = items[len(items) - 1:] if len(items) % 2 else items[:0]
+                paired = items[:len(items) - len(keep)]
+                promoted = paired[self._rng.integers(2)::2]
+                self.levels[h] = keep
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def _weighted_items(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** h, dtype=np.float64)
+                                  for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        """Quantis aproximados (None se o sketch estiver vazio)."""
+        if self.count == 0:
+            return [None for _ in qs]
+        values, cumulative = self._weighted_items()
+        idx = np.searchsorted(cumulative, np.asarray(qs, dtype=np.float64) * cumulative[-1], side='left')
+        return values[np.minimum(idx, len(values) - 1)].tolist()
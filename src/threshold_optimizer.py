@@ -0,0 +1,71 @@
+import numpy as np
+
+class ThresholdOptimizer:
+    """
+    Custo de negócio para TODOS os thresholds distintos em O(n log n).
+
+    Regra de decisão: bloquear se probabilidade >= threshold. As probabilidades são
+    ordenadas uma única vez (decrescente); bloquear com threshold t equivale a
+    bloquear os k primeiros itens, então TP/FP e o custo saem de somas acumuladas.
+
+    Os custos (cost_fn, cost_fp, cost_tp, cost_tn) podem ser escalares ou arrays por
+    transação (ex.: cost_fn = amount para chargeback ponderado pelo valor).
+    """
+    def __init__(self, y_true, y_proba, cost_fn=100.0, cost_fp=2.0, cost_tp=0.0, cost_tn=0.0):
+        y = np.asarray(y_true).astype(bool).ravel()
+        p = np.asarray(y_proba, dtype=np.float64).ravel()
+        if y.shape != p.shape:
+            raise ValueError(f"y_true e y_proba com tamanhos diferentes: {y.shape} vs {p.shape}")
+
+        def per_item(cost):
+            return np.broadcast_to(np.asarray(cost, dtype=np.float64), p.shape)
+
+        cost_fn, cost_fp, cost_tp, cost_tn = (per_item(c) for c in (cost_fn, cost_fp, cost_tp, cost_tn))
+
+        order = np.argsort(-p, kind='stable')
+        self._neg_sorted = -p[order]  # Crescente: permite searchsorted
+        y_sorted = y[order]
+
+        # Custo sem bloquear nada + variação ao bloquear cada item (na ordem de bloqueio)
+        self.base_cost = float(np.where(y, cost_fn, cost_tn).sum())
+        delta = np.where(y_sorted, cost_tp[order] - cost_fn[order], cost_fp[order] - cost_tn[order])
+        self._cum_cost = np.concatenate([[0.0], np.cumsum(delta)])
+        self._cum_pos = np.concatenate([[0], np.cumsum(y_sorted)])
+
+        self.n = len(p)
+        self.n_pos = int(y.sum())
+
+        # Thresholds distintos: cada probabilidade única (+inf = não bloquear nada)
+        p_sorted = -self._neg_sorted
+        group_end = np.flatnonzero(np.r_[p_sorted[1:] != p_sorted[:-1], True]) + 1 if self.n else np.empty(0, int)
+        self._blocked = np.r_[0, group_end].astype(np.int64)
+        self.thresholds = np.r_[np.inf, p_sorted[group_end - 1]]
+
+    def _summary(self, blocked, thresholds):
+        tp = self._cum_pos[blocked]
+        fp = blocked - tp
+        return {
+            "threshold": thresholds,
+            "cost": self.base_cost + self._cum_cost[blocked],
+            "tp": tp,
+            "fp": fp,
+            "fn": self.n_pos - tp,
+            "tn": self.n - self.n_pos - fp,
+        }
+
+    def curve(self):
+        """Custo e matriz de confusão em cada threshold distinto (ordem decrescente)."""
+        return self._summary(self._blocked, self.thresholds)
+
+    def evaluate(self, thresholds):
+        """Custo e matriz de confusão em thresholds arbitrários (ex.: grade 0.01..0.99)."""
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        blocked = np.searchsorted(self._neg_sorted, -thresholds, side='right')  # Nº de itens com p >= t
+        return self._summary(blocked, thresholds)
+
+    def best(self):
+        """Threshold exato de custo mínimo (empate: o maior threshold, que bloqueia menos)."""
+        curve = self.curve()
+        i = int(np.argmin(curve["cost"]))
+        return {key: (float(values[i]) if key in ("threshold", "cost") else int(values[i]))
+                for key, values in curve.items()}
@@ -5,12 +5,14 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, average_precision_score
 import joblib
 import os
+from datetime import datetime, timezone
+from model_artifact import export_artifact
+from gold_dataset import read_gold
 import matplotlib.pyplot as plt
 import seaborn as sns
 
 def train_baseline():
     base_path = os.path.dirname(os.path.abspath(__file__))
-    gold_path = os.path.join(base_path, "../data/gold/")
     models_path = os.path.join(base_path, "../models/")
     
     if not os.path.exists(models_path):
@@ -18,10 +20,11 @@ def train_baseline():
         
     print("--- INICIANDO TREINAMENTO BASELINE ---")
     
-    # 1. Carregar Dados Gold
+    # 1. Carregar Dados Gold (Parquet em float64, não o cache float32: a Regressão Logística
+    # padroniza amount/amount_log e deve treinar na mesma precisão que a API pontua)
     try:
-        train_df = pd.read_parquet(os.path.join(gold_path, "train_data.parquet"))
-        test_df = pd.read_parquet(os.path.join(gold_path, "test_data.parquet"))
+        train_df = read_gold("train")
+        test_df = read_gold("test")
     except Exception as e:
         print(f"Erro ao carregar dados: {e}")
         return
@@ -75,6 +78,18 @@ def train_baseline():
     model_file = os.path.join(models_path, "baseline_model.pkl")
     joblib.dump(pipeline, model_file)
     print(f"\nModelo salvo em: {model_file}")
+    
+    # Artefato compacto (scaler + coeficientes em .npy + manifest JSON)
+    artifact_dir = os.path.join(models_path, "baseline_artifact")
+    export_artifact(pipeline, artifact_dir, threshold=0.5, metadata={
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "train_rows": len(X_train),
+        "test_rows": len(X_test),
+        "train_frauds": int(y_train.sum()),
+        "params": pipeline.named_steps['model'].get_params(),
+        "metrics": {"roc_auc": roc_auc, "auprc": auprc, "tp": tp, "fp": fp, "fn": fn},
+    })
+    print(f"Artefato compacto salvo em: {artifact_dir}")
 
 if __name__ == "__main__":
     train_baseline()
\ No newline at end of file
@@ -1,49 +1,68 @@
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
+import numpy as np
 from sklearn.pipeline import Pipeline
+from sklearn.model_selection import KFold, cross_val_predict
 from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, average_precision_score
 import joblib
 import os
+import argparse
+from datetime import datetime, timezone
+from model_artifact import export_artifact
+from feature_cache import load_features
+from reference_sketch import build_reference_sketch, save_reference_sketch
+from tune_challenger import build_model, run_search, load_best_params
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-def train_challenger():
+DECISION_THRESHOLD = 0.20  # Threshold otimizado financeiramente (evaluate_model.py)
+OOF_FOLDS = 3  # --oof-reference: folds contíguos (em ordem de tempo) para os scores out-of-fold do treino
+
+# Hiperparâmetros padrão (substituídos pelo melhor candidato da busca com --search / --from-search)
+DEFAULT_PARAMS = {
+    "n_estimators": 100,
+    "max_depth": 10,  # Limita profundidade para evitar overfitting
+}
+
+def train_challenger(params=None, oof_reference=False):
+    params = params or DEFAULT_PARAMS
     base_path = os.path.dirname(os.path.abspath(__file__))
-    gold_path = os.path.join(base_path, "../data/gold/")
     models_path = os.path.join(base_path, "../models/")
     
     print("--- INICIANDO TREINAMENTO CHALLENGER (RANDOM FOREST) ---")
     
     # 1. Carregar Dados Gold
     try:
-        train_df = pd.read_parquet(os.path.join(gold_path, "train_data.parquet"))
-        test_df = pd.read_parquet(os.path.join(gold_path, "test_data.parquet"))
+        train = load_features("train")
+        test = load_features("test")
     except Exception as e:
         print(f"Erro ao carregar dados: {e}")
         return
 
     # 2. Separar Features e Target
-    target = 'class'
-    drop_cols = [target, 'time'] 
-    
-    X_train = train_df.drop(columns=drop_cols)
-    y_train = train_df[target]
-    X_test = test_df.drop(columns=drop_cols)
-    y_test = test_df[target]
+    X_train = train.frame()
+    y_train = train.y
+    X_test = test.frame()
+    y_test = test.y
     
     # 3. Pipeline Challenger
     # n_jobs=-1 usa todos os núcleos do processador
     # class_weight='balanced' continua sendo vital
-    model = RandomForestClassifier(
-        n_estimators=100,
-        class_weight='balanced',
-        random_state=42,
-        n_jobs=-1,
-        max_depth=10 # Limita profundidade para evitar overfitting
-    )
-    
-    print("Treinando Random Forest (pode levar alguns segundos)...")
+    # oob_score=True: mesmas árvores, mais os scores out-of-bag do treino (referência do drift)
+    model = build_model(params, n_jobs=-1)
+    use_oob = not oof_reference and model.get_params().get("bootstrap", False)
+    if use_oob:
+        model.set_params(oob_score=True)
+
+    print(f"Treinando Random Forest (pode levar alguns segundos)... {params}")
     model.fit(X_train, y_train)
+    oob_scores = None
+    if use_oob:
+        # Linhas sorteadas por todas as árvores não têm score OOB (NaN)
+        oob_scores = model.oob_decision_function_[:, 1]
+        oob_scores = oob_scores[~np.isnan(oob_scores)]
+        # Fora do pickle/artefato: o modelo salvo fica igual ao de antes
+        del model.oob_decision_function_, model.oob_score_
+        model.set_params(oob_score=False)
     
     # 4. Avaliação
     y_pred = model.predict(X_test)
@@ -76,6 +95,51 @@ def train_challenger():
     model_file = os.path.join(models_path, "challenger_model.pkl")
     joblib.dump(model, model_file)
     print(f"Modelo salvo em: {model_file}")
+    
+    # Artefato compacto (árvores em .npy + manifest JSON) para carga rápida na API
+    artifact_dir = os.path.join(models_path, "challenger_artifact")
+    export_artifact(model, artifact_dir, threshold=DECISION_THRESHOLD, metadata={
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "train_rows": len(X_train),
+        "test_rows": len(X_test),
+        "train_frauds": int(y_train.sum()),
+        "params": model.get_params(),
+        "metrics": {"roc_auc": roc_auc, "auprc": auprc, "tp": tp, "fp": fp, "fn": fn},
+    })
+    print(f"Artefato compacto salvo em: {artifact_dir}")
+    
+    # Sketch de referência para o monitoramento de drift: features e scores do TREINO.
+    # O teste é o período "produção" monitorado, então os scores de referência vêm de
+    # linhas do treino pontuadas por árvores que não as viram: out-of-bag (padrão, sem
+    # treinos extras) ou out-of-fold com --oof-reference (+OOF_FOLDS treinos).
+    if oof_reference:
+        print(f"Calculando scores out-of-fold do treino ({OOF_FOLDS} folds) para a referência de drift...")
+        ref_scores = cross_val_predict(build_model(params, n_jobs=-1), X_train, y_train,
+                                       cv=KFold(n_splits=OOF_FOLDS), method='predict_proba')[:, 1]
+    elif use_oob:
+        ref_scores = oob_scores
+    else:
+        print("⚠️ bootstrap=False: sem scores out-of-bag; o sketch fica sem referência de score (use --oof-reference).")
+        ref_scores = None
+    sketch_file = save_reference_sketch(build_reference_sketch(X_train, scores=ref_scores))
+    print(f"Sketch de referência (drift) salvo em: {sketch_file}")
 
 if __name__ == "__main__":
-    train_challenger()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Treino do Challenger (Random Forest)")
+    parser.add_argument("--search", action="store_true",
+                        help="Roda a busca de hiperparâmetros (tune_challenger.py) antes e treina com o melhor candidato")
+    parser.add_argument("--from-search", action="store_true",
+                        help="Treina com o melhor candidato da última busca (reports/challenger_search.json)")
+    parser.add_argument("--oof-reference", action="store_true",
+                        help=f"Scores de referência do drift out-of-fold ({OOF_FOLDS} treinos extras) em vez de out-of-bag")
+    args = parser.parse_args()
+    
+    params = None
+    if args.search:
+        best = run_search()
+        params = best["params"] if best else None
+    elif args.from_search:
+        params = load_best_params()
+        if params is None:
+            print("⚠️ Nenhuma busca encontrada: usando os hiperparâmetros padrão.")
+    train_challenger(params, oof_reference=args.oof_reference)
\ No newline at end of file
@@ -0,0 +1,223 @@
+import numpy as np
+import os
+import json
+import time
+import argparse
+import itertools
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import average_precision_score
+from forest_engine import FlatForest
+from threshold_optimizer import ThresholdOptimizer
+from feature_cache import load_features
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+SEARCH_REPORT_PATH = os.path.join(base_path, "../reports/challenger_search.json")
+
+# Espaço de busca (o Challenger atual é n_estimators=100, max_depth=10, min_samples_leaf=1, max_features='sqrt')
+PARAM_GRID = {
+    "n_estimators": [50, 100, 200, 400],
+    "max_depth": [6, 10, 14, None],
+    "min_samples_leaf": [1, 5, 20],
+    "max_features": ["sqrt", 0.3, 0.5],
+}
+
+N_FOLDS = 4           # Folds temporais (janela de treino crescente, validação logo depois)
+ETA = 3               # Successive halving: 1/ETA dos candidatos sobe a cada rodada
+N_CANDIDATES = 27     # Candidatos sorteados da grade na primeira rodada
+SLA_MS = 100.0        # SLA da API por transação
+LATENCY_ROWS = 200    # Transações pontuadas uma a uma para medir a latência
+
+# Mesmo custo financeiro do evaluate_model.py
+COST_FN = 100  # Perda média por fraude não pega (Chargeback)
+COST_FP = 2    # Custo de fricção (SMS, Call Center, Risco de Churn)
+
+# Dados do treino nos processos do pool: cada um abre o cache de features com mmap (páginas compartilhadas)
+_X = None
+_y = None
+
+def _init_worker(split):
+    global _X, _y
+    features = load_features(split)
+    _X, _y = features.X, features.y
+
+def expanding_folds(n_rows, n_folds=N_FOLDS):
+    """
+    Divide as linhas (já em ordem de tempo) em n_folds + 1 blocos contíguos.
+    Fold k treina nos blocos 0..k e valida no bloco k+1: o passado nunca vê o futuro.
+    """
+    bounds = np.linspace(0, n_rows, n_folds + 2).astype(int).tolist()
+    return [(bounds[k + 1], bounds[k + 2]) for k in range(n_folds)]  # (fim do treino, fim da validação)
+
+def sample_candidates(n_candidates=N_CANDIDATES, seed=42, grid=PARAM_GRID):
+    """Sorteia combinações distintas da grade (a grade inteira se ela for menor)."""
+    combos = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    if len(combos) <= n_candidates:
+        return combos
+    rng = np.random.default_rng(seed)
+    return [combos[i] for i in sorted(rng.choice(len(combos), size=n_candidates, replace=False))]
+
+def build_model(params, n_jobs=1, random_state=42):
+    """RandomForest do Challenger com os hiperparâmetros do candidato (class_weight='balanced' continua vital)."""
+    return RandomForestClassifier(class_weight='balanced', random_state=random_state, n_jobs=n_jobs, **params)
+
+def measure_latency(model, X, rows=LATENCY_ROWS):
+    """
+    Latência por transação (ms) do motor da API (FlatForest), pontuando uma linha por vez.
+    Medida dentro do worker, com os outros jobs rodando: é um limite conservador.
+    """
+    engine = FlatForest.from_model(model)
+    sample = X[:rows]
+    engine.predict_proba(sample[:1])  # Aquecimento
+    timings = []
+    for i in range(len(sample)):
+        start = time.perf_counter()
+        engine.predict_proba(sample[i:i + 1])
+        timings.append((time.perf_counter() - start) * 1e3)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+def evaluate_fold(params, fold):
+    """Treina o candidato no fold e retorna AUPRC, custo financeiro e latência na validação."""
+    train_end, valid_end = fold
+    X_train, y_train = _X[:train_end], _y[:train_end]
+    X_valid, y_valid = _X[train_end:valid_end], _y[train_end:valid_end]
+
+    start = time.perf_counter()
+    model = build_model(params).fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    proba = model.predict_proba(X_valid)[:, 1]
+    best = ThresholdOptimizer(y_valid, proba, cost_fn=COST_FN, cost_fp=COST_FP).best()
+    no_model_cost = float(y_valid.sum() * COST_FN)  # Sem modelo: todas as fraudes viram prejuízo
+    latency_p50, latency_p99 = measure_latency(model, X_valid)
+    return {
+        "auprc": float(average_precision_score(y_valid, proba)),
+        "cost": best["cost"],
+        "cost_ratio": best["cost"] / no_model_cost if no_model_cost else 0.0,
+        "threshold": best["threshold"],
+        "fit_seconds": fit_seconds,
+        "latency_p50_ms": latency_p50,
+        "latency_p99_ms": latency_p99,
+    }
+
+def summarize(params, fold_results):
+    """Médias entre folds. Score = AUPRC - custo relativo (custo / custo sem modelo): maior é melhor."""
+    mean = {key: float(np.mean([r[key] for r in fold_results]))
+            for key in ("auprc", "cost", "cost_ratio", "fit_seconds", "latency_p50_ms")}
+    return {
+        "params": params,
+        "folds": len(fold_results),
+        **mean,
+        "latency_p99_ms": float(max(r["latency_p99_ms"] for r in fold_results)),
+        "score": mean["auprc"] - mean["cost_ratio"],
+    }
+
+def successive_halving(split="train", n_candidates=N_CANDIDATES, n_folds=N_FOLDS, eta=ETA, workers=None, seed=42,
+                       sla_ms=SLA_MS):
+    """
+    Successive halving com folds temporais como recurso: todos os candidatos rodam
+    no primeiro fold (janela de treino menor e mais barata); a cada rodada o melhor
+    1/eta sobe e ganha mais um fold. Resultados por (candidato, fold) são reaproveitados.
+    Cada (candidato, fold) é um job no pool de processos (RandomForest com n_jobs=1).
+    Candidatos fora do SLA de latência ficam atrás de todos os que cabem nele na promoção.
+    """
+    y = load_features(split).y
+    folds = expanding_folds(len(y), n_folds)
+    for k, (train_end, valid_end) in enumerate(folds):
+        if y[train_end:valid_end].sum() == 0:
+            raise ValueError(f"Fold {k + 1} sem fraudes na validação: reduza o número de folds")
+
+    candidates = sample_candidates(n_candidates, seed)
+    results = {i: [] for i in range(len(candidates))}
+    alive = list(range(len(candidates)))
+    rungs = []
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(split,)) as pool:
+        for rung in range(n_folds):
+            n_used = rung + 1
+            jobs = {(i, k): pool.submit(evaluate_fold, candidates[i], folds[k])
+                    for i in alive for k in range(len(results[i]), n_used)}
+            for (i, k), future in sorted(jobs.items()):
+                results[i].append(future.result())
+
+            summaries = {i: summarize(candidates[i], results[i]) for i in alive}
+            ranked = sorted(alive, key=lambda i: (summaries[i]["latency_p99_ms"] <= sla_ms, summaries[i]["score"]),
+                            reverse=True)
+            rungs.append({"folds": n_used, "candidates": len(alive)})
+            print(f"   Rodada {rung + 1}: {len(alive)} candidatos em {n_used} fold(s) | "
+                  f"melhor score {summaries[ranked[0]]['score']:.4f}")
+            if len(ranked) == 1:
+                break
+            alive = ranked[:max(1, len(ranked) // eta)]
+
+    leaderboard = sorted((summarize(candidates[i], results[i]) for i in results),
+                         key=lambda entry: (entry["folds"], entry["score"]), reverse=True)
+    return leaderboard, rungs, folds
+
+def choose_best(leaderboard, sla_ms=SLA_MS):
+    """Melhor candidato (mais folds avaliados, maior score) cujo p99 de latência cabe no SLA."""
+    within_sla = [entry for entry in leaderboard if entry["latency_p99_ms"] <= sla_ms]
+    return within_sla[0] if within_sla else None
+
+def run_search(n_candidates=N_CANDIDATES, n_folds=N_FOLDS, eta=ETA, workers=None, sla_ms=SLA_MS,
+               report_path=SEARCH_REPORT_PATH):
+    """Busca de hiperparâmetros do Challenger no treino da Gold. Retorna o melhor candidato (ou None)."""
+    print("--- 🔎 BUSCA DE HIPERPARÂMETROS DO CHALLENGER (SUCCESSIVE HALVING) ---")
+    start = time.perf_counter()
+
+    train = load_features("train")  # Em ordem de tempo (materializa o cache antes de abrir o pool)
+    feature_names = train.columns
+    print(f"Treino: {len(train)} linhas | {n_candidates} candidatos | {n_folds} folds temporais | eta={eta}")
+
+    leaderboard, rungs, folds = successive_halving("train", n_candidates, n_folds, eta, workers, sla_ms=sla_ms)
+    best = choose_best(leaderboard, sla_ms)
+
+    print(f"\n{'SCORE':>7} | {'AUPRC':>6} | {'CUSTO REL.':>10} | {'P99 (ms)':>8} | {'FOLDS':>5} | PARÂMETROS")
+    print("-" * 100)
+    for entry in leaderboard[:10]:
+        print(f"{entry['score']:7.4f} | {entry['auprc']:6.4f} | {entry['cost_ratio']:10.4f} | "
+              f"{entry['latency_p99_ms']:8.2f} | {entry['folds']:5d} | {entry['params']}")
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "feature_names": feature_names,
+        "folds": [{"train_rows": int(train_end), "valid_rows": int(valid_end - train_end)}
+                  for train_end, valid_end in folds],
+        "rungs": rungs,
+        "sla_ms": sla_ms,
+        "costs": {"fn": COST_FN, "fp": COST_FP},
+        "best": best,
+        "leaderboard": leaderboard,
+    }
+    tmp_path = report_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, report_path)
+
+    if best is None:
+        print(f"\n❌ Nenhum candidato cabe no SLA de {sla_ms:.0f} ms (p99).")
+    else:
+        print(f"\n✅ Melhor candidato dentro do SLA ({sla_ms:.0f} ms): {best['params']}")
+        print(f"   AUPRC {best['auprc']:.4f} | custo relativo {best['cost_ratio']:.4f} | p99 {best['latency_p99_ms']:.2f} ms")
+    print(f"Relatório salvo em: {report_path} ({time.perf_counter() - start:.1f}s)")
+    return best
+
+def load_best_params(report_path=SEARCH_REPORT_PATH):
+    """Hiperparâmetros do melhor candidato da última busca (None se não houver)."""
+    if not os.path.exists(report_path):
+        return None
+    with open(report_path, encoding="utf-8") as f:
+        best = json.load(f).get("best")
+    return best["params"] if best else None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Busca de hiperparâmetros do Challenger com folds temporais")
+    parser.add_argument("--candidates", type=int, default=N_CANDIDATES, help="Candidatos na primeira rodada")
+    parser.add_argument("--folds", type=int, default=N_FOLDS, help="Folds temporais (janela crescente)")
+    parser.add_argument("--eta", type=int, default=ETA, help="Fator de corte do successive halving")
+    parser.add_argument("--workers", type=int, default=None, help="Processos (padrão: todos os núcleos)")
+    parser.add_argument("--sla-ms", type=float, default=SLA_MS, help="SLA de latência p99 por transação")
+    args = parser.parse_args()
+    run_search(args.candidates, args.folds, args.eta, args.workers, args.sla_ms)
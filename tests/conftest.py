@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Os módulos do projeto são scripts soltos em src/ (mesmo esquema de src/benchmarks/common.py)
+SRC_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
@@ -0,0 +1,80 @@
+"""
+Paridade treino x serving: o fast path da API (TransactionRowEncoder /
+compute_features_scalar) precisa produzir as mesmas features que o caminho
+via DataFrame (FraudFeatureEngineer), que é o mesmo usado para gerar a Gold.
+"""
+import math
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+
+from feature_engineering import (  # noqa: E402
+    compute_amount_log, compute_features_scalar, compute_hour, compute_is_night
+)
+
+RAW_FIELDS = ['time', 'amount'] + [f'v{i}' for i in range(1, 29)]
+# Ordem embaralhada de propósito: o encoder precisa respeitar feature_names_in_, seja ela qual for
+FEATURE_NAMES = list(np.random.default_rng(0).permutation(
+    [f'v{i}' for i in range(1, 29)] + ['amount', 'hour', 'is_night', 'amount_log']))
+
+# Bordas de hora (meia-noite, 6h, 7h, virada do dia, além de 48h) e de valor (zero, centavos)
+EDGE_TIMES = [0.0, 6 * 3600.0, 7 * 3600 - 1e-6, 7 * 3600.0, 86399.999, 86400.0, 172792.0, 10 ** 9]
+EDGE_AMOUNTS = [0.0, 0.01, 1.0, 25691.16]
+
+def random_payloads(n, seed):
+    rng = np.random.default_rng(seed)
+    payloads = []
+    for i in range(n):
+        payload = {f'v{k}': float(v) for k, v in enumerate(rng.standard_normal(28) * 3, start=1)}
+        payload['time'] = EDGE_TIMES[i] if i < len(EDGE_TIMES) else float(rng.uniform(0, 172800))
+        payload['amount'] = EDGE_AMOUNTS[i] if i < len(EDGE_AMOUNTS) else float(round(rng.lognormal(3.0, 1.5), 2))
+        payloads.append(payload)
+    return payloads
+
+@pytest.fixture(scope="module")
+def api():
+    pytest.importorskip("fastapi")
+    import app
+    return app
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_row_encoder_matches_dataframe_path(api, seed):
+    encoder = api.TransactionRowEncoder(FEATURE_NAMES)
+    for payload in random_payloads(300, seed):
+        transaction = api.TransactionRequest(**payload)
+        fast = encoder.encode(transaction).copy()
+        reference = api.dataframe_features(transaction, FEATURE_NAMES).to_numpy(dtype=np.float64)
+        np.testing.assert_allclose(fast, reference, rtol=0, atol=1e-12, err_msg=str(payload))
+
+def test_batch_matches_single_rows(api):
+    encoder = api.TransactionRowEncoder(FEATURE_NAMES)
+    transactions = [api.TransactionRequest(**p) for p in random_payloads(200, 4)]
+    batch = api.batch_dataframe_features(transactions, FEATURE_NAMES).to_numpy(dtype=np.float64)
+    rows = np.vstack([encoder.encode(t).copy() for t in transactions])
+    assert list(api.batch_dataframe_features(transactions[:1], FEATURE_NAMES).columns) == FEATURE_NAMES
+    np.testing.assert_allclose(rows, batch, rtol=0, atol=1e-12)
+
+@pytest.mark.parametrize("time, amount", [
+    (math.nan, 1.0), (math.inf, 1.0), (-math.inf, 1.0), (-3600.0, 1.0), (1e300, 1.0),
+    (0.0, -0.001), (0.0, -5.0), (0.0, math.nan), (0.0, math.inf),
+])
+def test_scalar_path_follows_numpy_on_edges(time, amount):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hour = compute_hour(np.array([time]))
+        expected = (hour[0], compute_is_night(hour)[0], compute_amount_log(np.array([amount]))[0])
+    s_hour, s_night, s_log = compute_features_scalar(time, amount)
+    assert np.array_equal([s_hour, s_log], [expected[0], expected[2]], equal_nan=True)
+    assert s_night == expected[1]
+
+@pytest.mark.parametrize("field, value", [
+    ("time", math.inf), ("time", math.nan), ("amount", -0.01), ("amount", math.inf), ("v14", math.nan),
+])
+def test_request_rejects_values_outside_contract(api, field, value):
+    from pydantic import ValidationError
+    payload = random_payloads(1, 5)[0]
+    payload[field] = value
+    with pytest.raises(ValidationError):
+        api.TransactionRequest(**payload)